@@ -0,0 +1,221 @@
+"""
+aggregate.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import math
+import sqlite3
+import dbschema
+
+
+class Aggregator(object):
+    """Computes statistics of a data type across colleges for every year.
+
+    A statistic such as the median ADM_RATE of the public colleges in Texas
+    is computed from the values of every college matching a filter on the
+    College table. sqlite filters the colleges and drops missing values in a
+    single statement. The values of each year are then sorted once, and the
+    mean and every percentile are read from the sorted values.
+
+    Attributes:
+        db_path: Path of the database built by Dbbuilder.
+        cur: sqlite3 cursor object.
+        layout: Storage layout of the database's year data, 'wide' or 'long'.
+        years: List of the integer years of the database.
+        college_columns: List of the College table's column names, which can
+            be used in filters.
+        data_types: List of the numeric year data types that can be
+            aggregated.
+    """
+
+    #Percentiles computed when none are specified.
+    DEFAULT_PERCENTILES = (25, 75)
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.cur = sqlite3.connect(db_path).cursor()
+
+        self.layout = dbschema.get_layout(self.cur)
+
+        self.cur.execute('''PRAGMA table_info(College)''')
+        self.college_columns = [entry[1] for entry in self.cur.fetchall()]
+
+        self.years = dbschema.get_years(self.cur, self.layout)
+        self.data_types = [
+            name for name, _ in dbschema.get_year_data_types(
+                self.cur, self.layout, self.years)]
+
+    def close(self):
+        """Close the connection to the database."""
+        self.cur.connection.close()
+
+    def aggregate(self, data_type, filters=None, percentiles=None):
+        """Compute the statistics of a data type for every year.
+
+        Args:
+            data_type: String name of a numeric year data type.
+            filters: Dictionary of College column name to the value, or list
+                of values, that selected colleges must have. For example,
+                {'STABBR': 'TX', 'CONTROL': 1}. All colleges are selected if
+                None.
+            percentiles: Sequence of percentiles between 0 and 100 to compute,
+                DEFAULT_PERCENTILES if None. The median is always computed.
+
+        Returns:
+            statistics: Dictionary of lists with one entry per year: 'year',
+                'count' (number of colleges with a value), 'mean', 'median'
+                and 'p<percentile>' for each percentile, for example 'p25'.
+                Statistics of a year without values are None.
+
+        Raises:
+            ValueError: The data type, a filter column or a percentile is not
+                valid.
+        """
+        if data_type not in self.data_types:
+            raise ValueError('Unknown numeric year data type: %s'
+                             % (data_type,))
+        if percentiles is None:
+            percentiles = self.DEFAULT_PERCENTILES
+        self._validate_percentiles(percentiles)
+        where, parameters = self._get_filter_clause(filters or {})
+
+        values_by_year = dict((year, []) for year in self.years)
+        self.cur.execute(*self._get_values_query(data_type, where, parameters))
+        for year, value in self.cur:
+            values_by_year[year].append(value)
+        for values in values_by_year.values():
+            values.sort()
+
+        statistics = {'year': list(self.years), 'count': [], 'mean': [],
+                      'median': []}
+        for percentile in percentiles:
+            statistics[self._get_percentile_key(percentile)] = []
+        for year in self.years:
+            values = values_by_year[year]
+            statistics['count'].append(len(values))
+            statistics['mean'].append(
+                math.fsum(values) / len(values) if values else None)
+            statistics['median'].append(get_percentile(values, 50))
+            for percentile in percentiles:
+                statistics[self._get_percentile_key(percentile)].append(
+                    get_percentile(values, percentile))
+        return statistics
+
+    @staticmethod
+    def _validate_percentiles(percentiles):
+        """Raise exception for percentiles outside 0 to 100.
+
+        Args:
+            percentiles: Sequence of percentiles.
+
+        Raises:
+            ValueError: A percentile is not a number between 0 and 100.
+        """
+        for percentile in percentiles:
+            #bool is a subclass of int, but True is not a percentile.
+            if (not isinstance(percentile, (int, float)) or
+                    isinstance(percentile, bool) or
+                    not 0 <= percentile <= 100):
+                raise ValueError('Invalid percentile: %s' % (percentile,))
+
+    @staticmethod
+    def _get_percentile_key(percentile):
+        """Return the statistics key of a percentile, for example 'p25'."""
+        return 'p%g' % (percentile,)
+
+    def _get_filter_clause(self, filters):
+        """Return the SQL condition selecting the colleges of a filter.
+
+        Args:
+            filters: Dictionary of College column name to a value or list of
+                values.
+
+        Returns:
+            (where, parameters): String condition on the College table and
+                the list of its parameters.
+
+        Raises:
+            ValueError: A filter column is not a College column.
+        """
+        conditions = ['1']
+        parameters = []
+        for column in sorted(filters):
+            if column not in self.college_columns:
+                raise ValueError('Unknown College column: %s' % (column,))
+            values = filters[column]
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            values = list(values)
+            conditions.append('College."%s" IN (%s)' % (
+                column, ','.join('?' * len(values))))
+            parameters.extend(values)
+        return ' AND '.join(conditions), parameters
+
+    def _get_values_query(self, data_type, where, parameters):
+        """Return the statement selecting the values of every year.
+
+        Args:
+            data_type: String name of a numeric year data type.
+            where: String condition on the College table.
+            parameters: List of the condition's parameters.
+
+        Returns:
+            (statement, parameters): Statement selecting rows of (year,
+                value) and its parameters.
+        """
+        if self.layout == 'long':
+            #The Observation primary key starts with metric_id, so only the
+            #data type's observations are scanned.
+            return ('''
+                SELECT Observation.year, Observation.value
+                FROM Observation JOIN College
+                ON Observation.college_id = College.college_id
+                WHERE Observation.metric_id =
+                (SELECT metric_id FROM Metric WHERE name = ?) AND
+                Observation.value IS NOT NULL AND %s''' % (where,),
+                [data_type] + parameters)
+
+        #The colleges are selected once and joined with each year table.
+        selects = [
+            '''SELECT %d, "%d"."%s" FROM "%d" JOIN Selected
+            ON "%d".college_id = Selected.college_id
+            WHERE "%d"."%s" IS NOT NULL'''
+            % (year, year, data_type, year, year, year, data_type)
+            for year in self.years]
+        return ('''WITH Selected AS (SELECT college_id FROM College
+                WHERE %s) ''' % (where,) +
+                ' UNION ALL '.join(selects), parameters)
+
+
+def get_percentile(values, percentile):
+    """Return a percentile of sorted values.
+
+    Uses linear interpolation between the two closest values, as the
+    default method of numpy.percentile does.
+
+    Args:
+        values: Sorted list of numbers.
+        percentile: Number between 0 and 100.
+
+    Returns:
+        value: Float percentile of the values, or None if values is empty.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * percentile / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(values) - 1)
+    fraction = position - lower
+    return float(values[lower] + (values[upper] - values[lower]) * fraction)
@@ -0,0 +1,343 @@
+"""
+batch.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from aggregate import Aggregator
+import decoder
+from plotdata import PlotSettings, SeriesPlot
+import plotfigure
+
+#Output formats of a rendered plot. JSON holds the plotted data.
+FORMATS = ('png', 'svg', 'json')
+
+#Size of the rendered figures in inches.
+FIGURE_SIZE = (12, 6)
+
+#Statistics of an aggregate series, besides 'p<percentile>'.
+STATISTICS = ('count', 'mean', 'median')
+
+#PlotSettings of a rendering process, set by _init_render_worker, and its
+#Aggregator, opened for the first aggregate series.
+_plot_settings = None
+_aggregator = None
+
+
+def main(argv=None):
+    """Render the plots of a spec file without the interface.
+
+    Args:
+        argv: List of command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        status: 0 if every plot was rendered, otherwise 1.
+    """
+    args = _parse_args(argv)
+    if not os.path.isfile(args.db_path):
+        print('Database not found:', args.db_path)
+        return 1
+    try:
+        with open(args.spec_path, 'r') as spec_file:
+            specs = load_specs(spec_file)
+    except (OSError, ValueError) as error:
+        print('Invalid spec file %s: %s' % (args.spec_path, error))
+        return 1
+
+    failed = 0
+    results = render_specs(
+        args.db_path, specs, args.output_dir, args.formats, args.workers,
+        args.columns_dir)
+    for name, paths, missing, error in results:
+        if error:
+            failed += 1
+            print('Failed to render %s: %s' % (name, error))
+            continue
+        for message in missing:
+            print(message)
+        print('Rendered', ', '.join(paths))
+    print('%d of %d plots rendered.' % (len(specs) - failed, len(specs)))
+    return 1 if failed else 0
+
+def _parse_args(argv):
+    """Parse the command line arguments.
+
+    Args:
+        argv: List of command line arguments, or None to use sys.argv[1:].
+
+    Returns:
+        args: argparse.Namespace containing the parsed arguments.
+    """
+    db_path = os.path.join(
+        os.path.dirname(__file__), os.pardir, 'data', 'database',
+        'college-scorecard.sqlite')
+    parser = argparse.ArgumentParser(
+        description='Render College Scorecard plots without the interface.')
+    parser.add_argument(
+        'spec_path',
+        help='JSON file with a list of plots, each a dictionary with a '
+        '"name" and a list of "series", each a dictionary with a "college", '
+        '"data_type", "start_year" and "end_year". A series with a '
+        '"statistic" instead of a "college" plots that statistic across the '
+        'colleges matching its optional "filters"')
+    parser.add_argument(
+        '--db', dest='db_path', default=db_path,
+        help='database built by main.py (default: %(default)s)')
+    parser.add_argument(
+        '--columns', dest='columns_dir', default=None,
+        help='columnar export of the database to read series from, as '
+        'written by main.py --export-columns')
+    parser.add_argument(
+        '--output-dir', default='.',
+        help='directory the rendered files are written to (default: .)')
+    parser.add_argument(
+        '--formats', nargs='+', choices=FORMATS, default=['png'],
+        help='formats written for each plot (default: png)')
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='number of processes rendering plots (default: 1)')
+    return parser.parse_args(argv)
+
+def load_specs(spec_file):
+    """Read and check the plot specs of a spec file.
+
+    Each plot is checked separately, so an invalid plot does not stop the
+    others from being rendered.
+
+    Args:
+        spec_file: Open JSON file holding a list of plot specs.
+
+    Returns:
+        specs: List of plot spec dictionaries. Plots without a name are
+            named by their position in the file, for example 'plot001'. A
+            series is either a college's data type, or a statistic of a data
+            type across colleges (see _create_aggregate_series). An invalid
+            plot has an 'error' describing it.
+
+    Raises:
+        ValueError: The file is not JSON or not a list of plots.
+    """
+    specs = json.load(spec_file)
+    if not isinstance(specs, list):
+        raise ValueError('Spec file does not contain a list of plots')
+    names = set()
+    for position, spec in enumerate(specs, 1):
+        if not isinstance(spec, dict):
+            spec = specs[position - 1] = {'series': []}
+        spec.setdefault('name', 'plot%03d' % (position,))
+        error = _check_spec(spec, names)
+        if error:
+            spec['error'] = error
+        else:
+            names.add(spec['name'])
+    return specs
+
+def _check_spec(spec, names):
+    """Check a plot spec read by load_specs.
+
+    Args:
+        spec: Plot spec dictionary with a 'name'.
+        names: Set of the names of the valid plots before this one.
+
+    Returns:
+        error: String describing why the plot is invalid, or None.
+    """
+    name = spec['name']
+    if (not isinstance(name, str) or not name or
+            os.path.basename(name) != name or name.startswith('.')):
+        return 'Invalid plot name: %s' % (name,)
+    if name in names:
+        return 'Duplicate plot name: %s' % (name,)
+    if not isinstance(spec.get('series'), list) or not spec['series']:
+        return 'Plot %s has no series' % (name,)
+    for series in spec['series']:
+        if not isinstance(series, dict):
+            return 'Series of plot %s is not a dictionary' % (name,)
+        keys = ['data_type', 'start_year', 'end_year']
+        keys.append('statistic' if 'statistic' in series else 'college')
+        for key in keys:
+            if key not in series:
+                return 'Series of plot %s has no %s' % (name, key)
+        filters = series.get('filters') or {}
+        if not isinstance(filters, dict):
+            return 'Filters of plot %s are not a dictionary' % (name,)
+        #Filter values are bound to sqlite parameters, which only take
+        #numbers and strings.
+        for column, values in filters.items():
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if not isinstance(value, (str, int, float)):
+                    return 'Invalid %s filter of plot %s: %s' % (
+                        column, name, value)
+    return None
+
+def render_specs(db_path, specs, output_dir, formats=('png',), workers=1,
+                 columns_dir=None):
+    """Render the plots of a list of specs.
+
+    Each process reads the database's college, data type and year lists
+    once and renders its plots with the Agg backend, so no display is
+    needed.
+
+    Args:
+        db_path: String path of the database.
+        specs: List of plot specs returned by load_specs.
+        output_dir: String path of the directory to write the files to.
+        formats: Sequence of FORMATS to write for each plot.
+        workers: Number of processes rendering plots.
+        columns_dir: String path of a columnar export of the database, or
+            None.
+
+    Returns:
+        results: List of (name, paths, missing, error) tuples in the order
+            of the specs. paths lists the written files, missing holds a
+            message for each series without data and error describes an
+            invalid spec, or is None.
+    """
+    decoder._validate_workers(workers)
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(spec, output_dir, tuple(formats)) for spec in specs]
+    if workers == 1:
+        _init_render_worker(db_path, columns_dir)
+        return [_render_spec(task) for task in tasks]
+    with multiprocessing.Pool(
+            workers, _init_render_worker, (db_path, columns_dir)) as pool:
+        return pool.map(_render_spec, tasks)
+
+def _init_render_worker(db_path, columns_dir):
+    """Create the PlotSettings used by a rendering process."""
+    global _plot_settings, _aggregator
+    _plot_settings = PlotSettings(db_path, columns_dir)
+    if _aggregator is not None:
+        _aggregator.close()
+        _aggregator = None
+
+def _create_aggregate_series(series):
+    """Create a SeriesPlot of a statistic across colleges.
+
+    For example, {"statistic": "median", "data_type": "ADM_RATE",
+    "filters": {"STABBR": "TX", "CONTROL": 1}, "start_year": 2001,
+    "end_year": 2014} plots the median admission rate of the public colleges
+    in Texas for every year.
+
+    Args:
+        series: Series spec with a 'statistic', one of STATISTICS or
+            'p<percentile>' such as 'p90', a 'data_type', a 'start_year',
+            an 'end_year' and optional 'filters' on the College table (see
+            Aggregator.aggregate).
+
+    Returns:
+        series_plot: SeriesPlot labelled by the statistic and filters, with
+            its data set.
+
+    Raises:
+        ValueError: The statistic, data type, filters or years are not valid.
+    """
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = Aggregator(_plot_settings.db_path)
+    statistic = str(series['statistic'])
+    percentiles = []
+    if statistic not in STATISTICS:
+        percentile = statistic[1:] if statistic.startswith('p') else ''
+        try:
+            percentiles = [float(percentile)]
+        except ValueError:
+            raise ValueError('Unknown statistic: %s' % (statistic,))
+        statistic = Aggregator._get_percentile_key(percentiles[0])
+    start_year, end_year = int(series['start_year']), int(series['end_year'])
+    for year in (start_year, end_year):
+        if year not in _aggregator.years:
+            raise ValueError('Unknown year: %s' % (year,))
+    if start_year > end_year:
+        raise ValueError('Start year is after end year: %s-%s'
+                         % (start_year, end_year))
+
+    filters = series.get('filters') or {}
+    statistics = _aggregator.aggregate(
+        series['data_type'], filters, percentiles)
+    conditions = ', '.join('%s=%s' % (column, filters[column])
+                           for column in sorted(filters))
+    label = '%s of %s' % (statistic, conditions or 'all colleges')
+    series_plot = SeriesPlot(label, series['data_type'], str(start_year),
+                             str(end_year), False)
+    series_plot.data = [
+        value for year, value in zip(statistics['year'],
+                                     statistics[statistic])
+        if start_year <= year <= end_year]
+    return series_plot
+
+def _render_spec(task):
+    """Render a plot spec to its files.
+
+    Args:
+        task: Tuple of (spec, output_dir, formats).
+
+    Returns:
+        (name, paths, missing, error): See render_specs.
+    """
+    spec, output_dir, formats = task
+    name = spec['name']
+    if spec.get('error'):
+        return (name, [], [], spec['error'])
+    _plot_settings._clear_series_plots()
+    series_list = []
+    try:
+        for series in spec['series']:
+            if 'statistic' in series:
+                series_plot = _create_aggregate_series(series)
+            else:
+                series_plot = _plot_settings._create_series_plot(
+                    series['college'], series['data_type'],
+                    series['start_year'], series['end_year'])
+                _plot_settings._add_series_plot(series_plot)
+            series_list.append(series_plot)
+    except (ValueError, TypeError, sqlite3.Error) as error:
+        #Values of the wrong type, such as a year that is not a number,
+        #only invalidate their plot.
+        return (name, [], [], str(error))
+    _plot_settings._query_db()
+    year_range = (
+        str(min(int(series.start_year) for series in series_list)),
+        str(max(int(series.end_year) for series in series_list)))
+
+    figure = Figure(figsize=FIGURE_SIZE)
+    FigureCanvasAgg(figure)
+    figure.subplots_adjust(left=0.075)
+    missing = plotfigure.draw_series(figure, series_list, year_range)
+
+    paths = []
+    for file_format in formats:
+        path = os.path.join(output_dir, '%s.%s' % (name, file_format))
+        if file_format == 'json':
+            with open(path, 'w') as save_file:
+                json.dump(plotfigure.series_to_json(series_list), save_file)
+        else:
+            figure.savefig(path, format=file_format)
+        paths.append(path)
+    return (name, paths,
+            [plotfigure.get_missing_message(series) for series in missing],
+            None)
+
+if __name__ == '__main__':
+    sys.exit(main())
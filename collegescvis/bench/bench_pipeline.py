@@ -0,0 +1,141 @@
+"""Benchmark of the build and query pipeline on synthetic raw data.
+
+Times decoder.write_data_types, Dbbuilder.build_database,
+Dbbuilder.update_database, Dbbuilder.build_indexes, opening PlotSettings and
+PlotSettings._query_db at several numbers of colleges, using raw data files
+written by bench.synthetic. The results are written as JSON, so that runs
+can be compared to track regressions.
+
+Run from the collegescvis folder:
+    python -m bench.bench_pipeline [--rows N [N ...]] [--years N]
+        [--series N] [--layout {wide,long}] [--output PATH]
+
+Functions:
+    run_pipeline(directory, rows, ...): time each stage at one scale.
+    main(): run the benchmark and write the JSON results.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import decoder
+from dbbuilder import Dbbuilder
+from plotdata import PlotSettings, SeriesPlot
+from bench import synthetic
+
+
+def run_pipeline(directory, rows, years=3, series=20, layout='wide',
+                 columns=synthetic.COLUMNS, seed=0):
+    """Build and query a database of synthetic data, timing each stage.
+
+    Args:
+        directory: Path of an empty directory for the raw data files and the
+            database.
+        rows: Number of colleges in each raw data file.
+        years: Number of yearly raw data files.
+        series: Number of series queried by PlotSettings._query_db.
+        layout: Storage layout of the database, one of Dbbuilder.LAYOUTS.
+        columns: Number of columns of the raw data files.
+        seed: Seed of the randomly chosen series.
+
+    Returns:
+        results: List of dictionaries with the 'stage' name, the 'scale'
+            (rows), the number of 'rows' processed, the 'seconds' taken and
+            'rows_per_second', which is None for stages without rows.
+    """
+    year_paths = synthetic.write_merged_files(
+        directory, rows, years, columns=columns)
+    types_path = os.path.join(directory, 'data_types.txt')
+    db_path = os.path.join(directory, 'bench.sqlite')
+    results = []
+
+    @contextlib.contextmanager
+    def stage(name, stage_rows):
+        """Record the time taken by a stage processing stage_rows rows."""
+        start_time = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start_time
+        results.append({
+            'stage': name, 'scale': rows, 'rows': stage_rows,
+            'seconds': seconds,
+            'rows_per_second': (stage_rows / seconds
+                                if stage_rows and seconds else None)})
+
+    with stage('write_data_types', rows * years):
+        decoder.write_data_types(
+            os.path.join(directory, 'MERGED*.csv'), types_path)
+    with stage('build_database', 0):
+        builder = Dbbuilder(db_path, types_path, layout)
+        builder.build_database(defer_indexes=True)
+    with stage('update_database', rows * years):
+        for raw_data_path, year in year_paths:
+            builder.update_database(raw_data_path, year)
+    with stage('build_indexes', rows):
+        builder.build_indexes()
+    builder.conn.close()
+
+    with stage('open_plot_settings', rows):
+        plot_settings = PlotSettings(db_path)
+    rand = random.Random(seed)
+    year_types = plot_settings.data_types[
+        plot_settings.max_college_data_index + 1:]
+    for _ in range(series):
+        plot_settings._add_series_plot(SeriesPlot(
+            rand.choice(plot_settings.college_names),
+            rand.choice(year_types), plot_settings.year_names[0],
+            plot_settings.year_names[-1], False))
+    #Each series spans every year of the database, not only the years of
+    #the raw data files.
+    with stage('query_db', series * len(plot_settings.year_names)):
+        plot_settings._query_db()
+    plot_settings.cur.connection.close()
+    return results
+
+
+def main():
+    """Run the benchmark and write the JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--series', type=int, default=20)
+    parser.add_argument('--columns', type=int, default=synthetic.COLUMNS)
+    parser.add_argument('--layout', choices=Dbbuilder.LAYOUTS,
+                        default='wide')
+    parser.add_argument('--output', default=None,
+                        help='JSON results file (default: standard output)')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'pipeline',
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'years': args.years, 'series': args.series,
+        'columns': args.columns, 'layout': args.layout,
+        'results': []}
+    for rows in args.rows:
+        print('Benchmarking %d rows...' % (rows,), file=sys.stderr)
+        #The modules' progress messages are kept out of the JSON output.
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                contextlib.redirect_stdout(sys.stderr):
+            report['results'].extend(run_pipeline(
+                temp_dir, rows, args.years, args.series, args.layout,
+                args.columns))
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Microbenchmark of type-ahead college searches.
+
+Times CollegeIndex.search on an index of generated college names, cities
+and states the size of the full College table.
+
+Run from the collegescvis folder:
+    python -m bench.bench_search [--colleges N] [--repeat N]
+
+Functions:
+    build_entries(colleges): return generated (name, city, state) tuples.
+    main(): run the benchmark and print the time of each query.
+"""
+import argparse
+import time
+from collegesearch import CollegeIndex
+
+#Words of the generated names.
+WORDS = ['University', 'College', 'Community', 'State', 'Technical',
+         'Institute', 'Saint', 'Christian', 'Beauty', 'Academy']
+
+#Queries searched: a prefix, words in any order and words with typos.
+QUERIES = ('univ', 'college state', 'comunity colege 12')
+
+
+def build_entries(colleges):
+    """Return generated (name, city, state) tuples of colleges."""
+    return [('%s %s %d' % (WORDS[number % 10], WORDS[number % 7], number),
+             'City %d' % (number % 500), 'TX')
+            for number in range(colleges)]
+
+
+def main():
+    """Run the benchmark and print the time of each query."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--colleges', type=int, default=7500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    index = CollegeIndex(build_entries(args.colleges))
+    print('%-24s %8.2f ms' % ('build index',
+                              (time.perf_counter() - start_time) * 1000))
+    for query in QUERIES:
+        #The fastest of several searches is kept, so that garbage
+        #collections are not counted.
+        times = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            index.search(query)
+            times.append(time.perf_counter() - start_time)
+        print('%-24s %8.2f ms' % (repr(query), min(times) * 1000))
+
+if __name__ == '__main__':
+    main()
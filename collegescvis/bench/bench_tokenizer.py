@@ -0,0 +1,100 @@
+"""Microbenchmark of raw data row tokenizing.
+
+Compares decoder.read_rows with the previous replace_commas and
+str.split path, and with the plain csv module reader, on a generated raw
+data file with 1,743 columns.
+
+Run from the collegescvis folder:
+    python -m bench.bench_tokenizer [--rows N] [--repeat N]
+
+Functions:
+    main(): run the benchmark and print the rows per second of each path.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import decoder
+
+COLUMNS = 1743
+
+
+def write_raw_data(path, rows, quoted=4, seed=0):
+    """Write a raw data file with quoted commas and missing values.
+
+    Args:
+        path: Path of the file to write.
+        rows: Number of data rows.
+        quoted: Number of quoted values containing a comma in each row.
+        seed: Seed of the random values.
+    """
+    rand = random.Random(seed)
+    with open(path, 'w') as data_file:
+        data_file.write(','.join('COL%s' % i for i in range(COLUMNS)) + '\n')
+        for row in range(rows):
+            values = [str(row)] + ['"Name %s, Inc."' % row] * quoted
+            for _ in range(COLUMNS - len(values)):
+                choice = rand.random()
+                if choice < 0.5:
+                    values.append('NULL')
+                elif choice < 0.55:
+                    values.append('PrivacySuppressed')
+                else:
+                    values.append('%.4f' % rand.random())
+            data_file.write(','.join(values) + '\n')
+
+
+def split_rows(path):
+    """Tokenize a file with replace_commas and str.split."""
+    with open(path, 'r', encoding='utf-8-sig') as data_file:
+        for line in data_file:
+            values = decoder.replace_commas(line).split(',')
+            if values[-1][-1:] == '\n': values[-1] = values[-1][:-1]
+
+
+def read_rows(path):
+    """Tokenize a file with decoder.read_rows."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as data_file:
+        for _ in decoder.read_rows(data_file):
+            pass
+
+
+def csv_rows(path):
+    """Tokenize a file with the csv module's reader."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as data_file:
+        for _ in csv.reader(data_file):
+            pass
+
+
+def time_function(function, path, repeat):
+    """Return the best time in seconds of several calls to a function."""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function(path)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def main():
+    """Run the benchmark and print the rows per second of each path."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--quoted', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'MERGED_BENCH.csv')
+        write_raw_data(path, args.rows, args.quoted)
+        for name, function in (('replace_commas + split', split_rows),
+                               ('csv.reader', csv_rows),
+                               ('read_rows', read_rows)):
+            seconds = time_function(function, path, args.repeat)
+            print('%-24s %8.3f s %10.0f rows/s'
+                  % (name, seconds, args.rows / seconds))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Generator of synthetic College Scorecard raw data files.
+
+Writes MERGED<year>_PP.csv files shaped like the real Scorecard files: the
+same 36 College columns followed by year data columns, 1,743 columns in all,
+mostly NULL or PrivacySuppressed values and college names with quoted
+commas. The same colleges and column types are used in every year, so the
+files can be decoded, built into a database and plotted without downloading
+the Scorecard data.
+
+Run from the collegescvis folder:
+    python -m bench.synthetic DIRECTORY [--rows N] [--years N]
+
+Functions:
+    get_columns(columns, seed): return the names and types of the columns.
+    write_raw_data(path, rows, ...): write a single raw data file.
+    write_merged_files(directory, rows, ...): write a raw data file per year.
+"""
+import argparse
+import os
+import random
+
+COLUMNS = 1743
+
+#Columns of the College table at the start of every raw data file.
+COLLEGE_COLUMNS = (
+    'UNITID', 'OPEID', 'opeid6', 'INSTNM', 'CITY', 'STABBR', 'ZIP',
+    'AccredAgency', 'INSTURL', 'NPCURL', 'sch_deg', 'HCM2', 'main',
+    'NUMBRANCH', 'PREDDEG', 'HIGHDEG', 'CONTROL', 'st_fips', 'region',
+    'LOCALE', 'locale2', 'LATITUDE', 'LONGITUDE', 'CCBASIC', 'CCUGPROF',
+    'CCSIZSET', 'HBCU', 'PBI', 'ANNHI', 'TRIBAL', 'AANAPII', 'HSI', 'NANTI',
+    'MENONLY', 'WOMENONLY', 'RELAFFIL')
+
+#Text columns of the College table, with the format of their values.
+COLLEGE_TEXT = {
+    'INSTNM': 'Synthetic College %d', 'CITY': 'City %d', 'STABBR': 'S%d',
+    'ZIP': '%05d-1234', 'AccredAgency': 'Accrediting Agency %d',
+    'INSTURL': 'www.college%d.edu', 'NPCURL': 'npc.college%d.edu'}
+
+#Prefixes of the year data column names.
+YEAR_PREFIXES = ('ADM_RATE', 'SATVR25', 'UGDS', 'PCTPELL', 'C150_4',
+                 'RET_FT4', 'MD_EARN_WNE_P10', 'DEBT_MDN', 'NPT4_PUB',
+                 'COSTT4_A')
+
+#Share of the year data columns holding each type.
+TYPE_WEIGHTS = (('INTEGER', 0.35), ('REAL', 0.6), ('TEXT', 0.05))
+
+
+def get_columns(columns=COLUMNS, seed=0):
+    """Return the names and types of the columns of a raw data file.
+
+    Args:
+        columns: Number of columns, at least len(COLLEGE_COLUMNS).
+        seed: Seed of the random column types.
+
+    Returns:
+        column_list: List of (name, type) tuples, type being 'INTEGER',
+            'REAL' or 'TEXT'.
+
+    Raises:
+        ValueError: There are fewer columns than College columns.
+    """
+    if columns < len(COLLEGE_COLUMNS):
+        raise ValueError('At least %d columns are needed'
+                         % (len(COLLEGE_COLUMNS),))
+    rand = random.Random(seed)
+    column_list = [
+        (name, 'TEXT' if name in COLLEGE_TEXT else
+         'REAL' if name in ('LATITUDE', 'LONGITUDE') else 'INTEGER')
+        for name in COLLEGE_COLUMNS]
+    types = [data_type for data_type, _ in TYPE_WEIGHTS]
+    weights = [weight for _, weight in TYPE_WEIGHTS]
+    for index in range(len(COLLEGE_COLUMNS), columns):
+        name = '%s_%d' % (YEAR_PREFIXES[index % len(YEAR_PREFIXES)], index)
+        column_list.append((name, rand.choices(types, weights)[0]))
+    return column_list
+
+
+def write_raw_data(path, rows, columns=COLUMNS, null_density=0.6,
+                   suppressed_density=0.1, quoted_density=0.1, seed=0):
+    """Write a raw data file of synthetic colleges.
+
+    College n has UNITID 100000 + n, so files written with the same number
+    of rows describe the same colleges.
+
+    Args:
+        path: Path of the file to write.
+        rows: Number of colleges.
+        columns: Number of columns.
+        null_density: Share of the year data values that are NULL.
+        suppressed_density: Share of the year data values that are
+            PrivacySuppressed.
+        quoted_density: Share of the college names holding a quoted comma.
+        seed: Seed of the random values. The column types always use seed 0,
+            so that every file has the same columns.
+    """
+    column_list = get_columns(columns)
+    college_count = len(COLLEGE_COLUMNS)
+    rand = random.Random(seed)
+    with open(path, 'w', newline='') as data_file:
+        data_file.write(','.join(name for name, _ in column_list) + '\n')
+        for row in range(rows):
+            values = []
+            for name, data_type in column_list[:college_count]:
+                if name == 'UNITID':
+                    values.append(str(100000 + row))
+                elif name == 'INSTNM' and rand.random() < quoted_density:
+                    values.append('"Synthetic College %d, Campus %d"'
+                                  % (row, rand.randint(1, 9)))
+                elif name in COLLEGE_TEXT:
+                    values.append(COLLEGE_TEXT[name] % (row,))
+                elif data_type == 'REAL':
+                    values.append('%.6f' % (rand.uniform(-180, 180),))
+                else:
+                    values.append(str(rand.randint(0, 9)))
+            for _, data_type in column_list[college_count:]:
+                choice = rand.random()
+                if choice < null_density:
+                    values.append('NULL')
+                elif choice < null_density + suppressed_density:
+                    values.append('PrivacySuppressed')
+                elif data_type == 'INTEGER':
+                    values.append(str(rand.randint(0, 50000)))
+                elif data_type == 'REAL':
+                    values.append('%.4f' % (rand.random(),))
+                else:
+                    values.append('Text %d' % (row,))
+            data_file.write(','.join(values) + '\n')
+
+
+def write_merged_files(directory, rows, years=3, first_year=1996, **kwargs):
+    """Write a MERGED<year>_PP.csv raw data file for each of several years.
+
+    Args:
+        directory: Path of the directory to write the files to.
+        rows: Number of colleges in each file.
+        years: Number of consecutive years.
+        first_year: Year of the first file.
+        **kwargs: Other arguments of write_raw_data.
+
+    Returns:
+        year_paths: List of (path, year) tuples, year being a string.
+    """
+    year_paths = []
+    for year in range(first_year, first_year + years):
+        path = os.path.join(directory, 'MERGED%d_PP.csv' % (year,))
+        write_raw_data(path, rows, seed=year, **kwargs)
+        year_paths.append((path, str(year)))
+    return year_paths
+
+
+def main():
+    """Write synthetic raw data files to a directory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--rows', type=int, default=7500)
+    parser.add_argument('--years', type=int, default=19)
+    parser.add_argument('--columns', type=int, default=COLUMNS)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    for path, _ in write_merged_files(
+            args.directory, args.rows, args.years, columns=args.columns):
+        print('Wrote', path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+collegesearch.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import bisect
+import collections
+import re
+
+#Characters that separate the words of a name.
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+
+class CollegeIndex(object):
+    """Search index of college names, cities and states.
+
+    The index is built once and answers type-ahead lookups. Names starting
+    with the query are found by bisecting the sorted names. Other matches are
+    found through trigrams: every word of a college's name, city and state is
+    split into three-character pieces, and each piece maps to the colleges
+    containing it. A college matches when it shares enough of the query's
+    trigrams, which tolerates typos and words in any order.
+
+    Attributes:
+        entries: List of (name, city, state) tuples, sorted by normalized
+            name, the order of the keys bisected by search.
+    """
+
+    #Fraction of the query's trigrams a college must contain to match.
+    MIN_SCORE = 0.5
+
+    def __init__(self, entries):
+        self.entries = sorted(
+            entries, key=lambda entry: (self.normalize(entry[0]), entry))
+        self._keys = [self.normalize(entry[0]) for entry in self.entries]
+        self._trigrams = collections.defaultdict(list)
+        for position, entry in enumerate(self.entries):
+            text = ' '.join(part for part in entry if part)
+            for trigram in self._get_trigrams(self.normalize(text)):
+                self._trigrams[trigram].append(position)
+
+    @classmethod
+    def from_database(cls, cur):
+        """Build the index from the College table of a database.
+
+        Args:
+            cur: sqlite3 cursor of the database.
+
+        Returns:
+            index: CollegeIndex of every college. City and state are empty
+                if the College table has no CITY or STABBR column.
+        """
+        cur.execute('''PRAGMA table_info(College)''')
+        columns = [entry[1] for entry in cur.fetchall()]
+        selected = ['INSTNM'] + [
+            column if column in columns else "''"
+            for column in ('CITY', 'STABBR')]
+        cur.execute('''SELECT %s FROM College WHERE INSTNM IS NOT NULL'''
+                    % (', '.join(selected),))
+        return cls((name, city or '', state or '')
+                   for name, city, state in cur.fetchall())
+
+    @staticmethod
+    def normalize(text):
+        """Return text in lower case with words separated by single spaces.
+        """
+        return ' '.join(_SEPARATORS.split(text.lower())).strip()
+
+    @staticmethod
+    def _get_trigrams(text, complete=True):
+        """Return the set of trigrams of the words of normalized text.
+
+        Each word is padded with a space on both sides, so that short words
+        and word boundaries have trigrams.
+
+        Args:
+            text: Normalized text.
+            complete: If False, the last word may still be being typed and
+                its end is not padded.
+
+        Returns:
+            trigrams: Set of three-character strings.
+        """
+        trigrams = set()
+        words = text.split()
+        for position, word in enumerate(words):
+            padded = ' ' + word
+            if complete or position < len(words) - 1:
+                padded += ' '
+            for start in range(len(padded) - 2):
+                trigrams.add(padded[start:start + 3])
+        return trigrams
+
+    def search(self, query, limit=50):
+        """Return the colleges matching a partly typed query.
+
+        Colleges whose names start with the query come first, followed by
+        the other matches, best first.
+
+        Args:
+            query: String typed by the user.
+            limit: Maximum number of colleges returned.
+
+        Returns:
+            entries: List of (name, city, state) tuples.
+        """
+        key = self.normalize(query)
+        if not key:
+            return self.entries[:limit]
+
+        #Names starting with the query are consecutive in the sorted keys.
+        matches = []
+        position = bisect.bisect_left(self._keys, key)
+        while (position < len(self._keys) and len(matches) < limit and
+               self._keys[position].startswith(key)):
+            matches.append(position)
+            position += 1
+
+        trigrams = self._get_trigrams(key, complete=False)
+        if trigrams and len(matches) < limit:
+            counts = collections.Counter()
+            for trigram in trigrams:
+                counts.update(self._trigrams.get(trigram, ()))
+            min_count = self.MIN_SCORE * len(trigrams)
+            prefixed = set(matches)
+            scored = [(-count, position)
+                      for position, count in counts.items()
+                      if count >= min_count and position not in prefixed]
+            scored.sort()
+            matches.extend(
+                position for _, position in scored[:limit - len(matches)])
+        return [self.entries[position] for position in matches]
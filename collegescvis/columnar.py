@@ -0,0 +1,270 @@
+"""
+columnar.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import array
+import json
+import mmap
+import os
+import sqlite3
+import sys
+import dbschema
+
+#Version of the file format written by export_columns.
+FORMAT_VERSION = 1
+
+COLUMNS_FILE = 'columns.bin'
+INDEX_FILE = 'index.json'
+
+#Number of values written at a time when the file is filled with NaN.
+_CHUNK_VALUES = 128*1024
+
+_NAN = float('nan')
+
+
+def export_columns(db_path, columns_dir):
+    """Export the numeric year data of a database to a columnar file.
+
+    Every numeric year data type is written to columns.bin as a contiguous
+    array of float64 values shaped [college, year], in native byte order.
+    Missing values are stored as NaN. index.json records the colleges, years
+    and data types of the arrays, along with the size and modification time
+    of the exported database.
+
+    Args:
+        db_path: String path of the database built by Dbbuilder.
+        columns_dir: String path of the directory to write the columns.bin and
+            index.json files to.
+
+    Raises:
+        FileNotFoundError: The database does not exist.
+    """
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError('Database not found: %s' % db_path)
+    os.makedirs(columns_dir, exist_ok=True)
+    columns_path = os.path.join(columns_dir, COLUMNS_FILE)
+    index_path = os.path.join(columns_dir, INDEX_FILE)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        layout = dbschema.get_layout(cur)
+        cur.execute('''SELECT college_id, INSTNM FROM College
+                    ORDER BY college_id''')
+        colleges = cur.fetchall()
+        rows = dict((college[0], row) for row, college in enumerate(colleges))
+        years = dbschema.get_years(cur, layout)
+        metrics = dbschema.get_year_data_types(cur, layout, years)
+        size = len(colleges) * len(years)
+
+        #The old index is removed first, so that an interrupted export is
+        #never read.
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        temp_path = columns_path + '.tmp'
+        _write_nan_file(temp_path, size * len(metrics))
+        if size and metrics:
+            with open(temp_path, 'r+b') as columns_file:
+                columns_map = mmap.mmap(columns_file.fileno(), 0)
+                values = memoryview(columns_map).cast('d')
+                try:
+                    if layout == 'long':
+                        _fill_from_observations(
+                            cur, values, rows, years, metrics, size)
+                    else:
+                        _fill_from_year_tables(
+                            cur, values, rows, years, metrics, size)
+                finally:
+                    values.release()
+                    columns_map.close()
+        os.replace(temp_path, columns_path)
+    finally:
+        conn.close()
+
+    stat = os.stat(db_path)
+    index = {
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'db_signature': [stat.st_mtime_ns, stat.st_size],
+        'colleges': [college[1] for college in colleges],
+        'years': years,
+        'metrics': [metric[0] for metric in metrics],
+    }
+    with open(index_path + '.tmp', 'w') as index_file:
+        json.dump(index, index_file)
+    os.replace(index_path + '.tmp', index_path)
+
+
+def is_current(columns_dir, db_path):
+    """Check whether the columnar export of a database is up to date.
+
+    Args:
+        columns_dir: String path of the directory written by export_columns.
+        db_path: String path of the exported database.
+
+    Returns:
+        boolean: True if the export exists and the database has not changed
+            since it was written.
+    """
+    index = _read_index(columns_dir)
+    if index is None or not os.path.isfile(db_path):
+        return False
+    stat = os.stat(db_path)
+    return index['db_signature'] == [stat.st_mtime_ns, stat.st_size]
+
+
+def _read_index(columns_dir):
+    """Return the index of a columnar export, or None if it is not usable."""
+    try:
+        with open(os.path.join(columns_dir, INDEX_FILE), 'r') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if (index.get('version') != FORMAT_VERSION or
+            index.get('byteorder') != sys.byteorder):
+        return None
+    return index
+
+
+def _write_nan_file(path, count):
+    """Write a file of count float64 NaN values."""
+    chunk = array.array('d', [_NAN]) * min(count, _CHUNK_VALUES)
+    with open(path, 'wb') as columns_file:
+        while count > 0:
+            if count < len(chunk):
+                chunk = chunk[:count]
+            chunk.tofile(columns_file)
+            count -= len(chunk)
+
+
+def _fill_from_year_tables(cur, values, rows, years, metrics, size):
+    """Copy the values of the wide layout's year tables to the export."""
+    year_count = len(years)
+    for year_index, year in enumerate(years):
+        cur.execute('''SELECT college_id, %s FROM "%d"'''
+                    % (', '.join(metric[1] for metric in metrics), year))
+        for result in cur:
+            start = rows[result[0]] * year_count + year_index
+            for position, value in enumerate(result[1:]):
+                if value is not None:
+                    values[position * size + start] = value
+
+
+def _fill_from_observations(cur, values, rows, years, metrics, size):
+    """Copy the values of the long layout's observations to the export."""
+    year_count = len(years)
+    year_indices = dict((year, index) for index, year in enumerate(years))
+    offsets = dict((metric[1], position * size)
+                   for position, metric in enumerate(metrics))
+    cur.execute('''SELECT metric_id, college_id, year, value
+                FROM Observation''')
+    for metric_id, college_id, year, value in cur:
+        if metric_id in offsets and value is not None:
+            values[offsets[metric_id] + rows[college_id] * year_count +
+                   year_indices[year]] = value
+
+
+class ColumnarCache(object):
+    """Read-only view of the files written by export_columns.
+
+    The values file is memory-mapped and cast to float64 once. Series are
+    returned as slices of that view, so reading a series copies no data and
+    only touches the pages of the file it covers.
+
+    Attributes:
+        columns_dir: Path of the directory holding the exported files.
+        years: List of the integer years of the export.
+        metrics: Dictionary of data type name to the offset of its array.
+    """
+
+    def __init__(self, columns_dir):
+        index = _read_index(columns_dir)
+        if index is None:
+            raise FileNotFoundError(
+                'Columnar export not found: %s' % columns_dir)
+        self.columns_dir = columns_dir
+        self.years = index['years']
+        self._db_signature = index['db_signature']
+        self._size = len(index['colleges']) * len(self.years)
+        self.metrics = dict((name, position * self._size)
+                            for position, name in enumerate(index['metrics']))
+
+        #Names shared by several colleges map to None and are not served.
+        self._rows = {}
+        for row, name in enumerate(index['colleges']):
+            self._rows[name] = None if name in self._rows else row
+
+        self._file = open(os.path.join(columns_dir, COLUMNS_FILE), 'rb')
+        self._map = None
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._values = memoryview(self._map).cast('d')
+        else:
+            self._values = memoryview(array.array('d'))
+
+    def is_current(self, db_path):
+        """Check whether the database has changed since it was exported.
+
+        Args:
+            db_path: String path of the exported database.
+
+        Returns:
+            boolean: True if the database has not changed.
+        """
+        stat = os.stat(db_path)
+        return self._db_signature == [stat.st_mtime_ns, stat.st_size]
+
+    def get_series(self, data_type, college, start_year, end_year):
+        """Return the values of a college's data type between two years.
+
+        Args:
+            data_type: String name of the numeric year data type.
+            college: String name of the college.
+            start_year: Integer first year of the series.
+            end_year: Integer last year of the series, inclusive.
+
+        Returns:
+            values: memoryview of float64 values, one per year, with NaN for
+                missing values. None if the export does not hold the series:
+                the data type or college is unknown, the college name is not
+                unique or some of the years were not exported.
+        """
+        offset = self.metrics.get(data_type)
+        row = self._rows.get(college)
+        if (offset is None or row is None or start_year > end_year or
+                start_year not in self.years or end_year not in self.years):
+            return None
+        first = self.years.index(start_year)
+        count = end_year - start_year + 1
+        if self.years.index(end_year) - first + 1 != count:
+            return None
+        start = offset + row * len(self.years) + first
+        return self._values[start:start + count]
+
+    def close(self):
+        """Release the memory map. Returned series must not be used after.
+
+        The file is always closed. If returned series are still referenced,
+        the map itself is closed when they are garbage collected.
+        """
+        self._values.release()
+        self._file.close()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
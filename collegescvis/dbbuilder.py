@@ -15,10 +15,20 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+import contextlib
+import csv
+import hashlib
+import io
+import itertools
+import multiprocessing
+import operator
 import os
 import json
+import queue as queue_module
 import sqlite3
+import time
 import decoder
+from instrumentation import Metrics, TimedIterator
 from validator import Validator
 
 
@@ -30,20 +40,83 @@ class Dbbuilder(object):
         db_path: Path to the database being built.
         conn: sqlite3 connection object.
         cur: sqlite3 cursor object.
+        college_ids: Dictionary of UNITID to college_id for every college in
+            the College table.
+        layout: Storage layout of the year data, one of LAYOUTS.
+        row_plan: RowPlan converting raw data rows to typed values.
+        build_profile: Name of the connection profile used while building,
+            one of PROFILES.
+        labels: Dictionary of data type name to its label in the data
+            dictionary. If no data dictionary was given, the labels stored
+            in the DataType table of an existing database are kept.
+        metrics: Metrics recording the time spent in each stage of adding
+            the raw data.
     """
 
-    def __init__(self, db_path, data_types_path):
+    #Maximum number of parameters bound to a single lookup statement. Older
+    #sqlite versions limit a statement to 999 parameters.
+    MAX_VARIABLES = 500
+
+    #College table columns that are indexed by build_indexes.
+    INDEXED_COLUMNS = ('UNITID', 'INSTNM')
+
+    #Version of the table definitions built by build_database. It is part of
+    #the schema fingerprint, so a database built with other definitions is
+    #built again.
+    SCHEMA_VERSION = 1
+
+    #Storage layouts for the year data. 'wide' stores one table per year with
+    #a column per data type. 'long' stores every value as a row of the
+    #Observation table keyed by (metric_id, college_id, year).
+    LAYOUTS = ('wide', 'long')
+
+    #Seconds the writer waits for a message from the ingest workers before
+    #checking whether they have all exited.
+    QUEUE_TIMEOUT = 1.0
+
+    #sqlite settings of each connection profile, applied as PRAGMAs. The
+    #'bulk' profile trades durability for speed while the database is built:
+    #a write-ahead log without syncing, a 256 MiB page cache, a 1 GiB memory
+    #map and temporary tables in memory. A file interrupted while loading is
+    #not recorded in the manifest and is loaded again on the next run.
+    PROFILES = {
+        'default': (
+            ('journal_mode', 'DELETE'), ('synchronous', 'FULL'),
+            ('cache_size', '-2000'), ('mmap_size', '0'),
+            ('temp_store', 'DEFAULT')),
+        'bulk': (
+            ('journal_mode', 'WAL'), ('synchronous', 'OFF'),
+            ('cache_size', '-262144'), ('mmap_size', '1073741824'),
+            ('temp_store', 'MEMORY')),
+    }
+
+    def __init__(self, db_path, data_types_path, layout='wide',
+                 build_profile='default', dictionary_path=None,
+                 metrics=None):
         self._validate_db_path(db_path)
         self._validate_data_types_path(data_types_path)
+        self._validate_layout(layout)
+        self._validate_profile(build_profile)
+        labels = None
+        if dictionary_path is not None:
+            labels = self._read_dictionary(dictionary_path)
 
         self.db_path = db_path
 
         with open(data_types_path, 'r') as data_file:
             Validator.check_data_types(data_file)
             self.data_types = json.loads(data_file.readline())
+        self.row_plan = RowPlan(self.data_types)
 
         self.conn = sqlite3.connect(self.db_path)
         self.cur = self.conn.cursor()
+        self.labels = labels if labels is not None else self._get_labels()
+
+        self.college_ids = self._get_college_ids()
+        self.layout = self._get_layout(layout)
+        self.build_profile = build_profile
+        self._profile_depth = 0
+        self.metrics = metrics if metrics is not None else Metrics(False)
 
     @staticmethod
     def _validate_db_path(db_path):
@@ -58,6 +131,85 @@ class Dbbuilder(object):
         if not isinstance(db_path, str):
             raise TypeError('Database path is not a string')
 
+    @classmethod
+    def _validate_layout(cls, layout):
+        """Raise exception for an unknown storage layout.
+
+        Args:
+            layout: String name of the storage layout.
+
+        Raises:
+            ValueError: The layout is not one of LAYOUTS.
+        """
+        if layout not in cls.LAYOUTS:
+            raise ValueError('Unknown database layout: %s' % (layout,))
+
+    @classmethod
+    def _validate_profile(cls, profile):
+        """Raise exception for an unknown connection profile.
+
+        Args:
+            profile: String name of the connection profile.
+
+        Raises:
+            ValueError: The profile is not one of PROFILES.
+        """
+        if profile not in cls.PROFILES:
+            raise ValueError('Unknown connection profile: %s' % (profile,))
+
+    @contextlib.contextmanager
+    def _build_profile(self):
+        """Use the build profile for the connection inside a with block.
+
+        The default profile is restored when the outermost block exits. A
+        transaction left open by an error is rolled back first.
+        """
+        self._profile_depth += 1
+        try:
+            if self._profile_depth == 1:
+                self._apply_profile(self.build_profile)
+            yield
+        finally:
+            self._profile_depth -= 1
+            if self._profile_depth == 0:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                self._apply_profile('default')
+
+    def _apply_profile(self, profile):
+        """Apply the settings of a connection profile.
+
+        Nothing is changed while the build profile is the default profile.
+
+        Args:
+            profile: String name of the connection profile.
+        """
+        if self.build_profile == 'default':
+            return
+        for name, value in self.PROFILES[profile]:
+            self.cur.execute('''PRAGMA %s = %s''' % (name, value))
+
+    def _get_layout(self, layout):
+        """Return the storage layout of the database.
+
+        An existing database keeps the layout it was built with.
+
+        Args:
+            layout: String name of the layout to use for a new database.
+
+        Returns:
+            layout: String name of the storage layout.
+        """
+        self.cur.execute('''
+            SELECT name FROM sqlite_master WHERE type = 'table' AND
+            name IN ('Observation', '1996')''')
+        tables = [row[0] for row in self.cur.fetchall()]
+        if 'Observation' in tables:
+            return 'long'
+        if '1996' in tables:
+            return 'wide'
+        return layout
+
     @staticmethod
     def _validate_data_types_path(data_types_path):
         """Raise exception for invalid data types path.
@@ -75,19 +227,262 @@ class Dbbuilder(object):
             raise FileNotFoundError(
                 'Data type file not found: %s' % data_types_path)
 
-    def build_database(self):
-        """Execute functions that create the database tables."""
-        self._build_table('College')
-        self._build_year_tables()
+    @staticmethod
+    def _read_dictionary(dictionary_path):
+        """Read the labels of the data types from the data dictionary.
+
+        Args:
+            dictionary_path: Path to the College Scorecard data dictionary
+                saved as CSV. Its 'VARIABLE NAME' column holds the data type
+                names and its 'NAME OF DATA ELEMENT' column the labels.
+
+        Returns:
+            labels: Dictionary of data type name to label.
+
+        Raises:
+            FileNotFoundError: The path is not a valid file.
+            ValueError: The file does not have the name and label columns.
+        """
+        if not os.path.isfile(dictionary_path):
+            raise FileNotFoundError(
+                'Data dictionary not found: %s' % dictionary_path)
+        labels = {}
+        with open(dictionary_path, 'r', encoding='utf-8-sig',
+                  errors='replace', newline='') as dictionary_file:
+            reader = csv.DictReader(dictionary_file)
+            columns = dict((column.strip().upper(), column)
+                           for column in reader.fieldnames or ())
+            if ('VARIABLE NAME' not in columns or
+                    'NAME OF DATA ELEMENT' not in columns):
+                raise ValueError(
+                    'Data dictionary has no VARIABLE NAME and NAME OF DATA '
+                    'ELEMENT columns: %s' % dictionary_path)
+            for row in reader:
+                name = (row[columns['VARIABLE NAME']] or '').strip()
+                label = (row[columns['NAME OF DATA ELEMENT']] or '').strip()
+                if name and label:
+                    labels[name] = label
+        return labels
+
+    def build_database(self, defer_indexes=False):
+        """Execute functions that create the database tables.
+
+        The schema fingerprint is stored in the Metadata table. If the
+        database already has the schema of the data types and layout, it is
+        left unchanged. If the schema has changed, or an existing database
+        has no fingerprint because it was built before the Metadata table,
+        every table is dropped and the database is built again, so that all
+        raw data files are added again. The DataType search table is built by
+        build_data_type_index in either case.
+
+        Args:
+            defer_indexes: If True, the indexes are not created. Call
+                build_indexes once the raw data has been added, so that the
+                inserts do not have to update the indexes.
+
+        Returns:
+            boolean: True if the tables were built, False if the schema was
+                unchanged.
+        """
+        fingerprint = self._get_schema_fingerprint()
+        stored_fingerprint = self._get_metadata('schema')
+        if stored_fingerprint == fingerprint:
+            print('Database schema unchanged.')
+            self.build_data_type_index()
+            return False
+        self.cur.execute('''
+            SELECT name FROM sqlite_master WHERE name = "College"''')
+        if self.cur.fetchone():
+            print('Rebuilding the existing database: its schema fingerprint '
+                  'is %s. Every raw data file will be added again.'
+                  % ('missing' if stored_fingerprint is None else 'changed',))
+        with self._build_profile():
+            #All tables are created in a single transaction.
+            self.cur.execute('''BEGIN''')
+            self._drop_tables()
+            self._build_table('College')
+            self._build_manifest_table()
+            if self.layout == 'long':
+                self._build_observation_tables()
+            else:
+                self._build_year_tables()
+            self._set_metadata('schema', fingerprint)
+            self.conn.commit()
+            self.college_ids = {}
+            self.build_data_type_index()
+            if not defer_indexes:
+                self.build_indexes()
+        return True
+
+    def _get_schema_fingerprint(self):
+        """Return the fingerprint of the schema built by build_database.
+
+        Returns:
+            fingerprint: String SHA-1 hex digest of the schema version, the
+                layout and the data types.
+        """
+        schema = json.dumps(
+            [self.SCHEMA_VERSION, self.layout, self.data_types])
+        return hashlib.sha1(schema.encode('utf-8')).hexdigest()
+
+    def _get_metadata(self, key):
+        """Return a value stored in the Metadata table.
+
+        Args:
+            key: String key of the value.
+
+        Returns:
+            value: String value, or None if the key or the Metadata table
+                does not exist.
+        """
+        try:
+            self.cur.execute(
+                '''SELECT value FROM Metadata WHERE key = ?''', (key,))
+        except sqlite3.OperationalError:
+            return None
+        row = self.cur.fetchone()
+        return row[0] if row else None
+
+    def _set_metadata(self, key, value):
+        """Store a value in the Metadata table.
+
+        Args:
+            key: String key of the value.
+            value: String value.
+        """
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS Metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT
+            )''')
+        self.cur.execute(
+            '''INSERT OR REPLACE INTO Metadata VALUES (?,?)''',
+            (key, value))
+
+    def _drop_tables(self):
+        """Drop every table of the database, including the Manifest."""
+        #Virtual tables come first: dropping one drops its shadow tables.
+        self.cur.execute('''
+            SELECT name FROM sqlite_master WHERE type = 'table' AND
+            name NOT LIKE 'sqlite_%'
+            ORDER BY sql LIKE 'CREATE VIRTUAL%' DESC
+            ''')
+        for (table_name,) in self.cur.fetchall():
+            print('Dropping table: ' + table_name + '...')
+            self.cur.execute(
+                '''DROP TABLE IF EXISTS "%s"''' % (self.sanitize(table_name),))
+
+    def build_data_type_index(self):
+        """Build the DataType table used to search the numeric data types.
+
+        The table holds the name of each data type that can be plotted and
+        its label from the data dictionary. It is an FTS5 full-text table if
+        sqlite was compiled with FTS5, otherwise a plain table searched with
+        LIKE. It is only built again if the data types or labels changed.
+
+        Returns:
+            boolean: True if the table was built, False if it was unchanged.
+        """
+        names = [name for name, data_type, _ in self.data_types
+                 if data_type != 'TEXT']
+        rows = [(name, self.labels.get(name, '')) for name in names]
+        fingerprint = hashlib.sha1(
+            json.dumps(rows).encode('utf-8')).hexdigest()
+        if self._get_metadata('data_type_index') == fingerprint:
+            return False
+
+        self.cur.execute('''BEGIN''')
+        self.cur.execute('''DROP TABLE IF EXISTS DataType''')
+        try:
+            self.cur.execute('''
+                CREATE VIRTUAL TABLE DataType USING fts5(name, label)''')
+        except sqlite3.OperationalError:
+            #sqlite was compiled without FTS5.
+            self.cur.execute('''
+                CREATE TABLE DataType (name TEXT, label TEXT)''')
+        self.cur.executemany(
+            '''INSERT INTO DataType (name, label) VALUES (?,?)''', rows)
+        self._set_metadata('data_type_index', fingerprint)
+        self.conn.commit()
+        return True
+
+    def _get_labels(self):
+        """Return the labels stored in the DataType table.
+
+        Returns:
+            labels: Dictionary of data type name to its non-empty label.
+                Empty if the database has no DataType table.
+        """
+        try:
+            self.cur.execute('''SELECT name, label FROM DataType''')
+        except sqlite3.OperationalError:
+            return {}
+        return dict((name, label) for name, label in self.cur if label)
+
+    def build_indexes(self):
+        """Create indexes on the College table and update sqlite statistics.
+
+        The College table is searched by UNITID when adding data and by INSTNM
+        when plotting. Year tables are keyed by college_id, their INTEGER
+        PRIMARY KEY, so joins with the College table need no extra index.
+        """
+        print('Building indexes...')
+        college_columns = [data_type[0] for data_type in self.data_types
+                           if data_type[2] <= 35]
+        with self.metrics.stage('build_indexes'), self._build_profile():
+            for column in self.INDEXED_COLUMNS:
+                if column not in college_columns: continue
+                self.cur.execute(
+                    '''CREATE INDEX IF NOT EXISTS "College_%s"
+                    ON College (%s)'''
+                    % (self.sanitize(column), self.sanitize(column)))
+            self.cur.execute('''ANALYZE''')
+            self.conn.commit()
 
     def _build_year_tables(self):
         """Execute table-building for the year data."""
-        self._build_table('1996')
-        for year in range(1997, 2015):
-            self._copy_table('1996', str(year))
+        for year in range(1996, 2015):
+            self._build_table(str(year))
+
+    def _build_observation_tables(self):
+        """Create the tables of the long storage layout.
+
+        Metric holds the name and type of each year data type, using its raw
+        data index as metric_id. Year holds the years that data can be added
+        for. Observation holds one row per non-missing value. Its primary key
+        starts with metric_id and college_id, so a college's series for a
+        metric is read with one range scan of the key.
+        """
+        print('Building table: Observation...')
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS Metric (
+            metric_id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE,
+            type TEXT
+            )''')
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS Year (
+            year INTEGER PRIMARY KEY
+            )''')
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS Observation (
+            metric_id INTEGER,
+            college_id INTEGER,
+            year INTEGER,
+            value,
+            PRIMARY KEY (metric_id, college_id, year)
+            ) WITHOUT ROWID''')
+        year_start_index = self._get_year_start_index()
+        self.cur.executemany(
+            '''INSERT OR IGNORE INTO Metric VALUES (?,?,?)''',
+            [(data_type[2], data_type[0], data_type[1])
+             for data_type in self.data_types[year_start_index:]])
+        self.cur.executemany(
+            '''INSERT OR IGNORE INTO Year VALUES (?)''',
+            [(year,) for year in range(1996, 2015)])
 
     def _build_table(self, table_name):
-        """Create database tables and add appropriate columns.
+        """Create a database table with all of its columns.
 
         Uses the data_types file generated by the decoder.py script to determine
         the column names and types of data they hold.
@@ -104,36 +499,44 @@ class Dbbuilder(object):
         upper_limit = 35 if table_name == 'College' else 1742
         autoincrement = "AUTOINCREMENT" if table_name == 'College' else ''
 
-        self.cur.execute('''
-            CREATE TABLE IF NOT EXISTS "%s" (
-            college_id INTEGER PRIMARY KEY %s
-            )''' % (self.sanitize(table_name), autoincrement))
-
+        columns = ['college_id INTEGER PRIMARY KEY %s' % (autoincrement,)]
         for data_type in self.data_types:
             if data_type[2] > upper_limit: break
             if data_type[2] < lower_limit: continue
-            try:
-                self.cur.execute(
-                    '''ALTER TABLE "%s" ADD COLUMN %s %s''' %
-                    (self.sanitize(table_name), self.sanitize(data_type[0]),
-                     self.sanitize(data_type[1])))
-            except sqlite3.OperationalError:
-                pass
-        self.conn.commit()
+            columns.append('%s %s' % (self.sanitize(data_type[0]),
+                                      self.sanitize(data_type[1])))
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS "%s" (
+            %s
+            )''' % (self.sanitize(table_name), ',\n'.join(columns)))
 
-    def update_database(self, raw_data_path, year):
+    def update_database(self, raw_data_path, year, batch_size=500):
         """Update the database with data from a file.
 
-        Also checks the table to see if data already exists in the destination
-        table. Prompts the user to skip if it is already found.
+        The size, modification time and content hash of each added file are
+        stored in the Manifest table. A file that is unchanged since it was
+        last added is skipped. If a year's file has changed, the year's old
+        data is deleted and the new file is added.
+
+        Rows are read in chunks of batch_size and each chunk is written in a
+        single transaction (see _insert_rows). If the file cannot be added,
+        for example because a row is malformed, the year's data is deleted
+        again, and the file is added in full on the next run. The file's rows
+        and the time spent in each stage are recorded as a 'file' stage of
+        the metrics.
 
         Args:
             raw_data_path: String path to the raw data file.
             year: String source year for the data at raw_data_path.
+            batch_size: Number of rows written per transaction.
+
+        Returns:
+            updated: True if data was added, False if the file was skipped.
 
         Raises:
             TypeError: If data types do not exist.
             FileNotFoundError: If the raw data file cannot be found.
+            ValueError: If the batch size is less than 1.
         """
         if self.data_types is None:
             raise TypeError('Data types not loaded')
@@ -142,105 +545,509 @@ class Dbbuilder(object):
             raise FileNotFoundError(
                 'Raw data file not found: %s' % raw_data_path)
 
+        if batch_size < 1:
+            raise ValueError('Batch size must be greater than 0.')
+
+        self._build_manifest_table()
+        if self._is_file_unchanged(raw_data_path, year):
+            print('Year %s is up to date: %s' % (year, raw_data_path))
+            return False
+
         print('Updating database...')
-        #Check if table needs to be updated
-        try:
-            self.cur.execute('''SELECT Count(*) FROM "%s"''' % (year,))
-            count = self.cur.fetchone()[0]
-            if int(count) > 1000:
-                print('Table: %s appears to already contain data. Would you '
-                    'like to continue trying to add the data?' % (year,))
-                selection = ''
-                while selection != 'y' and selection != 'n':
-                    selection = input('(y/n)? ')
-                    selection = str.lower(selection)
-                    if selection == 'n':
-                        return
-        except sqlite3.OperationalError:
-            pass
-        with open(raw_data_path, 'r', encoding='utf-8-sig') as data:
-            entries = len(data.readlines()) - 1
-            count = 0
-            data.seek(0)
-            for line in data:
-                clean_line = decoder.replace_commas(line)
-                if clean_line.startswith('UNITID'):
-                    continue
-                if (count % 500) == 0:
-                    print(count, ' of', entries, 'read from', raw_data_path)
-                self._insert_data_(clean_line, year)
-                count = count + 1
-        self.conn.commit()
+        self._add_file(raw_data_path, year, batch_size)
+        return True
 
-    def _insert_data_(self, data, year):
-        """Insert data into College and year tables.
+    def _add_file(self, raw_data_path, year, batch_size):
+        """Add a raw data file that is not yet in the database.
 
         Args:
-            data: String of raw data from input file.
-            year: String of the data source's year.
+            raw_data_path: String path to the raw data file.
+            year: String source year for the data at raw_data_path.
+            batch_size: Number of rows written per transaction.
         """
-        #Clean the raw data. Ensure that data in clean_data matches the
-        #indices of data types.
-        clean_data = []
-        data_list = data.split(',')
-        for data_type in self.data_types:
-            index = data_type[2]
-            data_point = data_list[index]
-            if data_point[-1] == '\n': data_point = data_point[:-1]
-            if data_point == 'NULL' or data_point == 'PrivacySuppressed':
-                clean_data.append(None)
-            elif data_type[1] == 'INTEGER':
-                clean_data.append(int(data_point))
-            elif data_type[1] == 'REAL':
-                clean_data.append(float(data_point))
+        with self.metrics.stage(
+                'file', path=raw_data_path, year=year) as record, \
+                self._build_profile():
+            self._start_year(raw_data_path, year)
+            record['rows'] = 0
+            #The file is hashed for the Manifest while it is read.
+            digest = hashlib.sha1()
+            try:
+                for rows in _read_batches(raw_data_path, self.row_plan,
+                                          batch_size, self.metrics, digest):
+                    self._insert_rows(rows, year)
+                    record['rows'] += len(rows)
+            except Exception:
+                #The batches already committed are deleted, so that the year
+                #is not left partly added.
+                self._delete_year_data(year)
+                raise
+            self._record_file(raw_data_path, year, digest.hexdigest())
+
+    def update_years(self, year_paths, workers=1, batch_size=500):
+        """Update the database with data from several yearly files.
+
+        With one worker, each file is added in turn by update_database. With
+        more workers, the files are read and converted by a pool of worker
+        processes, which send batches of clean rows over a queue. This
+        process is the only writer to the database, so there is no lock
+        contention. A college's College row holds the data of the earliest
+        year added, as it does when the files are added in year order. The
+        workers send the time they spent reading each file with its last
+        batch. Each file is recorded as a 'file' stage of the metrics, timed
+        from its first batch to its last, as update_database records it.
+
+        Files that are unchanged since they were last added are skipped (see
+        update_database) before the build profile is applied, so a run with
+        nothing to add leaves the database file untouched.
+
+        Args:
+            year_paths: List of (raw_data_path, year) tuples.
+            workers: Number of processes used to read the files.
+            batch_size: Number of rows written per transaction.
+
+        Returns:
+            updated_years: List of the years whose data was added.
+
+        Raises:
+            TypeError: If data types do not exist or workers is not an
+                integer.
+            FileNotFoundError: If a raw data file cannot be found.
+            ValueError: If the batch size or number of workers is less than 1.
+        """
+        decoder._validate_workers(workers)
+        if self.data_types is None:
+            raise TypeError('Data types not loaded')
+        for raw_data_path, _ in year_paths:
+            if not os.path.isfile(raw_data_path):
+                raise FileNotFoundError(
+                    'Raw data file not found: %s' % raw_data_path)
+        if batch_size < 1:
+            raise ValueError('Batch size must be greater than 0.')
+
+        self._build_manifest_table()
+        pending = []
+        for raw_data_path, year in year_paths:
+            if self._is_file_unchanged(raw_data_path, year):
+                print('Year %s is up to date: %s' % (year, raw_data_path))
             else:
-                clean_data.append(data_point)
-
-        #Find the first index for data going to year table. This finds the
-        #index that divides the College table data from the year table data.
-        college_upper_limit = 35
-        year_start_index = 0
-        for i, item in enumerate(self.data_types):
-            if item[2] > college_upper_limit:
-                year_start_index = i
-                break
+                pending.append((raw_data_path, year))
+        if not pending:
+            return []
 
-        #Data insertion into College table
-        unitid = clean_data[0]
-        selected_row = None
-        try:
-            self.cur.execute(
-                '''SELECT * FROM College WHERE UNITID = %s''' % (unitid,))
-            selected_row = self.cur.fetchone()
-        except sqlite3.OperationalError:
-            pass
-        college_id = ''
-        if selected_row is None:
+        if workers == 1:
+            with self._build_profile():
+                for raw_data_path, year in pending:
+                    print('Updating database...')
+                    self._add_file(raw_data_path, year, batch_size)
+            return [year for _, year in pending]
+
+        #The queue is bounded so that readers cannot get far ahead of the
+        #writer and fill memory with rows.
+        queue = multiprocessing.Queue(workers * 2)
+        tasks = [(raw_data_path, year, batch_size)
+                 for raw_data_path, year in pending]
+        paths = dict((year, raw_data_path) for raw_data_path, year in pending)
+        college_years = {}
+        with self._build_profile():
+            print('Updating database with %s workers...' % (workers,))
+            for raw_data_path, year in pending:
+                self._start_year(raw_data_path, year)
+            with multiprocessing.Pool(
+                    min(workers, len(pending)), _init_ingest_worker,
+                    (queue, self.data_types, self.metrics.enabled)) as pool:
+                result = pool.map_async(
+                    _ingest_file, tasks, chunksize=1,
+                    error_callback=lambda error: queue.put(
+                        ('error', None, error)))
+                remaining = set(paths)
+                try:
+                    self._write_batches(queue, result, paths, remaining,
+                                        college_years)
+                except Exception:
+                    #The years not yet recorded are deleted, as in
+                    #update_database.
+                    for year in remaining:
+                        self._delete_year_data(year)
+                    raise
+        return [year for _, year in pending]
+
+    def _write_batches(self, queue, result, paths, remaining,
+                       college_years):
+        """Write the batches sent by ingest workers until every file is done.
+
+        Each file is recorded in the Manifest once its worker sends 'done',
+        and as a 'file' stage of the metrics, timed from its first batch to
+        'done'. Its stages combine the worker's totals with the time this
+        process spent writing its batches.
+
+        Args:
+            queue: multiprocessing.Queue of (message, year, content) tuples
+                sent by _ingest_file.
+            result: multiprocessing.pool.AsyncResult of the ingest tasks.
+            paths: Dictionary of year to the path of its raw data file.
+            remaining: Set of the years not yet done. Years are removed as
+                their files are recorded.
+            college_years: Dictionary of UNITID to the year of the data in
+                the college's College row (see _insert_rows).
+
+        Raises:
+            Exception: The error raised by a worker.
+            RuntimeError: If a worker process exited before finishing its
+                file, e.g. it was killed, or the workers exited without
+                finishing every file.
+        """
+        start_times = {}
+        file_stages = dict((year, {}) for year in remaining)
+        worker_pids = {}
+        was_ready = False
+        while remaining:
+            try:
+                message, year, content = queue.get(
+                    timeout=self.QUEUE_TIMEOUT)
+            except queue_module.Empty:
+                #A killed worker never reports its file, and the pool replaces
+                #it without failing the result. Its file is lost once its
+                #process is no longer a live child. The writer also stops
+                #once the pool has nothing left to run, after one more
+                #timeout, as messages can arrive after the result.
+                live_pids = set(process.pid for process
+                                in multiprocessing.active_children())
+                lost = [year for year in remaining if year in worker_pids
+                        and worker_pids[year] not in live_pids]
+                if lost or was_ready:
+                    raise RuntimeError(
+                        'Ingest workers exited without finishing years: %s'
+                        % ', '.join(str(year)
+                                    for year in sorted(lost or remaining)))
+                was_ready = result.ready()
+                continue
+            if message == 'start':
+                worker_pids[year] = content
+            elif message == 'rows':
+                start_times.setdefault(year, time.perf_counter())
+                before = self.metrics.get_seconds()
+                self._insert_rows(content, year, college_years)
+                stages = file_stages[year]
+                for name, seconds in self.metrics.get_seconds_since(
+                        before).items():
+                    stages[name] = stages.get(name, 0.0) + seconds
+            elif message == 'done':
+                totals, file_hash = content
+                self._record_file(paths[year], year, file_hash)
+                remaining.discard(year)
+                self.metrics.merge(totals)
+                stages = file_stages[year]
+                for name, (seconds, _) in totals.items():
+                    stages[name] = stages.get(name, 0.0) + seconds
+                end_time = time.perf_counter()
+                self.metrics.add_stage(
+                    'file', end_time - start_times.get(year, end_time),
+                    {'path': paths[year], 'year': year,
+                     'rows': totals.get('convert', (0, 0))[1]},
+                    stages)
+            else:
+                raise content
+
+    def _build_manifest_table(self):
+        """Create the Manifest table recording the raw data files added."""
+        self.cur.execute('''
+            CREATE TABLE IF NOT EXISTS Manifest (
+            year TEXT PRIMARY KEY,
+            path TEXT,
+            size INTEGER,
+            mtime INTEGER,
+            hash TEXT
+            )''')
+
+    def _is_file_unchanged(self, raw_data_path, year):
+        """Check whether a year's raw data file has already been added.
+
+        The file is hashed only if its size matches the Manifest but its
+        modification time does not. If the content is unchanged, the new
+        modification time is recorded.
+
+        Args:
+            raw_data_path: String path to the raw data file.
+            year: String source year for the data at raw_data_path.
+
+        Returns:
+            boolean: True if the file's data is already in the database.
+        """
+        self.cur.execute(
+            '''SELECT size, mtime, hash FROM Manifest WHERE year = ?''',
+            (year,))
+        entry = self.cur.fetchone()
+        if entry is None:
+            return False
+        stat = os.stat(raw_data_path)
+        if stat.st_size != entry[0]:
+            return False
+        if stat.st_mtime_ns == entry[1]:
+            return True
+        if self._hash_file(raw_data_path) != entry[2]:
+            return False
+        with self.conn:
             self.cur.execute(
-                '''INSERT INTO College VALUES %s''' %
-                (self._question_generator(
-                    len(clean_data[:year_start_index])+1)),
-                ([None] + clean_data[:year_start_index]))
+                '''UPDATE Manifest SET path = ?, mtime = ? WHERE year = ?''',
+                (raw_data_path, stat.st_mtime_ns, year))
+        return True
+
+    def _record_file(self, raw_data_path, year, file_hash):
+        """Record a raw data file added to the database in the Manifest table.
+
+        Args:
+            raw_data_path: String path to the raw data file.
+            year: String source year for the data at raw_data_path.
+            file_hash: SHA-1 hex digest of the file computed while it was
+                read.
+        """
+        stat = os.stat(raw_data_path)
+        with self.conn:
             self.cur.execute(
-                '''SELECT college_id FROM College WHERE UNITID = %s''' %
-                (self.sanitize(str(unitid)),))
-            college_id = self.cur.fetchone()[0]
-        else:
-            college_id = selected_row[0]
+                '''INSERT OR REPLACE INTO Manifest VALUES (?,?,?,?,?)''',
+                (year, raw_data_path, stat.st_size, stat.st_mtime_ns,
+                 file_hash))
+
+    @staticmethod
+    def _hash_file(path):
+        """Return the SHA-1 hex digest of a file's content.
+
+        Args:
+            path: String path of the file.
+
+        Returns:
+            digest: String hex digest of the file.
+        """
+        file_hash = hashlib.sha1()
+        with open(path, 'rb') as data_file:
+            for chunk in iter(lambda: data_file.read(1024*1024), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def _start_year(self, raw_data_path, year):
+        """Prepare the database for adding a year's raw data file.
 
-        #Data insertion into year table using the college_id from College table
+        The year's old data is only deleted if the Manifest records the
+        year, either as added or as being added. The first load of a year
+        skips the delete, which scans the whole Observation table in the
+        long layout. The year is then recorded without a size or hash until
+        _record_file, so that the data committed by an interrupted load is
+        deleted on the next run.
+
+        Args:
+            raw_data_path: String path to the raw data file.
+            year: String source year for the data at raw_data_path.
+        """
         self.cur.execute(
-            '''SELECT * FROM "%s" WHERE college_id = %s''' % (year, college_id))
-        selected_row = self.cur.fetchone()
-        if selected_row is None:
+            '''SELECT year FROM Manifest WHERE year = ?''', (year,))
+        if self.cur.fetchone():
+            self._delete_year_data(year)
+        with self.conn:
+            self.cur.execute(
+                '''INSERT INTO Manifest (year, path) VALUES (?,?)''',
+                (year, raw_data_path))
+
+    def _delete_year_data(self, year):
+        """Delete the data of a year, so that its file can be added again.
+
+        Args:
+            year: String source year of the data.
+        """
+        with self.conn:
             self.cur.execute(
-                '''INSERT INTO "%s" VALUES %s''' %
-                (year,
-                 self._question_generator(
-                    len(clean_data[year_start_index:])+1)),
-                [college_id] + clean_data[year_start_index:])
-        else:
-            print('Year row already in table')
+                '''DELETE FROM Manifest WHERE year = ?''', (year,))
+            if self.layout == 'long':
+                self.cur.execute(
+                    '''DELETE FROM Observation WHERE year = ?''',
+                    (int(year),))
+            else:
+                self.cur.execute(
+                    '''DELETE FROM "%s"''' % (self.sanitize(year),))
+
+    def _insert_data_(self, data, year):
+        """Insert data into College and year tables.
+
+        Args:
+            data: String of raw data from input file.
+            year: String of the data source's year.
+        """
+        self._insert_rows([self._clean_data(decoder.split_line(data))], year)
+
+    def _clean_data(self, data_list):
+        """Convert a row of raw data to a list of typed values.
+
+        Args:
+            data_list: List of string values of a row from the input file
+                (see decoder.read_rows).
+
+        Returns:
+            clean_data: List of values matching the indices of data types.
+                Missing values are None.
+        """
+        return self.row_plan.convert(data_list)
+
+    def _get_year_start_index(self):
+        """Return the index of the first data type belonging to year tables.
+
+        This finds the index that divides the College table data from the
+        year table data in a list of clean data.
+
+        Returns:
+            year_start_index: Index of the first year table data type.
+        """
+        return self.row_plan.year_start_index
+
+    def _insert_rows(self, rows, year, college_years=None):
+        """Insert a chunk of clean data rows into College and year tables.
+
+        The college_ids of the chunk are resolved from the college_ids
+        dictionary. New colleges and the year rows are then written with
+        executemany inside a single transaction. Year rows that already exist
+        are skipped. The time spent inserting and committing is added to the
+        metrics, and the rest of the time to the 'college_lookup' stage.
+
+        Args:
+            rows: List of clean data lists (see _clean_data).
+            year: String of the data source's year.
+            college_years: Optional dictionary of UNITID to the year of the
+                data in the college's College row, for colleges added while
+                years are added out of order. A College row is replaced when
+                data from an earlier year arrives.
+        """
+        start_time = time.perf_counter()
+        insert_seconds = 0.0
+        year_start_index = self._get_year_start_index()
+        college_ids = self.college_ids
+
+        #Only the first row of a new college is written to College table.
+        new_colleges = {}
+        for row in rows:
+            if row[0] not in college_ids and row[0] not in new_colleges:
+                new_colleges[row[0]] = [None] + row[:year_start_index]
+
+        earlier_colleges = {}
+        if college_years is not None:
+            for row in rows:
+                if (row[0] in college_years and
+                        int(year) < int(college_years[row[0]])):
+                    earlier_colleges[row[0]] = row[:year_start_index]
+
+        new_ids = {}
+        with self.conn:
+            if new_colleges:
+                insert_start = time.perf_counter()
+                self.cur.executemany(
+                    '''INSERT INTO College VALUES %s''' %
+                    (self._question_generator(year_start_index+1),),
+                    list(new_colleges.values()))
+                insert_seconds += time.perf_counter() - insert_start
+                new_ids = self._get_college_ids(list(new_colleges))
+
+            insert_start = time.perf_counter()
+            if earlier_colleges:
+                columns = [self.sanitize(data_type[0]) for data_type
+                           in self.data_types[:year_start_index]]
+                self.cur.executemany(
+                    '''UPDATE College SET %s WHERE college_id = ?''' %
+                    (', '.join('%s = ?' % column for column in columns),),
+                    [values + [college_ids[unitid]]
+                     for unitid, values in earlier_colleges.items()])
+
+            insert_seconds += time.perf_counter() - insert_start
+
+            row_ids = [new_ids[row[0]] if row[0] in new_ids
+                       else college_ids[row[0]] for row in rows]
+            insert_start = time.perf_counter()
+            if self.layout == 'long':
+                self._insert_observations(
+                    rows, row_ids, year, year_start_index)
+            else:
+                self._insert_year_rows(rows, row_ids, year, year_start_index)
+            commit_start = time.perf_counter()
+            insert_seconds += commit_start - insert_start
+        self.metrics.add('commit', time.perf_counter() - commit_start)
+        self.metrics.add('insert', insert_seconds, len(rows))
+        self.metrics.add('college_lookup',
+                         commit_start - start_time - insert_seconds, len(rows))
+        #Only record the new colleges once the transaction has committed.
+        college_ids.update(new_ids)
+        if college_years is not None:
+            for unitid in list(new_ids) + list(earlier_colleges):
+                college_years[unitid] = year
+
+    def _insert_year_rows(self, rows, row_ids, year, year_start_index):
+        """Insert the year data of clean data rows into a year table.
+
+        Args:
+            rows: List of clean data lists (see _clean_data).
+            row_ids: List of the college_id of each row.
+            year: String of the data source's year.
+            year_start_index: Index of the first year data type in each row.
+        """
+        self.cur.executemany(
+            '''INSERT OR IGNORE INTO "%s" VALUES %s''' %
+            (self.sanitize(year),
+             self._question_generator(
+                len(self.data_types) - year_start_index + 1)),
+            [[college_id] + row[year_start_index:]
+             for college_id, row in zip(row_ids, rows)])
+        skipped = len(rows) - self.cur.rowcount
+        if skipped > 0:
+            print('%s year rows already in table' % (skipped,))
+
+    def _insert_observations(self, rows, row_ids, year, year_start_index):
+        """Insert the year data of clean data rows into the Observation table.
+
+        Missing values are not stored.
+
+        Args:
+            rows: List of clean data lists (see _clean_data).
+            row_ids: List of the college_id of each row.
+            year: String of the data source's year.
+            year_start_index: Index of the first year data type in each row.
+        """
+        year = int(year)
+        metric_ids = [data_type[2]
+                      for data_type in self.data_types[year_start_index:]]
+        self.cur.execute('''INSERT OR IGNORE INTO Year VALUES (?)''', (year,))
+        self.cur.executemany(
+            '''INSERT OR IGNORE INTO Observation VALUES (?,?,?,?)''',
+            [(metric_id, college_id, year, value)
+             for college_id, row in zip(row_ids, rows)
+             for metric_id, value in zip(metric_ids, row[year_start_index:])
+             if value is not None])
+
+    def _get_college_ids(self, unitids=None):
+        """Return the college_ids of colleges already in the College table.
+
+        Args:
+            unitids: List of UNITID values to look up, or None to return every
+                college in the table.
+
+        Returns:
+            college_ids: Dictionary of UNITID to college_id. UNITIDs not found
+                in the College table are left out.
+        """
+        college_ids = {}
+        if unitids is None:
+            try:
+                self.cur.execute('''SELECT UNITID, college_id FROM College''')
+            except sqlite3.OperationalError:
+                return college_ids
+            college_ids.update(self.cur.fetchall())
+            return college_ids
+        unitids = list(set(unitids))
+        for start in range(0, len(unitids), self.MAX_VARIABLES):
+            chunk = unitids[start:start + self.MAX_VARIABLES]
+            try:
+                self.cur.execute(
+                    '''SELECT UNITID, college_id FROM College WHERE UNITID IN
+                    %s''' % (self._question_generator(len(chunk)),), chunk)
+            except sqlite3.OperationalError:
+                continue
+            college_ids.update(self.cur.fetchall())
+        return college_ids
 
     @staticmethod
     def _question_generator(number):
@@ -291,20 +1098,258 @@ class Dbbuilder(object):
         return string
 
 
-    def _copy_table(self, source_table, target_table):
-        """Create a copy of an existing database table with a different name.
+class RowPlan(object):
+    """Precompiled plan for converting raw data rows to typed values.
+
+    The plan is built once from the data types. For each column type, an
+    operator.itemgetter selects the type's values from a raw row and map
+    converts them. Numeric converters memoize the values they have seen, so
+    the common values such as NULL are converted by a dictionary lookup in C.
+    A final itemgetter puts the values back in data type order.
+
+    Attributes:
+        data_types: List of the data types (columns) in the database.
+        year_start_index: Index of the first data type belonging to year
+            tables. Data types before it belong to the College table.
+    """
+
+    #Values of the data types after this raw data index belong to the year
+    #tables.
+    COLLEGE_UPPER_LIMIT = 35
+
+    #Clean value of each missing value in a TEXT column.
+    MISSING_TEXT = dict((value, None) for value in decoder.MISSING_VALUES)
 
-        For the year tables that contain the same columns, this is faster than
-        building each year table from the raw data.
+    def __init__(self, data_types):
+        self.data_types = data_types
+
+        self.year_start_index = 0
+        for i, item in enumerate(data_types):
+            if item[2] > self.COLLEGE_UPPER_LIMIT:
+                self.year_start_index = i
+                break
+
+        #One step per column type: (getter of raw values, lookup, is_text).
+        #Numeric values are looked up in a memoizing _ValueConverter. Text
+        #values are looked up in MISSING_TEXT with themselves as default.
+        #_converters maps each numeric column type to its _ValueConverter.
+        self._steps = []
+        self._converters = {}
+        positions = []
+        for type_name in decoder.DATA_TYPES:
+            type_positions = [position for position, data_type
+                              in enumerate(data_types)
+                              if data_type[1] == type_name]
+            if not type_positions:
+                continue
+            getter = _tuple_getter(
+                [data_types[position][2] for position in type_positions])
+            if type_name == 'TEXT':
+                self._steps.append((getter, self.MISSING_TEXT.get, True))
+            else:
+                converter = self._converters[type_name] = _ValueConverter(
+                    float if type_name == 'REAL' else int)
+                self._steps.append((getter, converter.__getitem__, False))
+            positions.extend(type_positions)
+
+        order = [0] * len(positions)
+        for converted_index, position in enumerate(positions):
+            order[position] = converted_index
+        self._order = _tuple_getter(order)
+
+    def convert(self, data_list):
+        """Convert a row of raw data to a list of typed values.
 
         Args:
-            source_table: String name of the existing table to be copied.
-            target_table: String name of the new table.
+            data_list: List of string values of a row from the input file
+                (see decoder.read_rows).
+
+        Returns:
+            clean_data: List of values matching the indices of data types.
+                Missing values are None.
         """
-        self.cur.execute(
-            '''SELECT sql FROM sqlite_master WHERE type='table' AND name ="%s"
-            ''' % (self.sanitize(source_table)))
-        statement = self.cur.fetchone()[0]
-        new_statement = statement.replace(
-            self.sanitize(source_table), self.sanitize(target_table), 1)
-        self.cur.execute(new_statement)
+        values = []
+        for getter, lookup, is_text in self._steps:
+            raw_values = getter(data_list)
+            if is_text:
+                values += map(lookup, raw_values, raw_values)
+            else:
+                values += map(lookup, raw_values)
+        return list(self._order(values))
+
+class _ValueConverter(dict):
+    """Memoizing converter of raw data strings to numbers.
+
+    Looking up a raw value returns the converted value. Missing values are
+    converted to None.
+
+    Attributes:
+        function: Function converting a string to a number (int or float).
+    """
+
+    #Maximum number of distinct values remembered before starting over.
+    MAX_VALUES = 100000
+
+    def __init__(self, function):
+        dict.__init__(self)
+        self.function = function
+        self._reset()
+
+    def __missing__(self, value):
+        if len(self) > self.MAX_VALUES:
+            self._reset()
+        converted = self[value] = self.function(value)
+        return converted
+
+    def _reset(self):
+        """Forget the converted values except the missing values."""
+        self.clear()
+        for value in decoder.MISSING_VALUES:
+            self[value] = None
+
+def _tuple_getter(indices):
+    """Return a function that selects a tuple of items from a sequence.
+
+    operator.itemgetter returns a single item instead of a tuple when given
+    one index, so that case is wrapped.
+
+    Args:
+        indices: List of integer indices to select.
+
+    Returns:
+        getter: Function returning a tuple of the selected items.
+    """
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda sequence: (sequence[index],)
+    return operator.itemgetter(*indices)
+
+class _ByteCounter(io.RawIOBase):
+    """Binary file reader counting and hashing the bytes read.
+
+    Attributes:
+        raw_file: File object opened in binary mode.
+        digest: hashlib hash object updated with the bytes read, or None.
+        position: Number of bytes read.
+    """
+
+    def __init__(self, raw_file, digest=None):
+        io.RawIOBase.__init__(self)
+        self.raw_file = raw_file
+        self.digest = digest
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw_file.readinto(buffer)
+        if count:
+            self.position += count
+            if self.digest is not None:
+                self.digest.update(memoryview(buffer)[:count])
+        return count
+
+def _read_batches(raw_data_path, row_plan, batch_size, metrics=None,
+                  digest=None):
+    """Read a raw data file and yield its rows as batches of clean data.
+
+    The file is read once, one batch at a time, so memory use does not
+    depend on the file size. Progress is printed as the share of the file's
+    bytes read. The number of values of each row is checked against the
+    header while it is read (see Validator.check_raw_rows).
+
+    Each batch is tokenized, then converted, so that the time of each step
+    can be recorded. Reading the lines is timed separately from tokenizing
+    them only if metrics are enabled.
+
+    Args:
+        raw_data_path: String path to the raw data file.
+        row_plan: RowPlan converting raw data rows to typed values.
+        batch_size: Maximum number of rows in each batch.
+        metrics: Metrics recording the 'read', 'tokenize' and 'convert'
+            stages, or None.
+        digest: hashlib hash object updated with the file's content, or
+            None. It holds the hash of the whole file once every batch has
+            been read.
+
+    Yields:
+        rows: List of clean data lists (see RowPlan.convert).
+
+    Raises:
+        ValueError: If a row has a different number of values than the
+            header.
+    """
+    convert = row_plan.convert
+    timed = metrics is not None and metrics.enabled
+    with open(raw_data_path, 'rb') as raw_file:
+        size = os.fstat(raw_file.fileno()).st_size
+        counter = _ByteCounter(raw_file, digest)
+        data = io.TextIOWrapper(
+            io.BufferedReader(counter, 1024*1024), encoding='utf-8-sig',
+            newline='')
+        lines = TimedIterator(data) if timed else data
+        tokens = Validator.check_raw_rows(decoder.read_rows(lines))
+        count = 0
+        while True:
+            start_time = time.perf_counter()
+            read_seconds = lines.seconds if timed else 0.0
+            values_list = list(itertools.islice(tokens, batch_size))
+            if not values_list:
+                break
+            values_list = [values for values in values_list
+                           if values[0] != 'UNITID']
+            tokenize_end = time.perf_counter()
+            rows = [convert(values) for values in values_list]
+            if timed:
+                read_seconds = lines.seconds - read_seconds
+                metrics.add('read', read_seconds)
+                metrics.add('tokenize',
+                            tokenize_end - start_time - read_seconds,
+                            len(rows))
+                metrics.add('convert', time.perf_counter() - tokenize_end,
+                            len(rows))
+            if rows:
+                count += len(rows)
+                print('%3d%% of %s read, %d rows'
+                      % (100 * counter.position // max(size, 1),
+                         raw_data_path, count))
+                yield rows
+
+#State of an ingest worker process, set by _init_ingest_worker.
+_worker_state = {}
+
+def _init_ingest_worker(queue, data_types, metrics_enabled=False):
+    """Store the queue and row plan of an ingest worker process.
+
+    Args:
+        queue: multiprocessing.Queue the clean rows are sent to.
+        data_types: List of the data types (columns) in the database.
+        metrics_enabled: If True, the time spent reading each file is
+            recorded.
+    """
+    _worker_state['queue'] = queue
+    _worker_state['row_plan'] = RowPlan(data_types)
+    _worker_state['metrics_enabled'] = metrics_enabled
+
+def _ingest_file(task):
+    """Read a raw data file in a worker process and queue its clean rows.
+
+    Sends ('start', year, pid) with the worker's process id, ('rows', year,
+    rows) for each batch and ('done', year, (totals, file_hash)) once the
+    whole file has been read, totals being the Metrics totals of the file's
+    'read', 'tokenize' and 'convert' stages and file_hash the SHA-1 hex
+    digest of the file.
+
+    Args:
+        task: Tuple of (raw_data_path, year, batch_size).
+    """
+    raw_data_path, year, batch_size = task
+    queue = _worker_state['queue']
+    metrics = Metrics(_worker_state['metrics_enabled'])
+    digest = hashlib.sha1()
+    queue.put(('start', year, os.getpid()))
+    for rows in _read_batches(raw_data_path, _worker_state['row_plan'],
+                              batch_size, metrics, digest):
+        queue.put(('rows', year, rows))
+    queue.put(('done', year, (metrics.totals, digest.hexdigest())))
@@ -0,0 +1,76 @@
+"""
+dbschema.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+#Functions reading the layout, years and year data types of a database built
+#by Dbbuilder, shared by the modules that read the database.
+
+
+def get_layout(cur):
+    """Return the storage layout of a database's year data.
+
+    Args:
+        cur: sqlite3 cursor of the database.
+
+    Returns:
+        layout: 'long' if the year data is stored in the Observation table,
+            otherwise 'wide'.
+    """
+    cur.execute('''
+        SELECT name FROM sqlite_master WHERE name = "Observation"''')
+    return 'long' if cur.fetchone() else 'wide'
+
+
+def get_years(cur, layout):
+    """Return the years of a database.
+
+    Args:
+        cur: sqlite3 cursor of the database.
+        layout: Storage layout of the database, 'wide' or 'long'.
+
+    Returns:
+        years: Sorted list of integer years.
+    """
+    if layout == 'long':
+        cur.execute('''SELECT year FROM Year ORDER BY year''')
+        return [row[0] for row in cur.fetchall()]
+    #Year tables are named by year; skip College and sqlite tables.
+    cur.execute('''SELECT name FROM sqlite_master WHERE type = "table"''')
+    return sorted(int(row[0]) for row in cur.fetchall() if row[0].isdigit())
+
+
+def get_year_data_types(cur, layout, years):
+    """Return the numeric year data types of a database.
+
+    Args:
+        cur: sqlite3 cursor of the database.
+        layout: Storage layout of the database, 'wide' or 'long'.
+        years: List of the database's years, as returned by get_years.
+
+    Returns:
+        data_types: List of (name, key) tuples in column order, where key is
+            the metric_id of the long layout or the column name of the wide
+            layout.
+    """
+    if layout == 'long':
+        cur.execute('''SELECT name, metric_id FROM Metric WHERE
+                    type != 'TEXT' ORDER BY metric_id''')
+        return cur.fetchall()
+    if not years:
+        return []
+    cur.execute('''PRAGMA table_info("%d")''' % years[0])
+    return [(entry[1], entry[1]) for entry in cur.fetchall()
+            if entry[1] != 'college_id' and entry[2] != 'TEXT']
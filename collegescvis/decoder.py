@@ -15,18 +15,30 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+import csv
 import glob
 import json
+import multiprocessing
 
-def write_data_types(data_path, dest_path):
+#Values in the raw data that represent a missing data point.
+MISSING_VALUES = ('NULL', 'PrivacySuppressed')
+
+#Column types ordered from narrowest to widest. A column is promoted along
+#this lattice (INTEGER -> REAL -> TEXT) and never demoted.
+DATA_TYPES = ('INTEGER', 'REAL', 'TEXT')
+_INTEGER, _REAL, _TEXT = range(len(DATA_TYPES))
+
+def write_data_types(data_path, dest_path, workers=1):
     """Write the data index information in JSON format to a target file.
 
     Args:
         data_path: Path to the folder containing Scorecard data files.
         dest_path: Path to the destination data_types file.
+        workers: Number of processes used to read the data files.
     """
     _validate_data_path(data_path)
-    data_types = _get_data_types(glob.glob(data_path))
+    _validate_workers(workers)
+    data_types = _get_data_types(glob.glob(data_path), workers)
     with open(dest_path, 'w') as data_file:
         data_file.write(json.dumps(data_types))
         data_file.close()
@@ -46,12 +58,28 @@ def _validate_data_path(data_path):
     if not glob.glob(data_path):
         raise FileNotFoundError('No raw data files found')
 
-def _get_data_types(data_path):
+def _validate_workers(workers):
+    """Raise exceptions for an invalid number of worker processes.
+
+    Args:
+        workers: Number of processes used to read the data files.
+
+    Raises:
+        TypeError: If the number of workers is not an integer.
+        ValueError: If the number of workers is less than 1.
+    """
+    if not isinstance(workers, int):
+        raise TypeError('Number of workers is not an integer')
+    if workers < 1:
+        raise ValueError('Number of workers must be greater than 0')
+
+def _get_data_types(data_path, workers=1):
     """Return a list of data-containing indices, the data type, and the index.
 
     Each input file is read to see if there is some valid data for each
     category within the College Scorecard raw data. If a category has no valid
-    data, it is ignored and not included in the list.
+    data, it is ignored and not included in the list. The type of a category
+    is taken from the first file in which it contains valid data.
 
     Args:
         data_path: Path to the folder containing Scorecard data files.
@@ -63,47 +91,116 @@ def _get_data_types(data_path):
 
         [ ('UNITID', 'INTEGER', 0), ('OPEID', 'TEXT', 1), ... ]
     """
+    if workers > 1:
+        with multiprocessing.Pool(min(workers, len(data_path))) as pool:
+            return _merge_file_types(pool.imap(_get_file_types, data_path))
+    return _merge_file_types(map(_get_file_types, data_path))
+
+def _merge_file_types(file_types_list):
+    """Merge the data types of several files into a single list.
+
+    Args:
+        file_types_list: Iterable of file_types lists, in file order.
+
+    Returns:
+        tuple_list: A list of (name, type, index) tuples sorted by index.
+    """
     tuple_list = []
-    for input_file in data_path:
-        print('Reading...', input_file)
-        with open(input_file, 'r', encoding='utf-8-sig') as data_file:
-            lines = data_file.readlines()
-
-            #One empty list for each data type found in the first line of the
-            #raw data file.
-            data_list = [[] for count in lines[0].split(',')]
-
-            #Fill each list with all the values for the data type
-            for line in lines:
-                new_line = replace_commas(line)
-                index = 0
-                for entry in new_line.split(','):
-                    if entry[-1] == '\n': entry = entry[:-1]
-                    data_list[index].append(entry)
-                    index += 1
-
-            #Add only the data types that contain valid data
-            good_indices = []
-            for data_index in range(len(data_list)):
-                #Skip if the data index is already in the tuple list
-                if any(data_index == entry[2] for entry in tuple_list): continue
-                if _is_good_data(data_list[data_index]):
-                    good_indices.append(data_index)
-            print(
-                str(len(good_indices)) + ' data types added to list.')
-            for index in good_indices:
-                #Special case: make zip code data TEXT instead of INTEGER
-                if index == 6:
-                    data_type = 'TEXT'
-                else:
-                    data_type = _find_type(data_list[index])
-                tup = (data_list[index][0], data_type, index)
-                if tup not in tuple_list: tuple_list.append(tup)
+    for file_types in file_types_list:
+        known_indices = set(entry[2] for entry in tuple_list)
+        new_types = [tup for tup in file_types if tup[2] not in known_indices]
+        tuple_list.extend(new_types)
+        print(str(len(new_types)) + ' data types added to list.')
     return sorted(tuple_list, key=lambda x: x[2])
 
+def _get_file_types(input_file):
+    """Return the data types found in a single raw data file.
+
+    The file is streamed row by row. Only one type rank is kept per column, so
+    memory use depends on the number of columns rather than the file size.
+
+    Args:
+        input_file: Path to a Scorecard raw data file.
+
+    Returns:
+        file_types: A list of (name, type, index) tuples for each column of
+            the file that contains at least one good value.
+    """
+    print('Reading...', input_file)
+    with open(input_file, 'r', encoding='utf-8-sig', newline='') as data_file:
+        rows = read_rows(data_file)
+        names = next(rows)
+
+        #One rank per column, None until a good value has been seen.
+        ranks = [None] * len(names)
+        for row in rows:
+            for index, value in enumerate(row):
+                rank = ranks[index]
+                if rank == _TEXT or value in MISSING_VALUES: continue
+                ranks[index] = _promote_type(rank, value)
+
+    file_types = []
+    for index, rank in enumerate(ranks):
+        if rank is None: continue
+        #Special case: make zip code data TEXT instead of INTEGER
+        if index == 6: rank = _TEXT
+        file_types.append((names[index], DATA_TYPES[rank], index))
+    return file_types
+
+def read_rows(data_file):
+    """Return an iterator over the rows of a raw data file.
+
+    Each line is split in a single pass without rebuilding it. Lines without
+    quotation marks are split with str.split. In lines with quoted values,
+    everything up to the last quotation mark is split by the csv module's C
+    reader, so quoted values keep any commas they contain, and the remaining
+    numeric columns are split with str.split. A quoted value containing a
+    line break is joined with the following lines. Line endings are removed.
+
+    Args:
+        data_file: Iterable of lines, such as a file object of College
+            Scorecard raw data opened with newline=''.
+
+    Returns:
+        rows: Iterator yielding a list of string values for each line.
+    """
+    lines = iter(data_file)
+    for line in lines:
+        if '"' in line:
+            #An odd number of quotation marks leaves a quoted value open.
+            while line.count('"') % 2:
+                next_line = next(lines, None)
+                if next_line is None: break
+                line += next_line
+            yield split_line(line)
+        else:
+            yield line.rstrip('\r\n').split(',')
+
+def split_line(line):
+    """Split a single line of raw data into a list of values.
+
+    Args:
+        line: line of data from data file.
+
+    Returns:
+        values: List of string values, as returned by read_rows.
+    """
+    line = line.rstrip('\r\n')
+    if '"' not in line:
+        return line.split(',')
+    end = line.rfind('"') + 1
+    values = line[end:].split(',')
+    if values[0]:
+        #Characters follow the last quotation mark in the same value.
+        return next(csv.reader([line]))
+    values[0:1] = next(csv.reader([line[:end]]))
+    return values
+
 def replace_commas(string):
     """Replace commas that exist in the data as part of string data.
 
+    Superseded by read_rows, which keeps the commas of quoted values.
+
     Some string data can contain commas that interfere with
     the breaking apart of the csv data. These commas need to be
     replaced before calling line.split(','). In the data these
@@ -159,7 +256,7 @@ def _is_good_data(entry):
         boolean: True if there is at least one good data value in entry
     """
     for value in entry[1:]:
-        if value in ('NULL', 'PrivacySuppressed'):
+        if value in MISSING_VALUES:
             continue
         else:
             return True
@@ -176,18 +273,35 @@ def _find_type(entry):
             'TEXT'.
     """
     _validate_scorecard_entry(entry)
-    data_type = 'INTEGER'
+    rank = _INTEGER
     for value in entry[1:]:
-        if value in ('NULL', 'PrivacySuppressed'):
-            continue
-        else:
-            try:
-                int(value)
-            except ValueError:
-                try:
-                    float(value)
-                    data_type = 'REAL'
-                except ValueError:
-                    str(value)
-                    data_type = 'TEXT'
-    return data_type
+        if value in MISSING_VALUES: continue
+        rank = _promote_type(rank, value)
+        if rank == _TEXT: break
+    return DATA_TYPES[rank]
+
+def _promote_type(rank, value):
+    """Return the type rank of a column after reading a good value.
+
+    Args:
+        rank: Current rank of the column in DATA_TYPES, or None if no good
+            value has been read yet.
+        value: String value read from the column.
+
+    Returns:
+        rank: The narrowest rank in DATA_TYPES holding both the current rank
+            and the new value.
+    """
+    if rank is None or rank == _INTEGER:
+        try:
+            int(value)
+            return _INTEGER
+        except ValueError:
+            pass
+    if rank != _TEXT:
+        try:
+            float(value)
+            return _REAL
+        except ValueError:
+            pass
+    return _TEXT
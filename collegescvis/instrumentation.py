@@ -0,0 +1,217 @@
+"""
+instrumentation.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import contextlib
+import json
+import sys
+import time
+try:
+    import resource
+except ImportError:
+    #The resource module is not available on Windows.
+    resource = None
+
+
+def get_peak_memory():
+    """Return the peak resident memory of the process in KiB.
+
+    Returns:
+        peak: Integer KiB, or None if it cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        #macOS reports bytes rather than KiB.
+        peak //= 1024
+    return peak
+
+
+class TimedIterator(object):
+    """Iterator adding up the time spent getting items from another iterable.
+
+    Attributes:
+        seconds: Total seconds spent in the wrapped iterator.
+    """
+
+    def __init__(self, iterable):
+        self._next = iter(iterable).__next__
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start_time = time.perf_counter()
+        try:
+            return self._next()
+        finally:
+            self.seconds += time.perf_counter() - start_time
+
+
+class Metrics(object):
+    """Records the time, rows and peak memory of processing stages.
+
+    Long stages, such as adding a file, are timed with the stage context
+    manager. Each writes a JSON line to the sink with its time, rows, rows per
+    second, peak memory and the time of the stages added within it. Frequent
+    stages, such as converting a batch of rows, only add their time and rows
+    to the totals with add.
+
+    Attributes:
+        enabled: If False, nothing is recorded or written.
+        sink: File object the JSON lines are written to, or None.
+        start_time: perf_counter time the metrics were created.
+        totals: Dictionary of stage name to [seconds, rows], in the order the
+            stages were first recorded.
+    """
+
+    def __init__(self, enabled=True, sink=None):
+        self.enabled = enabled
+        self.sink = sink
+        self.start_time = time.perf_counter()
+        self.totals = {}
+
+    def add(self, name, seconds, rows=0):
+        """Add the time and rows of a stage to its totals.
+
+        Args:
+            name: String name of the stage.
+            seconds: Seconds spent in the stage.
+            rows: Number of rows processed by the stage.
+        """
+        if not self.enabled:
+            return
+        total = self.totals.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += rows
+
+    def merge(self, totals):
+        """Add the totals of another Metrics, such as a worker process's.
+
+        Args:
+            totals: Dictionary of stage name to (seconds, rows).
+        """
+        for name, (seconds, rows) in totals.items():
+            self.add(name, seconds, rows)
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """Context manager timing a stage and writing it to the sink.
+
+        Args:
+            name: String name of the stage.
+            **fields: Values written with the stage, such as a file path.
+
+        Yields:
+            record: Dictionary written with the stage. Setting its 'rows'
+                item adds the rows to the totals and the rows per second to
+                the record.
+        """
+        record = dict(fields)
+        if not self.enabled:
+            yield record
+            return
+        before = self.get_seconds()
+        start_time = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start_time
+            stages = self.get_seconds_since(before)
+            stages.pop(name, None)
+            self.add_stage(name, seconds, record, stages)
+
+    def add_stage(self, name, seconds, record, stages=None):
+        """Add a timed stage to its totals and write it to the sink.
+
+        Used by stage, and for stages timed elsewhere, such as a file added
+        by worker processes.
+
+        Args:
+            name: String name of the stage.
+            seconds: Seconds spent in the stage.
+            record: Dictionary written with the stage. Its 'rows' item adds
+                the rows to the totals, and the rows per second and stages
+                are added to it.
+            stages: Dictionary of the name of each stage within this one to
+                the seconds spent in it.
+        """
+        if not self.enabled:
+            return
+        rows = record.get('rows', 0)
+        self.add(name, seconds, rows)
+        if rows and seconds:
+            record['rows_per_second'] = rows / seconds
+        if stages:
+            record['stages'] = stages
+        self.emit('stage', stage=name, seconds=seconds, **record)
+
+    def get_seconds(self):
+        """Return a dictionary of each stage name to its total seconds."""
+        return dict((name, total[0]) for name, total in self.totals.items())
+
+    def get_seconds_since(self, before):
+        """Return the seconds added to each stage since get_seconds.
+
+        Args:
+            before: Dictionary returned by get_seconds.
+
+        Returns:
+            seconds: Dictionary of the name of each stage whose total
+                changed to the seconds added to it.
+        """
+        return dict((name, total[0] - before.get(name, 0.0))
+                    for name, total in self.totals.items()
+                    if total[0] != before.get(name, 0.0))
+
+    def emit(self, event, **fields):
+        """Write an event to the sink as a JSON line.
+
+        The line also holds the seconds since the metrics were created and
+        the peak memory of the process.
+
+        Args:
+            event: String name of the event.
+            **fields: Values of the event.
+        """
+        if not self.enabled or self.sink is None:
+            return
+        line = {'event': event,
+                'elapsed': time.perf_counter() - self.start_time,
+                'peak_memory_kib': get_peak_memory()}
+        line.update(fields)
+        self.sink.write(json.dumps(line) + '\n')
+        self.sink.flush()
+
+    def report(self):
+        """Print the totals of each stage and write them to the sink."""
+        if not self.enabled:
+            return
+        print('Metrics:')
+        print('  %-20s %10s %10s %12s' % ('stage', 'seconds', 'rows',
+                                          'rows/s'))
+        for name, (seconds, rows) in self.totals.items():
+            rate = '%12.0f' % (rows / seconds,) if rows and seconds else ''
+            print('  %-20s %10.3f %10s %12s'
+                  % (name, seconds, rows or '', rate))
+        print('  %-20s %10.3f'
+              % ('total', time.perf_counter() - self.start_time))
+        peak = get_peak_memory()
+        if peak is not None:
+            print('  peak memory %d MiB' % (peak // 1024,))
+        self.emit('summary', totals=self.totals)
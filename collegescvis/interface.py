@@ -18,8 +18,11 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import json
 import sqlite3
 from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from PyQt4 import QtCore, QtGui
+from collegesearch import CollegeIndex
+from plotdata import PlotSettings, SeriesPlot
+import plotfigure
 
 
 class Interface(object):
@@ -33,13 +36,15 @@ class Interface(object):
 
     Attributes:
         plot_settings: Queries the database and stores Scorecard data.
+        query_worker: Thread that queries the data of the plotted series.
         plot_config_window: Window used to specify data to be plotted.
         main: Main window of the application.
         main_menu: Menu bar for the application.
     """
 
-    def __init__(self, db_path):
-        self.plot_settings = PlotSettings(db_path)
+    def __init__(self, db_path, columns_dir=None):
+        self.plot_settings = PlotSettings(db_path, columns_dir)
+        self.query_worker = QueryWorker(self.plot_settings)
 
         self.plot_config_window = PlotConfigWindow(
             self, self.plot_settings.college_names,
@@ -56,6 +61,9 @@ class MainWindow(QtGui.QMainWindow):
         parent: Reference to the parent Interface object.
         figure: Figure object that contains all axes/plots.
         canvas: FigureCanvasQTAgg used to connect PyQt with Matplotlib elements.
+        ready_series: List of the SeriesPlots whose data has been retrieved by
+            the current query.
+        progress: QProgressDialog shown while the series are queried.
     """
 
     def __init__(self, parent):
@@ -65,6 +73,19 @@ class MainWindow(QtGui.QMainWindow):
         self.figure = self._build_figure()
         self.canvas = FigureCanvas(self.figure)
         self.setCentralWidget(self.canvas)
+
+        self.ready_series = []
+        self.progress = QtGui.QProgressDialog(
+            'Retrieving data...', 'Cancel', 0, 0, self)
+        self.progress.setWindowModality(QtCore.Qt.WindowModal)
+        self.progress.reset()
+        worker = self.parent.query_worker
+        QtCore.QObject.connect(
+            self.progress, QtCore.SIGNAL('canceled()'), worker.cancel)
+        QtCore.QObject.connect(
+            worker, QtCore.SIGNAL('seriesReady(int)'), self._add_series)
+        QtCore.QObject.connect(
+            worker, QtCore.SIGNAL('finished()'), self._query_finished)
         self.show()
 
     @staticmethod
@@ -74,98 +95,75 @@ class MainWindow(QtGui.QMainWindow):
         Returns:
             figure: figure containing the initial axes object(s).
         """
-        figure = plt.figure()
+        #A plain Figure is drawn by the canvas, so pyplot and its backend
+        #selection are not loaded at startup.
+        figure = Figure()
         title_text = (
             'Use the menubar above (Plot => New Plot) to plot data.')
         figure.suptitle(title_text, fontsize=14, y=0.5)
         figure.subplots_adjust(left=0.075)
         return figure
 
-    def _update_figure(self):
-        """Update the figure with an Axes for each plotted dataset.
+    def _query_series(self):
+        """Start retrieving the data of the plotted series.
 
-        This code is executed when the application receives a request to plot
-        datasets and after the data has been retrieved from the database. Each
-        plot is illustrated as a scatterplot with markers of different colors
-        and shapes to differentiate between datasets. If no data exists for
-        a user-requested plot, it is skipped and the user is alerted with a
-        message box.
+        The data is retrieved by the QueryWorker thread, so the interface
+        keeps responding. A progress dialog shows the number of series
+        retrieved and cancels the remaining ones.
         """
-        colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
-        markers = ['o', 's', '^']
-
-        #Clear the figure
-        for plot in self.figure.get_axes():
-            self.figure.delaxes(plot)
-        self.figure.suptitle('')
-
-        #Parent axes created to share x axis with other axes
-        parent_axes = self._build_parent_axes()
-
-        #Add twinned axes until number of axes equals number of series
-        ax_list = [parent_axes]
-        series_list = self.parent.plot_settings._get_series_plots()
-        if len(series_list) > 1:
-            for series in series_list[1:]:
-                ax_list.append(parent_axes.twinx())
-
-        count = 0
-        for index, series in enumerate(series_list):
-            x_data, y_data = series._get_xy_data()
-
-            #Skip if data does not exist
-            if len(y_data) == 0 or (len(y_data) == 1 and y_data[0] is None):
-                ax_list[index].set_axis_off()
-                self._create_popup(
-                    series.data_type + ' data does not exist for ' +
-                    series.college + ' for years ' + series.start_year + '-' +
-                    series.end_year + '. Data will not appear in plot.')
-                continue
-
-            #Plot the data
-            ax_label = series.college + ' ' + series.data_type
-            color = colors[count%len(colors)]
-            marker = markers[int(count/len(colors))]
-            ax_list[index].scatter(
-                x_data, y_data, c=color, marker=marker, label=ax_label)
-
-            #Configure the y axis
-            ax_list[index].set_ylim(self._get_y_limits(y_data))
-            ax_list[index].set_ylabel(series.data_type, color=color)
-            ax_list[index].ticklabel_format(axis='y', useOffset=False)
-            ax_list[index].tick_params(axis='y', colors=color)
-
-            #Adjust the plot for new y axes
-            if count > 1:
-                self.figure.subplots_adjust(right=0.9 - 0.025 * count)
-                ax_list[index].spines['right'].set_position(
-                    ('axes', 0.95 + .07 * count))
-            count = count + 1
-
-        #Create the legend
-        lines, labels = [], []
-        for axes in ax_list:
-            ax_lines, ax_labels = axes.get_legend_handles_labels()
-            lines += ax_lines
-            labels += ax_labels
-        parent_axes.legend(lines, labels, loc='upper right')
+        worker = self.parent.query_worker
+        if worker.isRunning():
+            return
+        self.ready_series = []
+        self.progress.setMaximum(
+            len(self.parent.plot_settings._get_series_plots()))
+        self.progress.setValue(0)
+        worker.query()
 
-    @staticmethod
-    def _get_y_limits(y_data):
-        """Return min and max values to be used as y axis limits.
+    def _add_series(self, index):
+        """Draw a series as soon as its data has been retrieved.
 
         Args:
-            y_data: Data set.
+            index: Integer index of the series in the plotted series.
+        """
+        series = self.parent.plot_settings._get_series_plots()[index]
+        self.ready_series.append(series)
+        self.progress.setValue(len(self.ready_series))
+        self._update_figure(self.ready_series, alert=False)
 
-        Returns:
-            (y_min, y_max): Tuple with min and max axis limits.
+    def _query_finished(self):
+        """Draw the complete figure once every series has been retrieved.
+
+        If the query was cancelled, the series retrieved so far stay drawn.
         """
-        min_scale = 0.9
-        max_scale = 1.1
-        clean_y_data = [y for y in y_data if y != None]
-        y_min = min(clean_y_data)*min_scale
-        y_max = max(clean_y_data)*max_scale
-        return (y_min, y_max)
+        self.progress.reset()
+        if not self.parent.query_worker.cancelled:
+            self._update_figure()
+
+    def _update_figure(self, series_list=None, alert=True):
+        """Update the figure with an Axes for each plotted dataset.
+
+        This code is executed when the application receives a request to plot
+        datasets and after the data has been retrieved from the database. The
+        series are drawn by plotfigure.draw_series. If no data exists for a
+        user-requested plot, it is skipped and the user is alerted with a
+        message box.
+
+        Args:
+            series_list: List of SeriesPlots to draw, all plotted series if
+                None.
+            alert: If False, series without data are skipped silently. Used
+                while the series are still being retrieved.
+        """
+        if series_list is None:
+            series_list = self.parent.plot_settings._get_series_plots()
+        missing = plotfigure.draw_series(
+            self.figure, series_list,
+            self.parent.plot_settings._get_year_range())
+        self.canvas.draw()
+        if alert:
+            for series in missing:
+                self._create_popup(plotfigure.get_missing_message(series))
 
     @staticmethod
     def _create_popup(string):
@@ -183,29 +181,19 @@ class MainWindow(QtGui.QMainWindow):
         msg_box.setText(string)
         msg_box.exec_()
 
-    def _build_parent_axes(self):
-        """Build a parent axes to hold the x axis shared by all the plots.
+    def _export_data(self):
+        """Exports plotted data in JSON format to a user-specified file.
 
-        Returns:
-            parent_axes: Axes object with correct x axis scale.
+        If the data is still being retrieved, the export waits for the
+        QueryWorker to finish, so it holds every series retrieved.
         """
-        parent_axes = plt.subplot()
-        x_min = int(self.parent.plot_settings._get_year_range()[0]) - 1
-        x_max = int(self.parent.plot_settings._get_year_range()[1]) + 1
-        parent_axes.set_xlim([x_min, x_max])
-        parent_axes.ticklabel_format(axis='x', useOffset=False)
-        parent_axes.set_xticks([year for year in range(x_min, x_max+1)])
-        parent_axes.set_xlabel('Year')
-        return parent_axes
-
-    def _export_data(self):
-        """Exports plotted data in JSON format to a user-specified file."""
+        self.parent.query_worker.wait()
         if len(self.parent.plot_settings._get_series_plots()) == 0:
             self._create_popup(
                 'No valid data to export found. Please try again.')
             return
         data = self.parent.plot_settings._get_series_plots()
-        json_list = [entry.__dict__ for entry in data]
+        json_list = plotfigure.series_to_json(data)
         filename = QtGui.QFileDialog.getSaveFileName(
             self, 'Save File', '', '*.json')
         with open(filename, 'w') as save_file:
@@ -230,122 +218,52 @@ class MainMenu(object):
         plotmenu.addAction('New Plot', self.parent.plot_config_window.show)
         self.parent.main.menuBar().addMenu(plotmenu)
 
-class PlotSettings(object):
-    """Stores info for plotting Scorecard data.
+class QueryWorker(QtCore.QThread):
+    """Thread that retrieves the data of the plotted series.
 
-    Upon starting the application, the PlotSettings object pulls the list of
-    colleges, data types, and years from the database. These are used in the
-    plot selection menu.
+    The worker runs PlotSettings._query_db with its own sqlite connection and
+    emits seriesReady(int) with the index of each series as soon as its data
+    is set. The series are retrieved in statements of up to
+    PlotSettings.SERIES_PER_STATEMENT series, so the figure is drawn
+    progressively and a cancelled query stops before its next statement.
+    QThread emits finished() when the query is complete or cancelled.
 
-    The PlotSettings object also queries the database for each dataset the
-    user wishes to plot.
+    While the worker runs, the main thread only reads the data of the
+    series reported ready: the plotted series, the query cache and the
+    columnar export of the PlotSettings belong to the worker.
 
     Attributes:
-        college_names: List of valid college name strings.
-        year_names: List of valid year strings.
-        data_types: List of valid data type strings.
-        series_plots: List of SeriesPlots specified by the user.
+        plot_settings: PlotSettings holding the series to retrieve.
+        cur: sqlite3 cursor of the worker's connection.
+        cancelled: True if the current query has been cancelled.
     """
 
-    def __init__(self, db_path):
-        self.cur = sqlite3.connect(db_path).cursor()
-
-        #Data is stored in PlotSettings to prevent repeated db calls.
-        self.college_names = []
-        self.year_names = []
-        self.data_types = []
-
-        self._get_college_names()
-        self._get_year_names()
-        self._get_data_types()
-
-        self.max_college_data_index = 0
-        self.series_plots = []
-
-    def _query_db(self):
-        """Retrieve data from the database for each user-requested plot."""
-        for series in self.series_plots:
-            years = list(
-                range(int(series.start_year), int(series.end_year) + 1))
-
-            if series.is_college:
-                self.cur.execute(
-                    '''SELECT %s FROM College WHERE INSTNM = ?''' %
-                    (series.data_type), (series.college,))
-                results = self.cur.fetchall()
-                if len(results) == 0:
-                    print('No data found for series: ', series._to_string())
-                for value in results:
-                    series.data.append(value[0])
-
-            else:
-                for year in years:
-                    self.cur.execute(
-                        '''SELECT %s FROM "%s" JOIN College WHERE
-                        "%s".college_id = College.college_id AND INSTNM = ?'''
-                        % (series.data_type, year, year), (series.college,))
-                    results = self.cur.fetchall()
-                    if len(results) == 0:
-                        print('No data found for series: ', series._to_string())
-                    for value in results:
-                        series.data.append(value[0])
-
-    def _add_series_plot(self, series_plot):
-        """Add a SeriesPlot object to the list."""
-        self.series_plots.append(series_plot)
-
-    def _clear_series_plots(self):
-        """Clear the list of SeriesPlot objects."""
-        self.series_plots = []
-
-    def _get_series_plots(self):
-        """Returns the list of SeriesPlot objects."""
-        return self.series_plots
-
-    def _get_year_range(self):
-        """Return the data's min and max years from SeriesPlot list.
-
-        Returns:
-            (min_year, max_year): Tuple containing the string
-                min and max years from the dataset.
-        """
-        min_year = 10000
-        max_year = 0
-        for series in self.series_plots:
-            if int(series.start_year) < min_year:
-                min_year = int(series.start_year)
-            if int(series.end_year) > max_year:
-                max_year = int(series.end_year)
-        return (str(min_year), str(max_year))
-
-    def _get_college_names(self):
-        """Retrieve names of colleges from the database and store them."""
-        self.cur.execute('''
-            SELECT INSTNM FROM College ORDER BY INSTNM ASC''')
-        for result in self.cur.fetchall():
-            self.college_names.append(result[0])
-
-    def _get_data_types(self):
-        """Retrieve data types from the databaes and store them."""
-        self.cur.execute('''
-            PRAGMA table_info(College)''')
-        for entry in self.cur.fetchall():
-            if entry[2] != 'TEXT' and entry[1] != 'college_id':
-                self.data_types.append(entry[1])
-        self.max_college_data_index = len(self.data_types) - 1
-        self.cur.execute('''
-            PRAGMA table_info("%s")''' % self.year_names[0])
-        for entry in self.cur.fetchall()[1:]: #ignores duplicate 'college_id'
-            if entry[2] != 'TEXT':
-                self.data_types.append(entry[1])
-
-    def _get_year_names(self):
-        """Retrieve the valid years from the database and store them."""
-        self.cur.execute('''
-            SELECT name FROM sqlite_master WHERE type = "table"''')
-        for item in self.cur.fetchall():
-            if item[0] != 'College' and item[0] != 'sqlite_sequence':
-                self.year_names.append(item[0])
+    def __init__(self, plot_settings):
+        QtCore.QThread.__init__(self)
+        self.plot_settings = plot_settings
+        #The connection is created here but only used by run, one query at a
+        #time, so sqlite's same thread check is disabled.
+        self.cur = sqlite3.connect(
+            plot_settings.db_path, check_same_thread=False).cursor()
+        self.cancelled = False
+
+    def query(self):
+        """Start retrieving the data of the plotted series."""
+        self.cancelled = False
+        self.start()
+
+    def cancel(self):
+        """Skip the series that have not been retrieved yet."""
+        self.cancelled = True
+
+    def run(self):
+        """Retrieve the data of the plotted series."""
+        self.plot_settings._query_db(
+            self.cur, self._series_done, lambda: self.cancelled)
+
+    def _series_done(self, index):
+        """Signal that the data of a series has been set."""
+        self.emit(QtCore.SIGNAL('seriesReady(int)'), index)
 
 class PlotConfigWindow(QtGui.QWidget):
     """Menu for user specification of data to be plotted.
@@ -357,6 +275,11 @@ class PlotConfigWindow(QtGui.QWidget):
         parent: MainWindow parent object.
         layout: Layout for structuring the window's widgets.
         series_options: List of SeriesOptions objects.
+        college_model: Model of every college, shared by the school boxes.
+        search_model: CollegeSearchModel shared by the school box completers.
+        data_model: Model of every data type, shared by the data boxes.
+        data_search_model: DataTypeSearchModel shared by the data search
+            box completers.
         add_btn: Button to add a new SeriesOption widget to the window.
         confirm_btn: Button that calls for the SeriesOptions to be plotted.
     """
@@ -368,11 +291,15 @@ class PlotConfigWindow(QtGui.QWidget):
         self.layout = QtGui.QVBoxLayout(self)
 
         self.series_options = []
+        self.college_model = QtGui.QStringListModel(college_names)
+        self.search_model = CollegeSearchModel(parent.plot_settings.cur)
+        self.data_model = QtGui.QStringListModel(data_types)
+        self.data_search_model = DataTypeSearchModel(parent.plot_settings)
 
         self.add_btn = QtGui.QPushButton('Add Data Series')
         QtCore.QObject.connect(
             self.add_btn, QtCore.SIGNAL('clicked()'),
-            lambda: self._addSeries(college_names, year_names, data_types))
+            lambda: self._addSeries(year_names))
         self.layout.addWidget(self.add_btn)
 
         self.confirm_button = QtGui.QPushButton('Plot Series')
@@ -381,9 +308,11 @@ class PlotConfigWindow(QtGui.QWidget):
             self._get_plot_settings)
         self.layout.addWidget(self.confirm_button)
 
-    def _addSeries(self, college_names, year_names, data_types):
+    def _addSeries(self, year_names):
         """Adds a new SeriesOption to the window."""
-        options = SeriesOptions(self, college_names, year_names, data_types)
+        options = SeriesOptions(
+            self, self.college_model, self.search_model, self.data_model,
+            self.data_search_model, year_names)
         self.series_options.insert(0, options)
         self.layout.insertWidget(0, options)
 
@@ -393,39 +322,155 @@ class PlotConfigWindow(QtGui.QWidget):
             print('Maximum number of plots supported is 20.')
             self.close()
             return
+        #The series must not change while their data is being retrieved.
+        if self.parent.query_worker.isRunning():
+            return
+        for option in self.series_options:
+            if option.school_box.findText(
+                    option.school_box.currentText(),
+                    QtCore.Qt.MatchFixedString | QtCore.Qt.MatchCaseSensitive
+                    ) < 0:
+                self.parent.main._create_popup(
+                    'Unknown college: %s' % (option.school_box.currentText(),))
+                return
         self.parent.plot_settings._clear_series_plots()
         for option in self.series_options:
             self.parent.plot_settings._add_series_plot(option._get_series())
-        self.parent.plot_settings._query_db()
-        self.parent.main._update_figure()
+        self.parent.main._query_series()
         self.close()
 
+class CollegeSearchModel(QtCore.QAbstractListModel):
+    """Model of the colleges matching the text typed in a school box.
+
+    The search index is built from the College table the first time a
+    college is searched, and reused by every SeriesOptions afterwards.
+
+    Attributes:
+        cur: sqlite3 cursor of the database.
+        college_index: CollegeIndex of the colleges, or None until searched.
+        matches: List of (name, city, state) tuples of the last search.
+    """
+
+    def __init__(self, cur):
+        QtCore.QAbstractListModel.__init__(self)
+        self.cur = cur
+        self.college_index = None
+        self.matches = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Return the number of matching colleges."""
+        return 0 if parent.isValid() else len(self.matches)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Return a college's name and place, or its name when edited."""
+        if not index.isValid():
+            return None
+        name, city, state = self.matches[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            place = ', '.join(part for part in (city, state) if part)
+            return '%s (%s)' % (name, place) if place else name
+        if role == QtCore.Qt.EditRole:
+            return name
+        return None
+
+    def _set_query(self, text):
+        """Replace the matches with the colleges matching typed text."""
+        if self.college_index is None:
+            self.college_index = CollegeIndex.from_database(self.cur)
+        self.beginResetModel()
+        self.matches = self.college_index.search(str(text))
+        self.endResetModel()
+
+class DataTypeSearchModel(QtCore.QAbstractListModel):
+    """Model of the data types matching the text typed in a search box.
+
+    The data types are searched by name and data dictionary label through
+    the DataType table of the database.
+
+    Attributes:
+        plot_settings: PlotSettings of the database.
+        matches: List of (name, label) tuples of the last search.
+    """
+
+    def __init__(self, plot_settings):
+        QtCore.QAbstractListModel.__init__(self)
+        self.plot_settings = plot_settings
+        self.matches = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Return the number of matching data types."""
+        return 0 if parent.isValid() else len(self.matches)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Return a data type's name and label, or its name when edited."""
+        if not index.isValid():
+            return None
+        name, label = self.matches[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return '%s: %s' % (name, label) if label else name
+        if role == QtCore.Qt.EditRole:
+            return name
+        return None
+
+    def _set_query(self, text):
+        """Replace the matches with the data types matching typed text."""
+        self.beginResetModel()
+        self.matches = self.plot_settings._search_data_types(str(text))
+        self.endResetModel()
+
 class SeriesOptions(QtGui.QWidget):
     """Widget containing boxes for users to select data to be plotted.
 
     Attributes:
         layout: Layout of each row of boxes - arranged horizontally.
         parent: PlotConfigWindow object containing this SeriesOptions.
-        school_box: Drop down box to select the college.
+        school_box: Drop down box to select the college. Typing in the box
+            lists the matching colleges.
+        data_search_box: Text box to search the data types by name and
+            label. Choosing a match selects it in the data_box.
         data_box: Drop down box to select the data type.
         start_year_box: Drop down box to select the beginning year for the data.
         end_year_box: Drop down box to select the end year for the data.
         remove_box: Button to delete this from the PlotConfigWindow.
     """
 
-    def __init__(self, parent, college_names, year_names, data_types):
+    def __init__(self, parent, college_model, search_model, data_model,
+                 data_search_model, year_names):
         QtGui.QWidget.__init__(self)
         self.layout = QtGui.QHBoxLayout(self)
         self.parent = parent
 
+        #The college models are shared, so opening a row copies no names.
         self.school_box = QtGui.QComboBox()
-        for college in college_names:
-            self.school_box.addItem(college)
+        self.school_box.setModel(college_model)
+        self.school_box.setEditable(True)
+        self.school_box.setInsertPolicy(QtGui.QComboBox.NoInsert)
+        completer = QtGui.QCompleter(search_model, self.school_box)
+        completer.setCompletionMode(
+            QtGui.QCompleter.UnfilteredPopupCompletion)
+        self.school_box.setCompleter(completer)
+        QtCore.QObject.connect(
+            self.school_box.lineEdit(), QtCore.SIGNAL('textEdited(QString)'),
+            search_model._set_query)
         self.layout.addWidget(self.school_box)
 
+        self.data_search_box = QtGui.QLineEdit()
+        self.data_search_box.setPlaceholderText('Search data types')
+        data_completer = QtGui.QCompleter(
+            data_search_model, self.data_search_box)
+        data_completer.setCompletionMode(
+            QtGui.QCompleter.UnfilteredPopupCompletion)
+        self.data_search_box.setCompleter(data_completer)
+        QtCore.QObject.connect(
+            self.data_search_box, QtCore.SIGNAL('textEdited(QString)'),
+            data_search_model._set_query)
+        QtCore.QObject.connect(
+            data_completer, QtCore.SIGNAL('activated(QString)'),
+            self._select_data_type)
+        self.layout.addWidget(self.data_search_box)
+
         self.data_box = QtGui.QComboBox()
-        for data_type in data_types:
-            self.data_box.addItem(data_type)
+        self.data_box.setModel(data_model)
         self.layout.addWidget(self.data_box)
 
         self.start_year_box = QtGui.QComboBox()
@@ -459,47 +504,13 @@ class SeriesOptions(QtGui.QWidget):
             is_college_data)
         return series_plot
 
+    def _select_data_type(self, name):
+        """Select a data type chosen from the search box in the data_box."""
+        index = self.data_box.findText(name)
+        if index >= 0:
+            self.data_box.setCurrentIndex(index)
+
     def _remove_plot(self):
         """Remove this SeriesOptions from the PlotConfigWindow."""
         self.parent.series_options.remove(self)
         self.deleteLater()
-
-class SeriesPlot(object):
-    """Stores the information about a single series to be plotted.
-
-    Attributes:
-        college: College name string.
-        data_type: Data type string.
-        start_year: Starting year string.
-        end_year: Ending year string.
-        data: List of data from the database for college's data_type between
-            start_year and end_year, inclusive.
-    """
-
-    def __init__(self, college, data_type, start_year, end_year, is_college):
-        self.college = college
-        self.data_type = data_type
-        self.start_year = start_year
-        self.end_year = end_year
-        self.is_college = is_college
-        self.data = []
-
-    def _get_xy_data(self):
-        """Generates a list of x and y coordinates to be plotted.
-
-        Returns:
-            (x_data, y_data): tuple containing list of x values and list of y
-                values
-        """
-        x_data = list(
-            range(int(self.start_year), int(self.end_year) + 1))
-        y_data = []
-        if self.is_college:
-            y_data = [self.data[0] for val in x_data]
-        else:
-            y_data = self.data
-        return (x_data, y_data)
-
-    def _to_string(self):
-        """Convenience method to convert SeriesPlot to a string."""
-        return self.college, self.data_type, self.start_year, self.end_year
@@ -15,18 +15,34 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+import argparse
 import glob
 import os
 import sys
 import time
+import columnar
 from dbbuilder import Dbbuilder
 import decoder
-from PyQt4 import QtGui
-from interface import Interface
+from instrumentation import Metrics
 
 
-def main():
-    """Call modules to build database and visualize data."""
+def main(argv=None):
+    """Call modules to build database and visualize data.
+
+    PyQt4, matplotlib and the interface are imported only once the database
+    is ready, so that checking the database does not wait for them.
+
+    Args:
+        argv: List of command line arguments. Defaults to sys.argv[1:].
+    """
+    args = _parse_args(argv)
+    #Stage times are printed once the window is shown, and written as JSON
+    #lines if a metrics file is given.
+    metrics_file = None
+    if args.metrics_path:
+        metrics_file = open(args.metrics_path, 'a')
+    metrics = Metrics(
+        args.profile_startup or metrics_file is not None, metrics_file)
     print('Beginning College Scorecard Visualizer...')
     print('Checking database...')
 
@@ -38,11 +54,13 @@ def main():
     #Specify the path of the data types file generated by decoder module
     types_dest_path = os.path.join(
         os.path.dirname(__file__), os.pardir, 'data', 'temp', 'data_types.txt')
-    if os.path.isfile(types_dest_path):
-        print('Data types file found.')
-    else:
-        print('Generating data type file from raw data...')
-        decoder.write_data_types(glob_path, types_dest_path)
+    with metrics.stage('data types file'):
+        if os.path.isfile(types_dest_path):
+            print('Data types file found.')
+        else:
+            print('Generating data type file from raw data...')
+            decoder.write_data_types(
+                glob_path, types_dest_path, args.workers)
 
     #Specify path for the database to be built from the raw data
     db_path = os.path.join(
@@ -50,27 +68,94 @@ def main():
         'college-scorecard.sqlite')
     print('Database location:', db_path)
 
-    #Test for database existence before creating a Dbbuilder, as this will
-    #create a database file if it does not yet exist.
-    db_exists = os.path.isfile(db_path)
-    builder = Dbbuilder(db_path, types_dest_path)
+    with metrics.stage('open database'):
+        builder = Dbbuilder(
+            db_path, types_dest_path, args.layout, args.build_profile,
+            args.dictionary_path, metrics)
 
-    if db_exists:
-        print('Database found.')
-    else:
-        print('Generating database from raw data...')
+    #The tables are only built if the database is new or its schema has
+    #changed since it was built.
+    with metrics.stage('build schema'):
         start_time = time.time()
-        builder.build_database()
-        print('Database structure generated in %s seconds.'
-              % (time.time() - start_time))
-    for year in range(1996, 2015):
-        year_glob = glob.glob(('%s/MERGED' + str(year) + '*') % (raw_data_path))
-        builder.update_database(year_glob[0], str(year))
+        if builder.build_database(defer_indexes=True):
+            print('Database structure generated in %s seconds.'
+                  % (time.time() - start_time))
+    with metrics.stage('update database'):
+        year_paths = []
+        for year in range(1996, 2015):
+            year_glob = glob.glob(
+                ('%s/MERGED' + str(year) + '*') % (raw_data_path))
+            year_paths.append((year_glob[0], str(year)))
+        if builder.update_years(year_paths, args.workers):
+            builder.build_indexes()
+        builder.conn.close()
+
+    #The columnar export is written after the database is complete, and only
+    #if the database has changed since the last export.
+    columns_dir = os.path.join(os.path.dirname(db_path), 'columns')
+    if args.export_columns and not columnar.is_current(columns_dir, db_path):
+        with metrics.stage('export columns'):
+            print('Exporting columnar data for plotting...')
+            start_time = time.time()
+            columnar.export_columns(db_path, columns_dir)
+            print('Columnar data exported in %s seconds.'
+                  % (time.time() - start_time))
 
     print('Opening interface...')
-    app = QtGui.QApplication(sys.argv)
-    interface = Interface(db_path)
-    sys.exit(app.exec_())
+    with metrics.stage('import interface'):
+        from PyQt4 import QtCore, QtGui
+        from interface import Interface
+    with metrics.stage('create interface'):
+        app = QtGui.QApplication(sys.argv)
+        interface = Interface(db_path, columns_dir)
+    #The timer fires once the event loop has started and shown the window.
+    QtCore.QTimer.singleShot(0, metrics.report)
+    status = app.exec_()
+    if metrics_file is not None:
+        metrics_file.close()
+    sys.exit(status)
+
+def _parse_args(argv):
+    """Parse the command line arguments.
+
+    Args:
+        argv: List of command line arguments, or None to use sys.argv[1:].
+
+    Returns:
+        args: argparse.Namespace containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description='Build and plot College Scorecard data.')
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='number of processes used to read raw data files when '
+        'generating the data types file and the database (default: 1)')
+    parser.add_argument(
+        '--layout', choices=Dbbuilder.LAYOUTS, default='wide',
+        help='storage layout of the year data in a new database: one table '
+        'per year (wide) or one row per value (long) (default: wide)')
+    parser.add_argument(
+        '--build-profile', choices=sorted(Dbbuilder.PROFILES), default='bulk',
+        help='sqlite connection profile used while building the database; '
+        'bulk trades durability for speed (default: bulk)')
+    parser.add_argument(
+        '--dictionary', dest='dictionary_path', default=None,
+        help='College Scorecard data dictionary saved as CSV; its labels '
+        'are searched along with the data type names')
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help='print the time taken by each startup stage once the window '
+        'is shown')
+    parser.add_argument(
+        '--metrics', dest='metrics_path', default=None,
+        help='append the time, rows per second and peak memory of each '
+        'startup stage and each raw data file added to this file as JSON '
+        'lines')
+    parser.add_argument(
+        '--export-columns', action='store_true',
+        help='export the numeric year data to a memory-mapped file that is '
+        'used to plot series without querying the database')
+    return parser.parse_args(argv)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,539 @@
+"""
+plotdata.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import re
+import sqlite3
+import numpy as np
+import columnar
+import dbschema
+from querycache import QueryCache
+
+
+class PlotSettings(object):
+    """Stores info for plotting Scorecard data.
+
+    Upon starting the application, the PlotSettings object pulls the list of
+    colleges, data types, and years from the database. These are used in the
+    plot selection menu.
+
+    The PlotSettings object also queries the database for each dataset the
+    user wishes to plot.
+
+    Attributes:
+        college_names: List of valid college name strings.
+        year_names: List of valid year strings.
+        data_types: List of valid data type strings.
+        series_plots: List of SeriesPlots specified by the user.
+        layout: Storage layout of the database's year data, 'wide' or 'long'.
+        query_cache: QueryCache of values by (college, data_type, year).
+        columns: ColumnarCache of the database's numeric year data, or None
+            if no current columnar export exists.
+        metadata_path: Path of the sidecar file caching the college names,
+            years and data types read from the database.
+        data_type_search: How the DataType table is searched: 'fts5',
+            'like', '' if the database has no DataType table, or None until
+            the first search.
+
+    _query_db may run on a QueryWorker thread. While it runs, it owns
+    series_plots, query_cache and columns: the main thread may read the data
+    of the series reported done, but must not change the series or use the
+    cache or the columnar export until the query has finished.
+    """
+
+    #Default sqlite limits on the number of SELECTs joined into a compound
+    #statement and on the number of parameters of a statement.
+    MAX_COMPOUND_SELECT = 500
+    MAX_VARIABLES = 999
+
+    #Maximum number of series retrieved by one statement. Smaller groups
+    #report progress and check for cancellation more often; larger groups
+    #take fewer round trips.
+    SERIES_PER_STATEMENT = 4
+
+    #Attributes read from the database and cached in the metadata sidecar,
+    #and the version of the sidecar's format.
+    METADATA_ATTRIBUTES = ('layout', 'college_names', 'year_names',
+                           'data_types', 'max_college_data_index')
+    METADATA_VERSION = 1
+
+    def __init__(self, db_path, columns_dir=None):
+        self.db_path = db_path
+        self.cur = sqlite3.connect(db_path).cursor()
+        self.query_cache = QueryCache()
+        self.columns = None
+        if columns_dir and columnar.is_current(columns_dir, db_path):
+            self.columns = columnar.ColumnarCache(columns_dir)
+
+        #Data is stored in PlotSettings to prevent repeated db calls. It is
+        #read from the metadata sidecar unless the database has changed.
+        self.metadata_path = db_path + '.meta.json'
+        self.layout = 'wide'
+        self.college_names = []
+        self.year_names = []
+        self.data_types = []
+        self.max_college_data_index = 0
+
+        if not self._load_metadata():
+            self._get_layout()
+            self._get_college_names()
+            self._get_year_names()
+            self._get_data_types()
+            self._save_metadata()
+
+        self.series_plots = []
+        self.data_type_search = None
+
+    def _query_db(self, cur=None, series_done=None, is_cancelled=None):
+        """Retrieve data from the database for each user-requested plot.
+
+        Values are first looked up in the query cache. The values that are
+        not cached are retrieved with UNION ALL statements, each covering up
+        to SERIES_PER_STATEMENT series, within sqlite's limits on the size of
+        a statement (see _run_selects). Each result row is tagged with the
+        index of its series and its year. The series of a statement are
+        reported done before the next statement runs, and cancellation is
+        checked between statements.
+
+        Series held by the columnar export are sliced from it instead, with
+        one value per year and NaN for missing values.
+
+        Args:
+            cur: sqlite3 cursor used for the queries, self.cur if None. A
+                QueryWorker passes a cursor of its own connection, as sqlite
+                connections must not be shared between threads.
+            series_done: Function called with the index of each series in
+                series_plots as soon as its data is set.
+            is_cancelled: Function returning True if the series that are not
+                yet retrieved should be skipped.
+
+        Returns:
+            boolean: False if the query was cancelled.
+        """
+        cur = cur or self.cur
+        self.query_cache.validate(self._get_db_signature(cur))
+        if self.columns and not self.columns.is_current(self.db_path):
+            print('Columnar export is out of date and will not be used.')
+            self.columns.close()
+            self.columns = None
+
+        #Batches of (index, series, missing years) retrieved by one compound
+        #statement. Series without missing years are set at once.
+        found = {}
+        batches = [[]]
+        batch_size = 0
+        for index, series in enumerate(self.series_plots):
+            if self._slice_series(series):
+                if series_done:
+                    series_done(index)
+                continue
+            missing_years = []
+            for year in self._get_series_years(series):
+                key = (series.college, series.data_type, year)
+                values = self.query_cache.get(key)
+                if values is None:
+                    missing_years.append(year)
+                else:
+                    found[key] = values
+            if not missing_years:
+                self._set_series_data(series, found)
+                if series_done:
+                    series_done(index)
+                continue
+            if (len(batches[-1]) == self.SERIES_PER_STATEMENT or
+                    batch_size + len(missing_years) >
+                    self.MAX_COMPOUND_SELECT):
+                batches.append([])
+                batch_size = 0
+            batches[-1].append((index, series, missing_years))
+            batch_size += len(missing_years)
+
+        for batch in batches:
+            if not batch:
+                continue
+            if is_cancelled and is_cancelled():
+                return False
+            selects = []
+            for index, series, years in batch:
+                selects.extend(self._get_series_selects(index, series, years))
+            results = self._run_selects(selects, cur)
+            for index, series, years in batch:
+                for year in years:
+                    key = (series.college, series.data_type, year)
+                    found[key] = results.get((index, year), [])
+                    self.query_cache.put(key, found[key])
+                self._set_series_data(series, found)
+                if series_done:
+                    series_done(index)
+        return True
+
+    def _set_series_data(self, series, found):
+        """Set the data of a series from its retrieved values.
+
+        Args:
+            series: SeriesPlot to set the data of.
+            found: Dictionary of (college, data_type, year) to the values
+                retrieved for every year of the series.
+        """
+        values_list = [found[(series.college, series.data_type, year)]
+                       for year in self._get_series_years(series)]
+        if not any(values_list):
+            print('No data found for series: ', series._to_string())
+        for values in values_list:
+            if series.is_college:
+                series.data.extend(values)
+            else:
+                #Years without a value are added to the data as None, so
+                #that the data has one value per year.
+                series.data.append(values[0] if values else None)
+
+    def _slice_series(self, series):
+        """Set the data of a series from the columnar export.
+
+        Args:
+            series: SeriesPlot to set the data of.
+
+        Returns:
+            boolean: True if the export holds the series.
+        """
+        if self.columns is None or series.is_college:
+            return False
+        values = self.columns.get_series(
+            series.data_type, series.college, int(series.start_year),
+            int(series.end_year))
+        if values is None:
+            return False
+        series.data = values
+        return True
+
+    @staticmethod
+    def _get_series_years(series):
+        """Return the years of a series, or [None] for college data."""
+        if series.is_college:
+            return [None]
+        return list(range(int(series.start_year), int(series.end_year) + 1))
+
+    def _get_db_signature(self, cur=None):
+        """Return a signature that changes whenever the database changes.
+
+        The file's modification time and size change when the database is
+        updated. sqlite's data_version changes when another connection
+        commits, which covers changes not yet written to the main file.
+
+        Args:
+            cur: sqlite3 cursor used for the queries, self.cur if None.
+                data_version is only comparable between calls on the same
+                connection.
+
+        Returns:
+            signature: Tuple describing the database's current state.
+        """
+        cur = cur or self.cur
+        stat = os.stat(self.db_path)
+        cur.execute('''PRAGMA data_version''')
+        return (stat.st_mtime_ns, stat.st_size, cur.fetchone()[0])
+
+    def _get_series_selects(self, index, series, years):
+        """Return the SELECT statements that retrieve the data of a series.
+
+        Each statement selects rows of (index, year, value). College data has
+        no year and is tagged with a NULL year.
+
+        Args:
+            index: Integer index of the series in series_plots.
+            series: SeriesPlot to retrieve the data for.
+            years: List of integer years to retrieve, or [None] for college
+                data.
+
+        Returns:
+            selects: List of (statement, parameters) tuples.
+        """
+        if series.is_college:
+            return [('''SELECT %d, NULL, %s FROM College WHERE INSTNM = ?'''
+                     % (index, series.data_type), (series.college,))]
+
+        if self.layout == 'long':
+            #Reads every year with one range scan of Observation's primary key.
+            return [('''SELECT %d, Observation.year, Observation.value
+                     FROM Observation JOIN Metric JOIN College
+                     ON Observation.metric_id = Metric.metric_id AND
+                     Observation.college_id = College.college_id WHERE
+                     Metric.name = ? AND INSTNM = ? AND
+                     Observation.year BETWEEN ? AND ?''' % (index,),
+                     (series.data_type, series.college, min(years),
+                      max(years)))]
+
+        return [('''SELECT %d, %d, %s FROM "%s" JOIN College WHERE
+                 "%s".college_id = College.college_id AND INSTNM = ?'''
+                 % (index, year, series.data_type, year, year),
+                 (series.college,))
+                for year in years]
+
+    def _run_selects(self, selects, cur=None):
+        """Run SELECT statements joined into as few UNION ALL statements as
+        sqlite allows.
+
+        Args:
+            selects: List of (statement, parameters) tuples selecting rows of
+                (index, year, value).
+            cur: sqlite3 cursor used for the queries, self.cur if None.
+
+        Returns:
+            results: Dictionary of (index, year) to a list of values.
+        """
+        cur = cur or self.cur
+        results = {}
+        start = 0
+        while start < len(selects):
+            statements, parameters = [], []
+            for statement, statement_parameters in selects[start:]:
+                if (len(statements) == self.MAX_COMPOUND_SELECT or
+                        len(parameters) + len(statement_parameters) >
+                        self.MAX_VARIABLES):
+                    break
+                statements.append(statement)
+                parameters.extend(statement_parameters)
+            start += len(statements)
+            cur.execute(' UNION ALL '.join(statements), parameters)
+            for index, year, value in cur.fetchall():
+                results.setdefault((index, year), []).append(value)
+        return results
+
+    def _create_series_plot(self, college, data_type, start_year, end_year):
+        """Create a SeriesPlot after checking it against the database.
+
+        Args:
+            college: College name string.
+            data_type: Data type string.
+            start_year: Starting year string.
+            end_year: Ending year string.
+
+        Returns:
+            series_plot: SeriesPlot of the college's data type.
+
+        Raises:
+            ValueError: The college, data type or years are not in the
+                database.
+        """
+        if college not in self.college_names:
+            raise ValueError('Unknown college: %s' % (college,))
+        if data_type not in self.data_types:
+            raise ValueError('Unknown data type: %s' % (data_type,))
+        start_year, end_year = str(start_year), str(end_year)
+        for year in (start_year, end_year):
+            if year not in self.year_names:
+                raise ValueError('Unknown year: %s' % (year,))
+        if int(start_year) > int(end_year):
+            raise ValueError('Start year is after end year: %s-%s'
+                             % (start_year, end_year))
+        is_college = (self.data_types.index(data_type) <=
+                      self.max_college_data_index)
+        return SeriesPlot(college, data_type, start_year, end_year, is_college)
+
+    def _search_data_types(self, query, limit=50):
+        """Return the data types whose name or label match a search.
+
+        Each word of the query must start a word of the data type's name or
+        label, for example 'comp pell' or 'C150_4'. Names are split into
+        words at underscores. Without FTS5 the words may occur anywhere.
+
+        Args:
+            query: String typed by the user.
+            limit: Maximum number of data types returned.
+
+        Returns:
+            matches: List of (name, label) tuples, best match first. Empty if
+                the database has no DataType table.
+        """
+        words = re.findall(r'[^\W_]+', query)
+        if not words:
+            return []
+        if self.data_type_search is None:
+            self.cur.execute('''
+                SELECT sql FROM sqlite_master WHERE name = "DataType"''')
+            row = self.cur.fetchone()
+            if row is None:
+                self.data_type_search = ''
+            elif 'fts5' in row[0].lower():
+                self.data_type_search = 'fts5'
+            else:
+                self.data_type_search = 'like'
+        if self.data_type_search == 'fts5':
+            self.cur.execute('''
+                SELECT name, label FROM DataType WHERE DataType MATCH ?
+                ORDER BY rank LIMIT ?''',
+                (' '.join('"%s"*' % (word,) for word in words), limit))
+        elif self.data_type_search == 'like':
+            conditions = ' AND '.join(
+                ['(name LIKE ? OR label LIKE ?)'] * len(words))
+            parameters = []
+            for word in words:
+                parameters.extend(['%' + word + '%'] * 2)
+            self.cur.execute('''
+                SELECT name, label FROM DataType WHERE %s
+                ORDER BY name LIMIT ?''' % (conditions,),
+                parameters + [limit])
+        else:
+            return []
+        return self.cur.fetchall()
+
+    def _add_series_plot(self, series_plot):
+        """Add a SeriesPlot object to the list."""
+        self.series_plots.append(series_plot)
+
+    def _clear_series_plots(self):
+        """Clear the list of SeriesPlot objects."""
+        self.series_plots = []
+
+    def _get_series_plots(self):
+        """Returns the list of SeriesPlot objects."""
+        return self.series_plots
+
+    def _get_year_range(self):
+        """Return the data's min and max years from SeriesPlot list.
+
+        Returns:
+            (min_year, max_year): Tuple containing the string
+                min and max years from the dataset.
+        """
+        min_year = 10000
+        max_year = 0
+        for series in self.series_plots:
+            if int(series.start_year) < min_year:
+                min_year = int(series.start_year)
+            if int(series.end_year) > max_year:
+                max_year = int(series.end_year)
+        return (str(min_year), str(max_year))
+
+    def _get_file_signature(self):
+        """Return the modification time and size of the database file."""
+        stat = os.stat(self.db_path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _load_metadata(self):
+        """Load the attributes cached in the metadata sidecar.
+
+        Returns:
+            boolean: True if the sidecar exists and was written for the
+                database in its current state.
+        """
+        try:
+            with open(self.metadata_path, 'r') as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            return False
+        if (metadata.get('version') != self.METADATA_VERSION or
+                metadata.get('db_signature') != self._get_file_signature()):
+            return False
+        for attribute in self.METADATA_ATTRIBUTES:
+            setattr(self, attribute, metadata[attribute])
+        return True
+
+    def _save_metadata(self):
+        """Cache the attributes read from the database in the sidecar.
+
+        A sidecar that cannot be written, for example in a read-only
+        directory, is skipped.
+        """
+        metadata = dict((attribute, getattr(self, attribute))
+                        for attribute in self.METADATA_ATTRIBUTES)
+        metadata['version'] = self.METADATA_VERSION
+        metadata['db_signature'] = self._get_file_signature()
+        try:
+            with open(self.metadata_path + '.tmp', 'w') as metadata_file:
+                json.dump(metadata, metadata_file)
+            os.replace(self.metadata_path + '.tmp', self.metadata_path)
+        except OSError:
+            pass
+
+    def _get_layout(self):
+        """Retrieve the storage layout of the database and store it."""
+        self.layout = dbschema.get_layout(self.cur)
+
+    def _get_college_names(self):
+        """Retrieve names of colleges from the database and store them."""
+        self.cur.execute('''
+            SELECT INSTNM FROM College ORDER BY INSTNM ASC''')
+        for result in self.cur.fetchall():
+            self.college_names.append(result[0])
+
+    def _get_data_types(self):
+        """Retrieve data types from the databaes and store them."""
+        self.cur.execute('''
+            PRAGMA table_info(College)''')
+        for entry in self.cur.fetchall():
+            if entry[2] != 'TEXT' and entry[1] != 'college_id':
+                self.data_types.append(entry[1])
+        self.max_college_data_index = len(self.data_types) - 1
+        years = [int(year) for year in self.year_names]
+        for name, _ in dbschema.get_year_data_types(
+                self.cur, self.layout, years):
+            self.data_types.append(name)
+
+    def _get_year_names(self):
+        """Retrieve the valid years from the database and store them."""
+        for year in dbschema.get_years(self.cur, self.layout):
+            self.year_names.append(str(year))
+
+class SeriesPlot(object):
+    """Stores the information about a single series to be plotted.
+
+    Attributes:
+        college: College name string.
+        data_type: Data type string.
+        start_year: Starting year string.
+        end_year: Ending year string.
+        data: List of data from the database for college's data_type between
+            start_year and end_year, inclusive, with one value per year and
+            None for missing values. Data read from a columnar export is a
+            memoryview of one float per year, with NaN for missing values.
+    """
+
+    def __init__(self, college, data_type, start_year, end_year, is_college):
+        self.college = college
+        self.data_type = data_type
+        self.start_year = start_year
+        self.end_year = end_year
+        self.is_college = is_college
+        self.data = []
+
+    def _get_xy_data(self):
+        """Generates arrays of x and y coordinates to be plotted.
+
+        The y array holds one float per year, with NaN for the years that have
+        no data. College data is repeated for every year.
+
+        Returns:
+            (x_data, y_data): tuple containing an array of x values and an
+                array of y values of the same length
+        """
+        x_data = np.arange(int(self.start_year), int(self.end_year) + 1)
+        if self.is_college:
+            value = self.data[0] if self.data else None
+            y_data = np.full(
+                len(x_data), np.nan if value is None else value,
+                dtype=np.float64)
+        else:
+            #None becomes NaN. Data read from a columnar export is already a
+            #float64 buffer and is used without copying.
+            y_data = np.asarray(self.data, dtype=np.float64)
+        return (x_data, y_data)
+
+    def _to_string(self):
+        """Convenience method to convert SeriesPlot to a string."""
+        return self.college, self.data_type, self.start_year, self.end_year
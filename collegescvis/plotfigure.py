@@ -0,0 +1,161 @@
+"""
+plotfigure.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+
+#Colors and markers that differentiate the plotted series.
+COLORS = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
+MARKERS = ['o', 's', '^']
+
+
+def draw_series(figure, series_list, year_range):
+    """Draw the series on a figure with an Axes for each series.
+
+    The figure is cleared first. Each series is illustrated as a scatterplot
+    with markers of different colors and shapes to differentiate between
+    datasets, and with its own y axis. Series without data are skipped.
+
+    Args:
+        figure: matplotlib Figure to draw on.
+        series_list: List of SeriesPlots whose data has been retrieved.
+        year_range: Tuple of the string min and max years of the x axis.
+
+    Returns:
+        missing: List of the SeriesPlots skipped because they have no data.
+    """
+    #Clear the figure
+    for plot in figure.get_axes():
+        figure.delaxes(plot)
+    figure.suptitle('')
+
+    #Parent axes created to share x axis with other axes
+    parent_axes = build_parent_axes(figure, year_range)
+
+    #Add twinned axes until number of axes equals number of series
+    ax_list = [parent_axes]
+    if len(series_list) > 1:
+        for series in series_list[1:]:
+            ax_list.append(parent_axes.twinx())
+
+    missing = []
+    count = 0
+    for index, series in enumerate(series_list):
+        x_data, y_data = series._get_xy_data()
+
+        #Skip if data does not exist
+        if np.isnan(y_data).all():
+            ax_list[index].set_axis_off()
+            missing.append(series)
+            continue
+
+        #Plot the data
+        ax_label = series.college + ' ' + series.data_type
+        color = COLORS[count%len(COLORS)]
+        marker = MARKERS[int(count/len(COLORS))%len(MARKERS)]
+        mask = ~np.isnan(y_data)
+        ax_list[index].scatter(
+            x_data[mask], y_data[mask], c=color, marker=marker,
+            label=ax_label)
+
+        #Configure the y axis
+        ax_list[index].set_ylim(get_y_limits(y_data))
+        ax_list[index].set_ylabel(series.data_type, color=color)
+        ax_list[index].ticklabel_format(axis='y', useOffset=False)
+        ax_list[index].tick_params(axis='y', colors=color)
+
+        #Adjust the plot for new y axes
+        if count > 1:
+            figure.subplots_adjust(right=0.9 - 0.025 * count)
+            ax_list[index].spines['right'].set_position(
+                ('axes', 0.95 + .07 * count))
+        count = count + 1
+
+    #Create the legend
+    lines, labels = [], []
+    for axes in ax_list:
+        ax_lines, ax_labels = axes.get_legend_handles_labels()
+        lines += ax_lines
+        labels += ax_labels
+    parent_axes.legend(lines, labels, loc='upper right')
+    return missing
+
+
+def build_parent_axes(figure, year_range):
+    """Build a parent axes to hold the x axis shared by all the plots.
+
+    Args:
+        figure: matplotlib Figure to add the axes to.
+        year_range: Tuple of the string min and max years of the x axis.
+
+    Returns:
+        parent_axes: Axes object with correct x axis scale.
+    """
+    parent_axes = figure.add_subplot(1, 1, 1)
+    x_min = int(year_range[0]) - 1
+    x_max = int(year_range[1]) + 1
+    parent_axes.set_xlim([x_min, x_max])
+    parent_axes.ticklabel_format(axis='x', useOffset=False)
+    parent_axes.set_xticks([year for year in range(x_min, x_max+1)])
+    parent_axes.set_xlabel('Year')
+    return parent_axes
+
+
+def get_y_limits(y_data):
+    """Return min and max values to be used as y axis limits.
+
+    Args:
+        y_data: Data set with NaN for missing values.
+
+    Returns:
+        (y_min, y_max): Tuple with min and max axis limits.
+    """
+    min_scale = 0.9
+    max_scale = 1.1
+    y_min = np.nanmin(y_data)*min_scale
+    y_max = np.nanmax(y_data)*max_scale
+    return (y_min, y_max)
+
+
+def get_missing_message(series):
+    """Return the message alerting the user that a series has no data.
+
+    Args:
+        series: SeriesPlot without data.
+
+    Returns:
+        message: String message.
+    """
+    return (series.data_type + ' data does not exist for ' +
+            series.college + ' for years ' + series.start_year + '-' +
+            series.end_year + '. Data will not appear in plot.')
+
+
+def series_to_json(series_list):
+    """Return the series as a list of dictionaries that can be saved as JSON.
+
+    Missing values are written as null. Series read from a columnar export
+    hold NaN for missing values.
+
+    Args:
+        series_list: List of SeriesPlots.
+
+    Returns:
+        json_list: List with a dictionary of the attributes of each series.
+    """
+    return [dict(series.__dict__, data=[
+        None if value is None or np.isnan(value) else value
+        for value in series.data]) for series in series_list]
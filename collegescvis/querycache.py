@@ -0,0 +1,132 @@
+"""
+querycache.py
+Copyright (C) <2017>  <S. Cline>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import collections
+import sys
+
+
+class QueryCache(object):
+    """Least recently used cache of database query results.
+
+    Results are stored by key, for example (college, data_type, year). The
+    cache is bounded by the approximate size of its keys and values in bytes.
+    When it grows past max_bytes, the least recently used results are evicted.
+
+    The cache also records a signature of the database the results came from.
+    Results are cleared when validate is called with a different signature.
+
+    Attributes:
+        max_bytes: Approximate maximum size of the cached results in bytes.
+        size: Approximate size of the cached results in bytes.
+        signature: Signature of the database the cached results came from.
+    """
+
+    def __init__(self, max_bytes=16*1024*1024):
+        self._validate_max_bytes(max_bytes)
+
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.signature = None
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def _validate_max_bytes(max_bytes):
+        """Raise exceptions for an invalid cache size.
+
+        Args:
+            max_bytes: Maximum size of the cached results in bytes.
+
+        Raises:
+            TypeError: If the size is not an integer.
+            ValueError: If the size is negative.
+        """
+        if not isinstance(max_bytes, int):
+            raise TypeError('Cache size is not an integer')
+        if max_bytes < 0:
+            raise ValueError('Cache size must not be negative')
+
+    def get(self, key):
+        """Return the cached values of a key and mark them as recently used.
+
+        Args:
+            key: Hashable key of the results.
+
+        Returns:
+            values: Tuple of cached values, or None if the key is not cached.
+        """
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, values):
+        """Cache the values of a key, evicting old results if needed.
+
+        Values larger than the whole cache are not stored.
+
+        Args:
+            key: Hashable key of the results.
+            values: Iterable of values returned by the database.
+        """
+        values = tuple(values)
+        size = self._get_size(key, values)
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (values, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.size -= old_size
+
+    def clear(self):
+        """Remove all cached results."""
+        self._entries.clear()
+        self.size = 0
+
+    def validate(self, signature):
+        """Clear the cache if the database signature has changed.
+
+        Args:
+            signature: Hashable signature of the database's current state.
+        """
+        if signature != self.signature:
+            self.clear()
+            self.signature = signature
+
+    @staticmethod
+    def _get_size(key, values):
+        """Return the approximate size of a cache entry in bytes.
+
+        Args:
+            key: Tuple key of the results.
+            values: Tuple of cached values.
+
+        Returns:
+            size: Approximate size in bytes of the key and values.
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(values)
+        for item in key + values:
+            size += sys.getsizeof(item)
+        return size
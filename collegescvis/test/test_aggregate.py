@@ -0,0 +1,119 @@
+"""Unit tests for the aggregate module.
+
+Classes:
+    TestAggregate(unittest.TestCase): Test statistics across colleges.
+    TestGetPercentile(unittest.TestCase): Test percentiles of sorted values.
+"""
+import tempfile
+import unittest
+from aggregate import Aggregator, get_percentile
+from test.test_dbbuilder import build_test_database
+
+
+class TestAggregate(unittest.TestCase):
+    """Contains tests for computing statistics across colleges.
+
+    Methods:
+        test_wide_layout(self): Test statistics of the wide layout.
+        test_long_layout(self): Test statistics of the long layout.
+        test_filters(self): Test statistics of filtered colleges.
+        test_invalid_input(self): Test unknown data types and filters.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.aggregators = []
+
+    def tearDown(self):
+        for aggregator in self.aggregators:
+            aggregator.close()
+        self.temp_dir.cleanup()
+
+    def _build(self, layout):
+        """Return an Aggregator of a database with 1996 and 1998 data."""
+        db_path = build_test_database(self.temp_dir.name, {
+            '1996': [('100', 'College', '0.5', '1000'),
+                     ('200', 'Second College', 'NULL', '2000'),
+                     ('300', 'Third College', '0.25', '4000'),
+                     ('400', 'Fourth College', '0.75', 'NULL')],
+            '1998': [('100', 'College', '0.2', '1500')]}, layout)
+        self.aggregators.append(Aggregator(db_path))
+        return self.aggregators[-1]
+
+    def _assert_statistics(self, aggregator):
+        """Assert the statistics of ADM_RATE and UGDS in 1996-1998."""
+        statistics = aggregator.aggregate('ADM_RATE', percentiles=[25, 100])
+        self.assertEqual(list(range(1996, 2015)), statistics['year'])
+        self.assertEqual([3, 0, 1], statistics['count'][:3])
+        self.assertEqual([0.5, None, 0.2], statistics['mean'][:3])
+        self.assertEqual([0.5, None, 0.2], statistics['median'][:3])
+        self.assertEqual([0.375, None, 0.2], statistics['p25'][:3])
+        self.assertEqual([0.75, None, 0.2], statistics['p100'][:3])
+
+        statistics = aggregator.aggregate('UGDS')
+        self.assertEqual(
+            ['count', 'mean', 'median', 'p25', 'p75', 'year'],
+            sorted(statistics))
+        self.assertAlmostEqual(7000 / 3.0, statistics['mean'][0])
+        self.assertEqual(2000.0, statistics['median'][0])
+        self.assertEqual(3000.0, statistics['p75'][0])
+
+    def test_wide_layout(self):
+        """Test statistics of the wide layout."""
+        aggregator = self._build('wide')
+        self.assertEqual(['ADM_RATE', 'UGDS'], aggregator.data_types)
+        self._assert_statistics(aggregator)
+
+    def test_long_layout(self):
+        """Test statistics of the long layout."""
+        self._assert_statistics(self._build('long'))
+
+    def test_filters(self):
+        """Test statistics of filtered colleges."""
+        aggregator = self._build('wide')
+        statistics = aggregator.aggregate(
+            'ADM_RATE', {'INSTNM': ['College', 'Third College']})
+        self.assertEqual([2, 0, 1], statistics['count'][:3])
+        self.assertEqual([0.375, None, 0.2], statistics['mean'][:3])
+        statistics = aggregator.aggregate(
+            'ADM_RATE', {'INSTNM': 'Fourth College', 'ZIP': '12345'})
+        self.assertEqual([1, 0, 0], statistics['count'][:3])
+        self.assertEqual(0.75, statistics['median'][0])
+
+    def test_invalid_input(self):
+        """Test unknown data types, filter columns and percentiles."""
+        aggregator = self._build('wide')
+        self.assertRaises(
+            ValueError, lambda: aggregator.aggregate('INSTNM'))
+        self.assertRaises(
+            ValueError, lambda: aggregator.aggregate(
+                'UGDS', {'STABBR': 'TX'}))
+        for percentile in (101, -1, '50', True):
+            self.assertRaises(
+                ValueError, lambda: aggregator.aggregate(
+                    'UGDS', percentiles=[percentile]))
+
+
+class TestGetPercentile(unittest.TestCase):
+    """Contains tests for percentiles of sorted values.
+
+    Methods:
+        test_get_percentile(self): Test interpolated percentiles.
+    """
+
+    def test_get_percentile(self):
+        """Test interpolated percentiles."""
+        self.assertIsNone(get_percentile([], 50))
+        self.assertEqual(3.0, get_percentile([3], 90))
+        self.assertEqual(1.0, get_percentile([1, 2, 3, 4], 0))
+        self.assertEqual(2.5, get_percentile([1, 2, 3, 4], 50))
+        self.assertEqual(3.25, get_percentile([1, 2, 3, 4], 75))
+        self.assertEqual(4.0, get_percentile([1, 2, 3, 4], 100))
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""Unit tests for the batch and plotfigure modules.
+
+Classes:
+    TestRenderSpecs(unittest.TestCase): Test rendering plots from specs.
+    TestLoadSpecs(unittest.TestCase): Test reading plot spec files.
+    TestPlotFigure(unittest.TestCase): Test shared figure functions.
+"""
+import contextlib
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+import batch
+import plotfigure
+from plotdata import SeriesPlot
+from test.test_dbbuilder import build_test_database
+
+
+class TestRenderSpecs(unittest.TestCase):
+    """Contains tests for rendering plots from specs.
+
+    Methods:
+        test_render_specs(self): Test files written for each plot.
+        test_invalid_spec(self): Test a spec with an unknown college.
+        test_invalid_values(self): Test values of the wrong type.
+        test_main(self): Test the command line's exit status and report.
+        test_parallel_render(self): Test rendering with several processes.
+        test_aggregate_series(self): Test statistics across colleges.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, 'plots')
+        rows = [('100', 'College', '0.5', '1000'),
+                ('200', 'Other College', 'NULL', '2000')]
+        self.db_path = build_test_database(self.temp_dir.name, {'1996': rows})
+        self.specs = batch.load_specs(io.StringIO(json.dumps([
+            {'name': 'rates', 'series': [
+                {'college': 'College', 'data_type': 'ADM_RATE',
+                 'start_year': 1996, 'end_year': 1997},
+                {'college': 'Other College', 'data_type': 'UGDS',
+                 'start_year': 1996, 'end_year': 1997}]},
+            {'series': [
+                {'college': 'Other College', 'data_type': 'ADM_RATE',
+                 'start_year': 1996, 'end_year': 1996}]}])))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_render_specs(self):
+        """Test files written for each plot."""
+        results = batch.render_specs(
+            self.db_path, self.specs, self.output_dir, ['png', 'svg', 'json'])
+        self.assertEqual(['rates', 'plot002'],
+                         [result[0] for result in results])
+        for name, paths, _, error in results:
+            self.assertIsNone(error)
+            self.assertEqual(
+                [os.path.join(self.output_dir, name + extension)
+                 for extension in ('.png', '.svg', '.json')], paths)
+            for path in paths:
+                self.assertTrue(os.path.getsize(path) > 0)
+        self.assertEqual([], results[0][2])
+        self.assertEqual(1, len(results[1][2]))
+
+        with open(results[0][1][2], 'r') as json_file:
+            series_list = json.load(json_file)
+        self.assertEqual([0.5, None], series_list[0]['data'])
+        self.assertEqual([2000, None], series_list[1]['data'])
+
+    def test_invalid_spec(self):
+        """Test a spec with an unknown college."""
+        self.specs[0]['series'][0]['college'] = 'Unknown College'
+        results = batch.render_specs(self.db_path, self.specs,
+                                     self.output_dir)
+        self.assertEqual([], results[0][1])
+        self.assertIn('Unknown College', results[0][3])
+        self.assertIsNone(results[1][3])
+
+    def test_invalid_values(self):
+        """Test values of the wrong type only failing their plot."""
+        self.specs[0]['series'][0] = {
+            'statistic': 'median', 'data_type': 'UGDS',
+            'filters': {'ZIP': [{'a': 1}]}, 'start_year': 1996,
+            'end_year': 1997}
+        self.specs.append({'name': 'year', 'series': [
+            {'college': 'College', 'data_type': 'UGDS', 'start_year': None,
+             'end_year': 1997}]})
+        results = batch.render_specs(self.db_path, self.specs,
+                                     self.output_dir, ['json'])
+        self.assertEqual([], results[0][1])
+        self.assertIsNotNone(results[0][3])
+        self.assertIsNone(results[1][3])
+        self.assertIsNotNone(results[2][3])
+        batch._aggregator.close()
+        batch._aggregator = None
+
+    def test_main(self):
+        """Test the exit status and report of the command line."""
+        spec_path = os.path.join(self.temp_dir.name, 'spec.json')
+        self.specs.append({'name': 'empty', 'series': []})
+        with open(spec_path, 'w') as spec_file:
+            json.dump(self.specs, spec_file)
+        argv = [spec_path, '--db', self.db_path, '--output-dir',
+                self.output_dir, '--formats', 'json']
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(1, batch.main(argv))
+        self.assertIn('Failed to render empty: Plot empty has no series',
+                      output.getvalue())
+        self.assertIn('2 of 3 plots rendered.', output.getvalue())
+
+        #A spec file that is not a list of plots is reported.
+        with open(spec_path, 'w') as spec_file:
+            spec_file.write('{')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(1, batch.main(argv))
+        self.assertIn('Invalid spec file', output.getvalue())
+
+    def test_parallel_render(self):
+        """Test rendering with several processes."""
+        results = batch.render_specs(
+            self.db_path, self.specs, self.output_dir, ['json'], workers=2)
+        self.assertEqual(
+            [[os.path.join(self.output_dir, 'rates.json')],
+             [os.path.join(self.output_dir, 'plot002.json')]],
+            [result[1] for result in results])
+
+    def test_aggregate_series(self):
+        """Test plotting statistics across colleges with a college."""
+        specs = batch.load_specs(io.StringIO(json.dumps([
+            {'name': 'median', 'series': [
+                {'statistic': 'median', 'data_type': 'ADM_RATE',
+                 'filters': {'ZIP': '12345'}, 'start_year': 1996,
+                 'end_year': 1997},
+                {'statistic': 'p100', 'data_type': 'UGDS',
+                 'start_year': 1996, 'end_year': 1996},
+                {'college': 'Other College', 'data_type': 'UGDS',
+                 'start_year': 1996, 'end_year': 1996}]},
+            {'name': 'unknown', 'series': [
+                {'statistic': 'q5', 'data_type': 'UGDS',
+                 'start_year': 1996, 'end_year': 1996}]},
+            {'name': 'reversed', 'series': [
+                {'statistic': 'median', 'data_type': 'UGDS',
+                 'start_year': 1997, 'end_year': 1996}]}])))
+        results = batch.render_specs(
+            self.db_path, specs, self.output_dir, ['json'])
+        self.assertIsNone(results[0][3])
+        with open(results[0][1][0], 'r') as json_file:
+            series_list = json.load(json_file)
+        self.assertEqual(
+            [('median of ZIP=12345', [0.5, None]),
+             ('p100 of all colleges', [2000.0]),
+             ('Other College', [2000])],
+            [(series['college'], series['data']) for series in series_list])
+        self.assertIn('Unknown statistic', results[1][3])
+        self.assertIn('Start year is after end year', results[2][3])
+        batch._aggregator.close()
+        batch._aggregator = None
+
+
+class TestLoadSpecs(unittest.TestCase):
+    """Contains tests for reading plot spec files.
+
+    Methods:
+        test_invalid_file(self): Test rejected spec files.
+        test_invalid_plots(self): Test invalid plots of a spec file.
+    """
+
+    def test_invalid_file(self):
+        """Test rejected spec files."""
+        self.assertRaises(
+            ValueError, lambda: batch.load_specs(io.StringIO('{"series"')))
+        self.assertRaises(
+            ValueError,
+            lambda: batch.load_specs(io.StringIO(json.dumps({'series': []}))))
+
+    def test_invalid_plots(self):
+        """Test that each invalid plot is reported without the others."""
+        series = {'college': 'College', 'data_type': 'UGDS',
+                  'start_year': 1996, 'end_year': 1997}
+        median = {'statistic': 'median', 'data_type': 'UGDS',
+                  'start_year': 1996, 'end_year': 1997}
+        specs = batch.load_specs(io.StringIO(json.dumps([
+            {'name': 'a', 'series': [series]},
+            {'name': 'empty', 'series': []},
+            {'name': '../plot', 'series': [series]},
+            {'name': 'a', 'series': [series]},
+            {'series': [{'college': 'College'}]},
+            {'series': [{'statistic': 'median', 'start_year': 1996,
+                         'end_year': 1997}]},
+            {'series': [dict(median, filters={'ZIP': {'a': 1}})]},
+            {'series': [dict(median, filters=['ZIP'])]},
+            ['not a plot'],
+            {'name': 'b', 'series': [
+                dict(median, filters={'ZIP': ['12345', 1]})]}])))
+        errors = [spec.get('error') for spec in specs]
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[-1])
+        for error, expected in zip(
+                errors[1:-1],
+                ('no series', 'Invalid plot name', 'Duplicate plot name',
+                 'has no data_type', 'has no data_type',
+                 'Invalid ZIP filter', 'not a dictionary', 'no series')):
+            self.assertIn(expected, error)
+        self.assertEqual('plot009', specs[8]['name'])
+
+
+class TestPlotFigure(unittest.TestCase):
+    """Contains tests for the shared figure functions.
+
+    Methods:
+        test_get_y_limits(self): Test limits ignoring missing values.
+        test_series_to_json(self): Test missing values written as null.
+    """
+
+    def test_get_y_limits(self):
+        """Test limits ignoring missing values."""
+        y_min, y_max = plotfigure.get_y_limits(
+            [float('nan'), 10.0, 20.0])
+        self.assertAlmostEqual(9.0, y_min)
+        self.assertAlmostEqual(22.0, y_max)
+
+    def test_series_to_json(self):
+        """Test missing values written as null."""
+        series = SeriesPlot('College', 'UGDS', '2000', '2002', False)
+        series.data = [1.0, None, float('nan')]
+        json_list = plotfigure.series_to_json([series])
+        self.assertEqual([1.0, None, None], json_list[0]['data'])
+        self.assertEqual('College', json_list[0]['college'])
+        self.assertTrue(math.isnan(series.data[2]))
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
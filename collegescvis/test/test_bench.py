@@ -0,0 +1,99 @@
+"""Unit tests for the benchmark modules.
+
+Classes:
+    TestSynthetic(unittest.TestCase): Test synthetic raw data files.
+    TestPipeline(unittest.TestCase): Test the pipeline benchmark.
+"""
+import json
+import os
+import tempfile
+import unittest
+import decoder
+from bench import bench_pipeline, synthetic
+
+
+class TestSynthetic(unittest.TestCase):
+    """Contains tests for synthetic raw data files.
+
+    Methods:
+        test_file_shape(self): Test the rows and columns of the files.
+        test_data_types(self): Test the data types found by the decoder.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.year_paths = synthetic.write_merged_files(
+            self.temp_dir.name, 200, 2, quoted_density=0.5)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _read_rows(self, path):
+        """Return the rows of a raw data file."""
+        with open(path, 'r', newline='') as data_file:
+            return list(decoder.read_rows(data_file))
+
+    def test_file_shape(self):
+        """Test the rows, columns and missing values of the files."""
+        self.assertEqual(
+            ['MERGED1996_PP.csv', 'MERGED1997_PP.csv'],
+            [os.path.basename(path) for path, _ in self.year_paths])
+        first_rows, second_rows = [
+            self._read_rows(path) for path, _ in self.year_paths]
+        self.assertEqual(201, len(first_rows))
+        self.assertEqual('INSTNM', first_rows[0][3])
+        for row in first_rows:
+            self.assertEqual(synthetic.COLUMNS, len(row))
+        self.assertEqual([row[0] for row in first_rows],
+                         [row[0] for row in second_rows])
+        self.assertTrue(any(',' in row[3] for row in first_rows))
+
+        values = [value for row in first_rows[1:] for value in row[36:]]
+        for value, density in (('NULL', 0.6), ('PrivacySuppressed', 0.1)):
+            self.assertAlmostEqual(
+                density, values.count(value) / float(len(values)), delta=0.02)
+
+    def test_data_types(self):
+        """Test the data types found by the decoder."""
+        types_path = os.path.join(self.temp_dir.name, 'data_types.txt')
+        decoder.write_data_types(
+            os.path.join(self.temp_dir.name, 'MERGED*.csv'), types_path)
+        with open(types_path, 'r') as types_file:
+            data_types = json.load(types_file)
+        self.assertEqual(synthetic.COLUMNS, len(data_types))
+        self.assertEqual(
+            [name for name, _ in synthetic.get_columns()],
+            [name for name, _, _ in data_types])
+        self.assertEqual(['INSTNM', 'TEXT', 3], data_types[3])
+        self.assertEqual(['ZIP', 'TEXT', 6], data_types[6])
+
+
+class TestPipeline(unittest.TestCase):
+    """Contains tests for the pipeline benchmark.
+
+    Methods:
+        test_run_pipeline(self): Test the timed stages of a small run.
+    """
+
+    def test_run_pipeline(self):
+        """Test the timed stages of a small run."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results = bench_pipeline.run_pipeline(
+                temp_dir, 20, years=2, series=5, columns=100)
+        self.assertEqual(
+            ['write_data_types', 'build_database', 'update_database',
+             'build_indexes', 'open_plot_settings', 'query_db'],
+            [result['stage'] for result in results])
+        self.assertEqual(40, results[2]['rows'])
+        self.assertIsNone(results[1]['rows_per_second'])
+        for result in results:
+            self.assertEqual(20, result['scale'])
+            self.assertGreater(result['seconds'], 0)
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
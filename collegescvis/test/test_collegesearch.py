@@ -0,0 +1,130 @@
+"""Unit tests for the collegesearch module.
+
+Classes:
+    TestCollegeIndex(unittest.TestCase): Test type-ahead college searches.
+"""
+import os
+import tempfile
+import unittest
+from collegesearch import CollegeIndex
+from dbbuilder import Dbbuilder
+from test.test_dbbuilder import write_test_files
+
+TEST_ENTRIES = [('University of Texas at Austin', 'Austin', 'TX'),
+                ('University of Houston', 'Houston', 'TX'),
+                ('Rice University', 'Houston', 'TX'),
+                ('Texas A & M University-College Station',
+                 'College Station', 'TX'),
+                ('Boston College', 'Chestnut Hill', 'MA'),
+                ('Boston University', 'Boston', 'MA')]
+
+
+class TestCollegeIndex(unittest.TestCase):
+    """Contains tests for type-ahead college searches.
+
+    Methods:
+        test_prefix_search(self): Test names starting with the query.
+        test_fuzzy_search(self): Test queries with typos and places.
+        test_from_database(self): Test an index of a College table.
+        test_mixed_case_names(self): Test names with mixed case.
+        test_full_size_index(self): Test searches of a full-size index.
+    """
+
+    def setUp(self):
+        self.index = CollegeIndex(TEST_ENTRIES)
+
+    def _search_names(self, query, limit=50):
+        """Return the names of the colleges matching a query."""
+        return [entry[0] for entry in self.index.search(query, limit)]
+
+    def test_prefix_search(self):
+        """Test names starting with the query listed first."""
+        self.assertEqual(
+            ['Boston College', 'Boston University'],
+            self._search_names('bos')[:2])
+        self.assertEqual(
+            'University of Houston', self._search_names('University o')[0])
+        self.assertEqual(['Boston College'], self._search_names('b', 1))
+        self.assertEqual(6, len(self._search_names('')))
+        self.assertEqual([], self._search_names('zzzz'))
+
+    def test_fuzzy_search(self):
+        """Test queries with typos, words out of order and places."""
+        self.assertEqual('Rice University', self._search_names('rice univ')[0])
+        self.assertEqual('University of Houston',
+                         self._search_names('univrsity of houstn')[0])
+        self.assertEqual(
+            'Texas A & M University-College Station',
+            self._search_names('texas a&m')[0])
+        self.assertEqual(
+            ['Rice University', 'University of Houston'],
+            sorted(self._search_names('houston tx')[:2]))
+        self.assertNotIn('Boston College', self._search_names('houston tx'))
+
+    def test_from_database(self):
+        """Test an index of the colleges of a database."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'db.sqlite')
+            data_types_path, raw_data_path = write_test_files(
+                temp_dir, [('100', 'College', '0.5', '1000'),
+                           ('200', 'Other College', 'NULL', '2000')])
+            builder = Dbbuilder(db_path, data_types_path)
+            builder.build_database()
+            builder.update_database(raw_data_path, '1996')
+            index = CollegeIndex.from_database(builder.cur)
+            builder.conn.close()
+        self.assertEqual([('College', '', ''), ('Other College', '', '')],
+                         index.entries)
+
+    def test_mixed_case_names(self):
+        """Test prefix searches of names with mixed case and punctuation.
+
+        The trigram matches are turned off, so only names found by bisecting
+        the sorted names are returned.
+        """
+        self.index = CollegeIndex([
+            ('DeVry University', 'Chicago', 'IL'),
+            ('Dean College', 'Franklin', 'MA'),
+            ('McDaniel College', 'Westminster', 'MD'),
+            ('Mcallen Beauty Academy', 'McAllen', 'TX'),
+            ('A-B Tech', 'Asheville', 'NC'),
+            ('A C College', 'Anytown', 'NC'),
+            ('eastern Gateway College', 'Steubenville', 'OH'),
+            ('Eastern Kentucky University', 'Richmond', 'KY'),
+            ('Emory University', 'Atlanta', 'GA')])
+        self.index.MIN_SCORE = float('inf')
+        for query, names in (
+                ('dean', ['Dean College']),
+                ('devry', ['DeVry University']),
+                ('mcd', ['McDaniel College']),
+                ('mca', ['Mcallen Beauty Academy']),
+                ('eastern', ['eastern Gateway College',
+                             'Eastern Kentucky University']),
+                ('a b', ['A-B Tech']),
+                ('a c', ['A C College'])):
+            self.assertEqual(names, self._search_names(query))
+
+    def test_full_size_index(self):
+        """Test searches of an index the size of the College table."""
+        words = ['University', 'College', 'Community', 'State', 'Technical',
+                 'Institute', 'Saint', 'Christian', 'Beauty', 'Academy']
+        self.index = CollegeIndex(
+            [('%s %s %d' % (words[number % 10], words[number % 7], number),
+              'City %d' % (number % 500), 'TX') for number in range(7500)])
+        names = self._search_names('univ')
+        self.assertEqual(50, len(names))
+        for name in names:
+            self.assertTrue(name.startswith('University '))
+        self.assertTrue(
+            self._search_names('college state')[0].startswith(
+                'College State '))
+        names = self._search_names('comunity colege 12')
+        self.assertEqual(50, len(names))
+        self.assertIn('College Community 12', names[0])
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
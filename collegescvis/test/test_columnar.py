@@ -0,0 +1,127 @@
+"""Unit tests for the columnar module.
+
+Classes:
+    TestExportColumns(unittest.TestCase): Test exporting the year data.
+"""
+import math
+import mmap
+import os
+import tempfile
+import unittest
+import columnar
+from columnar import ColumnarCache
+from test.test_dbbuilder import build_test_database
+
+
+class TestExportColumns(unittest.TestCase):
+    """Contains tests for exporting and reading the year data.
+
+    Methods:
+        test_wide_layout(self): Test series exported from year tables.
+        test_long_layout(self): Test series exported from observations.
+        test_unavailable_series(self): Test series not held by the export.
+        test_is_current(self): Test detecting a changed database.
+        test_close(self): Test closing the export.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.columns_dir = os.path.join(self.temp_dir.name, 'columns')
+        self.cache = None
+
+    def tearDown(self):
+        if self.cache is not None:
+            self.cache.close()
+        self.temp_dir.cleanup()
+
+    def _build(self, layout):
+        """Build a database with data for 1997 and 1999 and export it."""
+        self.db_path = build_test_database(self.temp_dir.name, {
+            '1997': [('100', 'College', '0.5', '1000'),
+                     ('200', 'Twin College', 'NULL', '2000'),
+                     ('300', 'Twin College', '0.1', '3000')],
+            '1999': [('100', 'College', '0.25', 'PrivacySuppressed')]},
+            layout)
+        columnar.export_columns(self.db_path, self.columns_dir)
+        self.cache = ColumnarCache(self.columns_dir)
+
+    def _assert_series(self, expected, values):
+        """Assert series values are equal, with None for NaN."""
+        self.assertEqual(
+            expected, [None if math.isnan(value) else value
+                       for value in values])
+
+    def test_wide_layout(self):
+        """Test series exported from year tables."""
+        self._build('wide')
+        self.assertEqual(list(range(1996, 2015)), self.cache.years)
+        self.assertEqual(['ADM_RATE', 'UGDS'], sorted(self.cache.metrics))
+        values = self.cache.get_series('ADM_RATE', 'College', 1996, 2000)
+        self._assert_series([None, 0.5, None, 0.25, None], values)
+        self._assert_series(
+            [1000.0, None],
+            self.cache.get_series('UGDS', 'College', 1997, 1998))
+
+        #Series are slices of the memory map, not copies.
+        self.assertIsInstance(values.obj, mmap.mmap)
+        del values
+
+    def test_long_layout(self):
+        """Test series exported from observations."""
+        self._build('long')
+        self._assert_series(
+            [0.5, None, 0.25],
+            self.cache.get_series('ADM_RATE', 'College', 1997, 1999))
+        self._assert_series(
+            [1000.0, None, None],
+            self.cache.get_series('UGDS', 'College', 1997, 1999))
+
+    def test_unavailable_series(self):
+        """Test series not held by the export."""
+        self._build('wide')
+        self.assertIsNone(
+            self.cache.get_series('INSTNM', 'College', 1997, 1999))
+        self.assertIsNone(
+            self.cache.get_series('UGDS', 'Other College', 1997, 1999))
+        self.assertIsNone(
+            self.cache.get_series('UGDS', 'Twin College', 1997, 1999))
+        self.assertIsNone(
+            self.cache.get_series('UGDS', 'College', 1990, 1999))
+        self.assertIsNone(
+            self.cache.get_series('UGDS', 'College', 1999, 1997))
+
+    def test_is_current(self):
+        """Test detecting a database changed after its export."""
+        self._build('wide')
+        self.assertTrue(columnar.is_current(self.columns_dir, self.db_path))
+        self.assertTrue(self.cache.is_current(self.db_path))
+        with open(self.db_path, 'ab') as db_file:
+            db_file.write(b'\0')
+        self.assertFalse(columnar.is_current(self.columns_dir, self.db_path))
+        self.assertFalse(self.cache.is_current(self.db_path))
+        self.assertFalse(columnar.is_current(
+            os.path.join(self.temp_dir.name, 'missing'), self.db_path))
+
+    def test_close(self):
+        """Test closing the export, with and without series in use."""
+        self._build('wide')
+        values = self.cache.get_series('ADM_RATE', 'College', 1997, 1997)
+        self.cache.close()
+        self.assertTrue(self.cache._file.closed)
+        self.assertFalse(self.cache._map.closed)
+        self.assertEqual([0.5], values.tolist())
+        del values
+
+        self._build('wide')
+        self.cache.close()
+        self.assertTrue(self.cache._file.closed)
+        self.assertTrue(self.cache._map.closed)
+        self.cache = None
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,91 @@
 Classes:
     TestInitializeDatabase(unittest.TestCase): Test database init.
     TestSanitize(unittest.TestCase): Test sanitize function.
+    TestUpdateDatabase(unittest.TestCase): Test adding raw data to database.
+    TestBuildIndexes(unittest.TestCase): Test creating database indexes.
+    TestLongLayout(unittest.TestCase): Test the long storage layout.
+    TestUpdateYears(unittest.TestCase): Test adding several years of data.
+    TestRowPlan(unittest.TestCase): Test converting raw data rows.
+    TestBuildProfile(unittest.TestCase): Test the build connection profile.
+    TestBuildDatabase(unittest.TestCase): Test building the database schema.
+    TestDataTypeIndex(unittest.TestCase): Test the data type search table.
 """
+import contextlib
+import io
+import json
+import multiprocessing.pool
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
 import unittest
-from dbbuilder import Dbbuilder
+import columnar
+import dbbuilder
+from dbbuilder import Dbbuilder, RowPlan
+from instrumentation import Metrics
+from plotdata import PlotSettings
+
+#Data types for a small raw data file. Indices above 35 belong to the year
+#tables, so each raw data line holds 41 values.
+TEST_DATA_TYPES = [
+    ['UNITID', 'INTEGER', 0], ['INSTNM', 'TEXT', 3], ['ZIP', 'TEXT', 6],
+    ['ADM_RATE', 'REAL', 37], ['UGDS', 'INTEGER', 40]]
+
+
+def write_test_files(directory, rows, year='1996'):
+    """Write a data types file and a raw data file for building a database.
+
+    Args:
+        directory: Path of the directory to write the files to.
+        rows: List of (UNITID, INSTNM, ADM_RATE, UGDS) string tuples.
+        year: String year in the name of the raw data file.
+
+    Returns:
+        (data_types_path, raw_data_path): Paths of the written files.
+    """
+    data_types_path = os.path.join(directory, 'data_types.txt')
+    with open(data_types_path, 'w') as data_types_file:
+        data_types_file.write(json.dumps(TEST_DATA_TYPES))
+
+    raw_data_path = os.path.join(directory, 'MERGED%s_PP.csv' % (year,))
+    with open(raw_data_path, 'w') as raw_data_file:
+        header = ['COL%s' % index for index in range(41)]
+        for name, _, index in TEST_DATA_TYPES:
+            header[index] = name
+        raw_data_file.write(','.join(header) + '\n')
+        for unitid, instnm, adm_rate, ugds in rows:
+            line = ['NULL'] * 41
+            line[0], line[3], line[6] = unitid, instnm, '12345'
+            line[37], line[40] = adm_rate, ugds
+            raw_data_file.write(','.join(line) + '\n')
+    return data_types_path, raw_data_path
+
+
+def build_test_database(directory, rows_by_year, layout='wide'):
+    """Build a database from test files, or add years to one built before.
+
+    Args:
+        directory: Path of the directory to write the files and database to.
+        rows_by_year: Dictionary of string year to a list of (UNITID, INSTNM,
+            ADM_RATE, UGDS) string tuples.
+        layout: Storage layout of the year data, 'wide' or 'long'.
+
+    Returns:
+        db_path: Path of the database, named after its layout.
+    """
+    db_path = os.path.join(directory, layout + '.sqlite')
+    builder = None
+    for year in sorted(rows_by_year):
+        data_types_path, raw_data_path = write_test_files(
+            directory, rows_by_year[year], year)
+        if builder is None:
+            builder = Dbbuilder(db_path, data_types_path, layout)
+            builder.build_database()
+        builder.update_database(raw_data_path, year)
+    builder.conn.close()
+    return db_path
 
 
 class TestInitializeDatabase(unittest.TestCase):
@@ -15,6 +97,8 @@ class TestInitializeDatabase(unittest.TestCase):
         test_invalid_db_path(self): Test invalid database path input.
         test_invalid_data_types_path(self): Test invalid data types path.
         test_empty_data_types_path(self): Test empty data types path.
+        test_invalid_layout(self): Test unknown storage layout.
+        test_invalid_profile(self): Test unknown connection profile.
     """
 
     def test_invalid_db_path(self):
@@ -41,6 +125,16 @@ class TestInitializeDatabase(unittest.TestCase):
             FileNotFoundError, lambda: Dbbuilder(
                 valid_db_path, empty_data_types_path))
 
+    def test_invalid_layout(self):
+        """Test unknown storage layout."""
+        self.assertRaises(
+            ValueError, lambda: Dbbuilder._validate_layout('tall'))
+
+    def test_invalid_profile(self):
+        """Test unknown connection profile."""
+        self.assertRaises(
+            ValueError, lambda: Dbbuilder._validate_profile('fast'))
+
 
 class TestSanitize(unittest.TestCase):
     """Contains tests for dbbuilder's sanitize function.
@@ -88,6 +182,719 @@ class TestSanitize(unittest.TestCase):
             ValueError, lambda: Dbbuilder.sanitize(invalid_input_string))
 
 
+class TestUpdateDatabase(unittest.TestCase):
+    """Contains tests for adding raw data to the database.
+
+    Methods:
+        test_update_database(self): Test rows written across several chunks.
+        test_repeated_update(self): Test adding the same data twice.
+        test_invalid_batch_size(self): Test a batch size less than 1.
+        test_college_ids(self): Test the UNITID to college_id dictionary.
+        test_unchanged_file(self): Test skipping a file already added.
+        test_changed_file(self): Test replacing the data of a changed file.
+        test_first_load(self): Test years deleted only once recorded.
+        test_single_pass(self): Test the file hash and progress of one read.
+        test_row_length(self): Test a row with a missing value.
+        test_flat_memory(self): Test memory use independent of file size.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, self.raw_data_path = write_test_files(
+            self.temp_dir.name, [
+                ('100', '"College, The"', '0.5', '1000'),
+                ('200', 'Second College', 'NULL', '2000'),
+                ('300', 'Third College', '0.25', 'PrivacySuppressed')])
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.builder.build_database()
+
+    def tearDown(self):
+        self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def _select(self, statement):
+        """Return all rows selected from the test database."""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(statement).fetchall()
+
+    def test_update_database(self):
+        """Test rows written across several chunks."""
+        self.builder.update_database(self.raw_data_path, '1996', batch_size=2)
+        self.assertEqual(
+            [(1, 100, 'College, The', '12345'),
+             (2, 200, 'Second College', '12345'),
+             (3, 300, 'Third College', '12345')],
+            self._select('SELECT * FROM College ORDER BY college_id'))
+        self.assertEqual(
+            [(1, 0.5, 1000), (2, None, 2000), (3, 0.25, None)],
+            self._select('SELECT * FROM "1996" ORDER BY college_id'))
+
+    def test_repeated_update(self):
+        """Test that adding the same data twice does not duplicate rows."""
+        self.builder.update_database(self.raw_data_path, '1996')
+        self.builder.update_database(self.raw_data_path, '1997')
+        self.builder.update_database(self.raw_data_path, '1997')
+        self.assertEqual(
+            [(3,)], self._select('SELECT Count(*) FROM College'))
+        self.assertEqual(
+            [(3,)], self._select('SELECT Count(*) FROM "1997"'))
+
+    def test_invalid_batch_size(self):
+        """Test a batch size less than 1."""
+        self.assertRaises(
+            ValueError, lambda: self.builder.update_database(
+                self.raw_data_path, '1996', batch_size=0))
+
+    def test_college_ids(self):
+        """Test the UNITID to college_id dictionary of a reopened database."""
+        self.assertEqual({}, self.builder.college_ids)
+        self.builder.update_database(self.raw_data_path, '1996')
+        self.assertEqual({100: 1, 200: 2, 300: 3}, self.builder.college_ids)
+        self.builder.conn.close()
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertEqual({100: 1, 200: 2, 300: 3}, self.builder.college_ids)
+
+    def test_unchanged_file(self):
+        """Test skipping a file already added."""
+        self.assertTrue(
+            self.builder.update_database(self.raw_data_path, '1996'))
+        self.assertFalse(
+            self.builder.update_database(self.raw_data_path, '1996'))
+
+        #A new modification time alone does not change the file.
+        stat = os.stat(self.raw_data_path)
+        os.utime(self.raw_data_path,
+                 ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertFalse(
+            self.builder.update_database(self.raw_data_path, '1996'))
+        self.assertEqual(
+            [(stat.st_mtime_ns + 10**9,)],
+            self._select('SELECT mtime FROM Manifest'))
+
+    def test_changed_file(self):
+        """Test replacing the data of a changed file."""
+        self.builder.update_database(self.raw_data_path, '1996')
+        write_test_files(
+            self.temp_dir.name, [('200', 'Second College', '0.75', '2500')])
+        self.assertTrue(
+            self.builder.update_database(self.raw_data_path, '1996'))
+        self.assertEqual(
+            [(2, 0.75, 2500)], self._select('SELECT * FROM "1996"'))
+
+    def test_first_load(self):
+        """Test that only years recorded in the Manifest are deleted."""
+        statements = []
+        self.builder.conn.set_trace_callback(statements.append)
+        self.builder.update_database(self.raw_data_path, '1996')
+        self.assertEqual(
+            [], [statement for statement in statements
+                 if statement.startswith('DELETE')])
+
+        #A load interrupted after committing rows left the year recorded
+        #without a hash, so its rows are deleted on the next run.
+        self.builder.cur.execute(
+            '''UPDATE Manifest SET size = NULL, hash = NULL''')
+        self.builder.conn.commit()
+        write_test_files(
+            self.temp_dir.name, [('200', 'Second College', '0.75', '2500')])
+        statements[:] = []
+        self.assertTrue(
+            self.builder.update_database(self.raw_data_path, '1996'))
+        self.assertIn('DELETE FROM "1996"', statements)
+        self.assertEqual(
+            [(2, 0.75, 2500)], self._select('SELECT * FROM "1996"'))
+
+    def test_single_pass(self):
+        """Test the hash and progress of a file read once."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.builder.update_database(self.raw_data_path, '1996')
+        self.assertIn('100%% of %s read, 3 rows' % (self.raw_data_path,),
+                      output.getvalue())
+        self.assertEqual(
+            [(Dbbuilder._hash_file(self.raw_data_path),)],
+            self._select('SELECT hash FROM Manifest'))
+
+    def test_row_length(self):
+        """Test that a row with a missing value is rejected."""
+        with open(self.raw_data_path, 'a') as raw_data_file:
+            raw_data_file.write(','.join(['400'] + ['NULL'] * 39) + '\n')
+        self.assertRaises(
+            ValueError,
+            lambda: self.builder.update_database(
+                self.raw_data_path, '1996', batch_size=1))
+        self.assertEqual([], self._select('SELECT * FROM Manifest'))
+        #The rows committed before the malformed row are deleted again.
+        self.assertEqual([], self._select('SELECT * FROM "1996"'))
+
+    def test_flat_memory(self):
+        """Test that reading a file does not hold the whole file."""
+        #Few distinct UNITIDs keep RowPlan's memoized values from growing.
+        peaks = []
+        for rows in (100, 20000):
+            write_test_files(
+                self.temp_dir.name,
+                [(str(unitid % 10), 'College %d' % unitid, '0.5', '1000')
+                 for unitid in range(rows)])
+            tracemalloc.start()
+            for _ in dbbuilder._read_batches(
+                    self.raw_data_path, self.builder.row_plan, 50):
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+
+class TestBuildIndexes(unittest.TestCase):
+    """Contains tests for creating database indexes.
+
+    Methods:
+        test_build_indexes(self): Test indexes created with the tables.
+        test_defer_indexes(self): Test indexes created after adding data.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, self.raw_data_path = write_test_files(
+            self.temp_dir.name, [('100', 'College', '0.5', '1000')])
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+
+    def tearDown(self):
+        self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def _get_indexes(self):
+        """Return the sorted names of the indexes in the test database."""
+        self.builder.cur.execute(
+            '''SELECT name FROM sqlite_master WHERE type = 'index' AND
+            name NOT LIKE 'sqlite_autoindex%' ORDER BY name''')
+        return [row[0] for row in self.builder.cur.fetchall()]
+
+    def test_build_indexes(self):
+        """Test indexes created with the tables."""
+        self.builder.build_database()
+        self.assertEqual(['College_INSTNM', 'College_UNITID'],
+                         self._get_indexes())
+
+    def test_defer_indexes(self):
+        """Test indexes created after adding data."""
+        self.builder.build_database(defer_indexes=True)
+        self.assertEqual([], self._get_indexes())
+        self.builder.update_database(self.raw_data_path, '1996')
+        self.builder.build_indexes()
+        self.assertEqual(['College_INSTNM', 'College_UNITID'],
+                         self._get_indexes())
+        self.builder.cur.execute('''SELECT Count(*) FROM sqlite_stat1''')
+        self.assertGreater(self.builder.cur.fetchone()[0], 0)
+
+
+class TestLongLayout(unittest.TestCase):
+    """Contains tests for the long storage layout.
+
+    Methods:
+        test_build_database(self): Test tables built for the long layout.
+        test_update_database(self): Test values added as observations.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, self.raw_data_path = write_test_files(
+            self.temp_dir.name, [
+                ('100', 'College', '0.5', '1000'),
+                ('200', 'Other College', 'NULL', '2000')])
+        self.builder = Dbbuilder(
+            self.db_path, self.data_types_path, layout='long')
+        self.builder.build_database()
+
+    def tearDown(self):
+        self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_build_database(self):
+        """Test tables built for the long layout."""
+        self.builder.cur.execute('''SELECT * FROM Metric ORDER BY metric_id''')
+        self.assertEqual(
+            [(37, 'ADM_RATE', 'REAL'), (40, 'UGDS', 'INTEGER')],
+            self.builder.cur.fetchall())
+        self.builder.cur.execute('''SELECT Count(*) FROM Year''')
+        self.assertEqual(19, self.builder.cur.fetchone()[0])
+
+        #The layout of an existing database is kept when it is reopened.
+        self.builder.conn.close()
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertEqual('long', self.builder.layout)
+
+    def test_update_database(self):
+        """Test values added as observations."""
+        self.builder.update_database(self.raw_data_path, '2015')
+        self.builder.cur.execute('''
+            SELECT * FROM Observation ORDER BY metric_id, college_id''')
+        self.assertEqual(
+            [(37, 1, 2015, 0.5), (40, 1, 2015, 1000), (40, 2, 2015, 2000)],
+            self.builder.cur.fetchall())
+        self.builder.cur.execute('''SELECT Count(*) FROM Year''')
+        self.assertEqual(20, self.builder.cur.fetchone()[0])
+
+
+class TestUpdateYears(unittest.TestCase):
+    """Contains tests for adding several years of data.
+
+    Methods:
+        test_parallel_update(self): Test worker processes match one process.
+        test_row_length(self): Test a malformed file with several workers.
+        test_earlier_year_college(self): Test College rows of earlier years.
+        test_metrics(self): Test the metrics of each file added.
+        test_exited_workers(self): Test workers exiting before every file.
+        test_unchanged_rerun(self): Test a rerun leaves the database as is.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.year_paths = []
+        for year, name in (('1996', 'Old Name'), ('1997', 'New Name'),
+                           ('1998', 'Newest Name')):
+            rows = [('100', name, '0.5', year), ('%s' % year, name, '1', '2')]
+            self.data_types_path, raw_data_path = write_test_files(
+                self.temp_dir.name, rows, year)
+            self.year_paths.append((raw_data_path, year))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _build(self, name, workers):
+        """Build a database from the test files and return its contents."""
+        db_path = os.path.join(self.temp_dir.name, name)
+        builder = Dbbuilder(db_path, self.data_types_path)
+        builder.build_database()
+        updated_years = builder.update_years(self.year_paths, workers)
+        self.assertEqual(['1996', '1997', '1998'], sorted(updated_years))
+        self.assertEqual([], builder.update_years(self.year_paths, workers))
+        builder.cur.execute('''SELECT UNITID, INSTNM FROM College
+                            ORDER BY UNITID''')
+        colleges = builder.cur.fetchall()
+        years = []
+        for year in ('1996', '1997', '1998'):
+            builder.cur.execute('''SELECT UNITID, UGDS FROM "%s" JOIN College
+                                ON "%s".college_id = College.college_id
+                                ORDER BY UNITID''' % (year, year))
+            years.append(builder.cur.fetchall())
+        builder.conn.close()
+        return colleges, years
+
+    def test_parallel_update(self):
+        """Test that worker processes build the same database as one."""
+        colleges, years = self._build('serial.sqlite', 1)
+        self.assertEqual(
+            [(100, 'Old Name'), (1996, 'Old Name'), (1997, 'New Name'),
+             (1998, 'Newest Name')], colleges)
+        self.assertEqual((colleges, years), self._build('parallel.sqlite', 3))
+
+    def test_row_length(self):
+        """Test that a malformed file leaves no partly added year."""
+        with open(self.year_paths[1][0], 'a') as raw_data_file:
+            raw_data_file.write(','.join(['400'] + ['NULL'] * 39) + '\n')
+        db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        builder = Dbbuilder(db_path, self.data_types_path)
+        builder.build_database()
+        self.assertRaises(
+            ValueError,
+            lambda: builder.update_years(self.year_paths, 2, batch_size=1))
+        builder.cur.execute('''SELECT year FROM Manifest''')
+        recorded_years = [row[0] for row in builder.cur.fetchall()]
+        self.assertNotIn('1997', recorded_years)
+        for year in ('1996', '1997', '1998'):
+            builder.cur.execute('''SELECT Count(*) FROM "%s"''' % (year,))
+            self.assertEqual(2 if year in recorded_years else 0,
+                             builder.cur.fetchone()[0])
+        builder.conn.close()
+
+    def test_earlier_year_college(self):
+        """Test College rows replaced by data from an earlier year."""
+        db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        builder = Dbbuilder(db_path, self.data_types_path)
+        builder.build_database()
+        college_years = {}
+        for year, name in (('1998', 'Newest Name'), ('1996', 'Old Name'),
+                           ('1997', 'New Name')):
+            builder._insert_rows(
+                [[100, name, '12345', 0.5, 1]], year, college_years)
+        builder.cur.execute('''SELECT college_id, INSTNM FROM College''')
+        self.assertEqual([(1, 'Old Name')], builder.cur.fetchall())
+        self.assertEqual({100: '1996'}, college_years)
+        builder.conn.close()
+
+    def test_metrics(self):
+        """Test the rows and stage times of each file added."""
+        fields = []
+        for workers in (1, 2):
+            sink = io.StringIO()
+            metrics = Metrics(sink=sink)
+            builder = Dbbuilder(
+                os.path.join(self.temp_dir.name, 'metrics%d.sqlite' % workers),
+                self.data_types_path, metrics=metrics)
+            builder.build_database()
+            builder.update_years(self.year_paths, workers)
+            builder.conn.close()
+            lines = [json.loads(line) for line in sink.getvalue().splitlines()
+                     if json.loads(line)['stage'] == 'file']
+            self.assertEqual(['1996', '1997', '1998'],
+                             sorted(line['year'] for line in lines))
+            #Both paths write the same fields for each file.
+            for line in lines:
+                self.assertEqual(2, line['rows'])
+                self.assertGreater(line['seconds'], 0)
+                self.assertAlmostEqual(
+                    2 / line['seconds'], line['rows_per_second'])
+                for stage in ('read', 'tokenize', 'convert', 'insert',
+                              'commit'):
+                    self.assertIn(stage, line['stages'])
+                fields.append(sorted(line))
+            for stage in ('read', 'tokenize', 'convert', 'college_lookup',
+                          'insert', 'commit'):
+                self.assertIn(stage, metrics.totals)
+            #The files are hashed while they are read, not in another pass.
+            self.assertNotIn('hash', metrics.totals)
+            self.assertEqual(6, metrics.totals['insert'][1])
+            self.assertEqual(6, metrics.totals['file'][1])
+        self.assertEqual(1, len(set(map(tuple, fields))))
+
+    def test_exited_workers(self):
+        """Test that the writer stops when workers exit without a file."""
+        db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        builder = Dbbuilder(db_path, self.data_types_path)
+        builder.build_database()
+        builder.QUEUE_TIMEOUT = 0.01
+        #A killed worker sends nothing, while the pool's result is ready.
+        with multiprocessing.pool.ThreadPool(1) as pool:
+            result = pool.map_async(abs, [])
+            result.wait()
+            remaining = {'1996'}
+            self.assertRaises(
+                RuntimeError,
+                lambda: builder._write_batches(
+                    queue.Queue(), result, {'1996': self.year_paths[0][0]},
+                    remaining, {}))
+        self.assertEqual({'1996'}, remaining)
+
+        #The pool replaces a killed worker, so its result is never ready.
+        process = multiprocessing.Process(target=abs, args=(0,))
+        process.start()
+        process.join()
+        messages = queue.Queue()
+        messages.put(('start', '1996', process.pid))
+        running = threading.Event()
+        with multiprocessing.pool.ThreadPool(1) as pool:
+            result = pool.apply_async(running.wait)
+            self.assertRaises(
+                RuntimeError,
+                lambda: builder._write_batches(
+                    messages, result, {'1996': self.year_paths[0][0]},
+                    remaining, {}))
+            self.assertFalse(result.ready())
+            running.set()
+        builder.conn.close()
+
+    def test_unchanged_rerun(self):
+        """Test that a rerun with unchanged files leaves the database as is.
+
+        The database's export and metadata sidecar stay current.
+        """
+        db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        columns_dir = os.path.join(self.temp_dir.name, 'columns')
+        builder = Dbbuilder(db_path, self.data_types_path,
+                            build_profile='bulk')
+        builder.build_database()
+        builder.update_years(self.year_paths)
+        builder.conn.close()
+        #An older modification time shows any write to the database.
+        os.utime(db_path, ns=(0, 0))
+        columnar.export_columns(db_path, columns_dir)
+        plot_settings = PlotSettings(db_path, columns_dir)
+        plot_settings.columns.close()
+        plot_settings.cur.connection.close()
+
+        for workers in (1, 2):
+            builder = Dbbuilder(db_path, self.data_types_path,
+                                build_profile='bulk')
+            builder.build_database()
+            self.assertEqual([], builder.update_years(self.year_paths,
+                                                      workers))
+            builder.conn.close()
+            self.assertEqual(0, os.stat(db_path).st_mtime_ns)
+            self.assertTrue(columnar.is_current(columns_dir, db_path))
+            plot_settings = PlotSettings(db_path)
+            self.assertTrue(plot_settings._load_metadata())
+            plot_settings.cur.connection.close()
+
+
+class TestRowPlan(unittest.TestCase):
+    """Contains tests for converting raw data rows.
+
+    Methods:
+        test_convert(self): Test values converted in data type order.
+        test_single_type(self): Test data types with a single column type.
+        test_converter_reset(self): Test memoized values are bounded.
+    """
+
+    def test_convert(self):
+        """Test values converted in data type order."""
+        data_types = [['UNITID', 'INTEGER', 0], ['INSTNM', 'TEXT', 2],
+                      ['RATE', 'REAL', 37], ['COUNT', 'INTEGER', 38],
+                      ['NOTE', 'TEXT', 39]]
+        plan = RowPlan(data_types)
+        self.assertEqual(2, plan.year_start_index)
+        row = ['5', 'x', 'College', 'y'] + ['NULL'] * 33 + [
+            '0.5', 'PrivacySuppressed', 'NULL']
+        self.assertEqual([5, 'College', 0.5, None, None], plan.convert(row))
+        row[0], row[37], row[38] = '6', 'NULL', '7'
+        self.assertEqual([6, 'College', None, 7, None], plan.convert(row))
+
+    def test_single_type(self):
+        """Test data types with a single column type."""
+        plan = RowPlan([['UNITID', 'INTEGER', 1]])
+        self.assertEqual([3], plan.convert(['x', '3']))
+        self.assertEqual(0, plan.year_start_index)
+
+    def test_converter_reset(self):
+        """Test memoized values are bounded."""
+        plan = RowPlan([['UNITID', 'INTEGER', 0]])
+        converter = plan._converters['INTEGER']
+        self.assertEqual(['INTEGER'], list(plan._converters))
+        plan.convert(['7'])
+        self.assertIn('7', converter)
+        converter.MAX_VALUES = 10
+        for value in range(25):
+            self.assertEqual([value], plan.convert([str(value)]))
+        self.assertLessEqual(len(converter), converter.MAX_VALUES + 1)
+        self.assertEqual([None], plan.convert(['NULL']))
+
+
+class TestBuildProfile(unittest.TestCase):
+    """Contains tests for the build connection profile.
+
+    Methods:
+        test_bulk_profile(self): Test settings used and restored.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, self.raw_data_path = write_test_files(
+            self.temp_dir.name, [('100', 'College', '0.5', '1000')])
+        self.builder = Dbbuilder(
+            self.db_path, self.data_types_path, build_profile='bulk')
+
+    def tearDown(self):
+        self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def _get_settings(self):
+        """Return the journal mode and synchronous setting in use."""
+        self.builder.cur.execute('''PRAGMA journal_mode''')
+        journal_mode = self.builder.cur.fetchone()[0]
+        self.builder.cur.execute('''PRAGMA synchronous''')
+        return journal_mode, self.builder.cur.fetchone()[0]
+
+    def test_bulk_profile(self):
+        """Test settings used while building and restored afterwards."""
+        settings = []
+        insert_rows = self.builder._insert_rows
+        def record_settings(*args):
+            settings.append(self._get_settings())
+            insert_rows(*args)
+        self.builder._insert_rows = record_settings
+
+        self.builder.build_database()
+        self.assertEqual(('delete', 2), self._get_settings())
+        self.builder.update_database(self.raw_data_path, '1996')
+        self.assertEqual([('wal', 0)], settings)
+        self.assertEqual(('delete', 2), self._get_settings())
+        self.assertFalse(os.path.exists(self.db_path + '-wal'))
+
+
+class TestBuildDatabase(unittest.TestCase):
+    """Contains tests for building the database schema.
+
+    Methods:
+        test_table_columns(self): Test the columns of the built tables.
+        test_unchanged_schema(self): Test building an unchanged schema.
+        test_changed_schema(self): Test building a changed schema.
+        test_missing_fingerprint(self): Test rebuilding an old database.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, self.raw_data_path = write_test_files(
+            self.temp_dir.name, [('100', 'College', '0.5', '1000')])
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertTrue(self.builder.build_database())
+        self.builder.update_database(self.raw_data_path, '1996')
+
+    def tearDown(self):
+        self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def _get_columns(self, table_name):
+        """Return the (name, type, pk) of each column of a table."""
+        self.builder.cur.execute('''PRAGMA table_info("%s")''' % table_name)
+        return [(row[1], row[2], row[5]) for row in self.builder.cur]
+
+    def test_table_columns(self):
+        """Test the columns of the built tables."""
+        self.assertEqual(
+            [('college_id', 'INTEGER', 1), ('UNITID', 'INTEGER', 0),
+             ('INSTNM', 'TEXT', 0), ('ZIP', 'TEXT', 0)],
+            self._get_columns('College'))
+        for year in ('1996', '2014'):
+            self.assertEqual(
+                [('college_id', 'INTEGER', 1), ('ADM_RATE', 'REAL', 0),
+                 ('UGDS', 'INTEGER', 0)],
+                self._get_columns(year))
+
+    def test_unchanged_schema(self):
+        """Test that an unchanged schema is not built again."""
+        self.builder.conn.close()
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertFalse(self.builder.build_database())
+        self.builder.cur.execute('''SELECT UGDS FROM "1996"''')
+        self.assertEqual([(1000,)], self.builder.cur.fetchall())
+        self.assertFalse(
+            self.builder.update_database(self.raw_data_path, '1996'))
+
+    def test_changed_schema(self):
+        """Test that a changed schema drops the data and the manifest."""
+        with open(self.data_types_path, 'w') as data_types_file:
+            data_types_file.write(json.dumps(
+                TEST_DATA_TYPES + [['MD_EARN_WNE_P10', 'INTEGER', 39]]))
+        self.builder.conn.close()
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertTrue(self.builder.build_database())
+        self.assertEqual('MD_EARN_WNE_P10', self._get_columns('1996')[-1][0])
+        self.builder.cur.execute('''SELECT Count(*) FROM College''')
+        self.assertEqual(0, self.builder.cur.fetchone()[0])
+        self.assertEqual({}, self.builder.college_ids)
+        self.assertTrue(
+            self.builder.update_database(self.raw_data_path, '1996'))
+        self.builder.cur.execute('''SELECT college_id FROM College''')
+        self.assertEqual([(1,)], self.builder.cur.fetchall())
+
+    def test_missing_fingerprint(self):
+        """Test that a database without a fingerprint is rebuilt loudly."""
+        self.builder.cur.execute('''DROP TABLE Metadata''')
+        self.builder.conn.commit()
+        self.builder.conn.close()
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(self.builder.build_database())
+        self.assertIn('Rebuilding the existing database: its schema '
+                      'fingerprint is missing.', output.getvalue())
+
+        #A new database is built without the message.
+        self.builder.conn.close()
+        os.remove(self.db_path)
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(self.builder.build_database())
+        self.assertNotIn('Rebuilding', output.getvalue())
+
+
+class TestDataTypeIndex(unittest.TestCase):
+    """Contains tests for the data type search table.
+
+    Methods:
+        test_labels(self): Test data types labelled by the data dictionary.
+        test_unchanged_index(self): Test that the table is reused.
+        test_invalid_dictionary(self): Test rejected data dictionaries.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'db.sqlite')
+        self.data_types_path, _ = write_test_files(self.temp_dir.name, [])
+        self.dictionary_path = os.path.join(
+            self.temp_dir.name, 'dictionary.csv')
+        with open(self.dictionary_path, 'w') as dictionary_file:
+            dictionary_file.write(
+                'NAME OF DATA ELEMENT,developer-friendly name,VARIABLE NAME\n'
+                'Admission rate,admission_rate.overall,ADM_RATE\n'
+                '"Enrollment of undergraduate, degree-seeking students",'
+                'size,UGDS\n')
+        self.builder = None
+
+    def tearDown(self):
+        if self.builder is not None:
+            self.builder.conn.close()
+        self.temp_dir.cleanup()
+
+    def _get_rows(self):
+        """Return the (name, label) rows of the DataType table."""
+        self.builder.cur.execute('''SELECT name, label FROM DataType''')
+        return self.builder.cur.fetchall()
+
+    def test_labels(self):
+        """Test numeric data types labelled by the data dictionary."""
+        self.builder = Dbbuilder(
+            self.db_path, self.data_types_path,
+            dictionary_path=self.dictionary_path)
+        self.builder.build_database()
+        self.assertEqual(
+            [('UNITID', ''), ('ADM_RATE', 'Admission rate'),
+             ('UGDS', 'Enrollment of undergraduate, degree-seeking students')],
+            self._get_rows())
+
+    def test_unchanged_index(self):
+        """Test that the table is only built again for new labels."""
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.builder.build_database()
+        self.assertEqual('', self._get_rows()[1][1])
+        self.assertFalse(self.builder.build_data_type_index())
+        self.builder.conn.close()
+
+        #A data dictionary labels the data types of an existing database.
+        self.builder = Dbbuilder(
+            self.db_path, self.data_types_path,
+            dictionary_path=self.dictionary_path)
+        self.assertFalse(self.builder.build_database())
+        self.assertEqual('Admission rate', self._get_rows()[1][1])
+        self.assertFalse(self.builder.build_data_type_index())
+        self.builder.conn.close()
+
+        #Reopening the database without a dictionary keeps the labels, also
+        #when a changed schema rebuilds the database.
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertFalse(self.builder.build_database())
+        self.assertEqual('Admission rate', self._get_rows()[1][1])
+        self.assertFalse(self.builder.build_data_type_index())
+        self.builder.conn.close()
+        with open(self.data_types_path, 'w') as data_types_file:
+            data_types_file.write(json.dumps(
+                TEST_DATA_TYPES + [['MD_EARN_WNE_P10', 'INTEGER', 39]]))
+        self.builder = Dbbuilder(self.db_path, self.data_types_path)
+        self.assertTrue(self.builder.build_database())
+        self.assertEqual(
+            [('ADM_RATE', 'Admission rate'), ('MD_EARN_WNE_P10', '')],
+            self._get_rows()[1:4:2])
+
+    def test_invalid_dictionary(self):
+        """Test missing data dictionaries and missing columns."""
+        self.assertRaises(
+            FileNotFoundError,
+            lambda: Dbbuilder(self.db_path, self.data_types_path,
+                              dictionary_path=self.dictionary_path + 'x'))
+        with open(self.dictionary_path, 'w') as dictionary_file:
+            dictionary_file.write('VARIABLE NAME,LABEL\nUGDS,Size\n')
+        self.assertRaises(
+            ValueError,
+            lambda: Dbbuilder(self.db_path, self.data_types_path,
+                              dictionary_path=self.dictionary_path))
+
+
 def main():
     """Launch unittest main method."""
     unittest.main()
@@ -0,0 +1,74 @@
+"""Unit tests for the dbschema module.
+
+Classes:
+    TestDbschema(unittest.TestCase): Test reading the database schema.
+"""
+import sqlite3
+import tempfile
+import unittest
+import dbschema
+from test.test_dbbuilder import build_test_database
+
+
+class TestDbschema(unittest.TestCase):
+    """Contains tests for reading the layout, years and data types.
+
+    Methods:
+        test_wide_layout(self): Test a database of year tables.
+        test_long_layout(self): Test a database of observations.
+        test_empty_database(self): Test a database without tables.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.conn = None
+
+    def tearDown(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.temp_dir.cleanup()
+
+    def _build(self, layout):
+        """Return a cursor of a database built with a layout."""
+        db_path = build_test_database(
+            self.temp_dir.name,
+            {'1997': [('100', 'College', '0.5', '1000')]}, layout)
+        self.conn = sqlite3.connect(db_path)
+        return self.conn.cursor()
+
+    def test_wide_layout(self):
+        """Test a database of year tables."""
+        cur = self._build('wide')
+        self.assertEqual('wide', dbschema.get_layout(cur))
+        years = dbschema.get_years(cur, 'wide')
+        self.assertEqual(list(range(1996, 2015)), years)
+        self.assertEqual(
+            [('ADM_RATE', 'ADM_RATE'), ('UGDS', 'UGDS')],
+            dbschema.get_year_data_types(cur, 'wide', years))
+
+    def test_long_layout(self):
+        """Test a database of observations."""
+        cur = self._build('long')
+        self.assertEqual('long', dbschema.get_layout(cur))
+        years = dbschema.get_years(cur, 'long')
+        self.assertEqual(1997, years[1])
+        self.assertEqual(
+            ['ADM_RATE', 'UGDS'],
+            [name for name, _ in dbschema.get_year_data_types(
+                cur, 'long', years)])
+
+    def test_empty_database(self):
+        """Test a database without tables."""
+        self.conn = sqlite3.connect(':memory:')
+        cur = self.conn.cursor()
+        self.assertEqual('wide', dbschema.get_layout(cur))
+        self.assertEqual([], dbschema.get_years(cur, 'wide'))
+        self.assertEqual([], dbschema.get_year_data_types(cur, 'wide', []))
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
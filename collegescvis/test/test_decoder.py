@@ -4,7 +4,11 @@ Classes:
     TestDataPaths(unittest.TestCase): Tests for raw data path processing.
     TestReadValues(unittest.TestCase): Tests for read_values function.
     TestFindType(unittest.TestCase): Tests for find_type function.
+    TestGetDataTypes(unittest.TestCase): Tests for get_data_types function.
+    TestReadRows(unittest.TestCase): Tests for read_rows function.
 """
+import os
+import tempfile
 import unittest
 import decoder
 
@@ -105,6 +109,110 @@ class TestFindType(unittest.TestCase):
         valid_text_entry = ['Category', '8.32', 'text', '5', 'NULL']
         self.assertEqual('TEXT', decoder._find_type(valid_text_entry))
 
+    def test_text_before_real_entry(self):
+        """Test that a real value after text data does not narrow the type."""
+        valid_text_entry = ['Category', 'text', '8.32', '5']
+        self.assertEqual('TEXT', decoder._find_type(valid_text_entry))
+
+
+class TestGetDataTypes(unittest.TestCase):
+    """Contains tests for decoder get_data_types function.
+
+    Methods:
+        test_single_file(self): Test types read from a single file.
+        test_multiple_files(self): Test types merged from several files.
+        test_parallel_files(self): Test types read by worker processes.
+        test_invalid_workers(self): Test invalid numbers of workers.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_file(self, name, lines):
+        """Write lines of raw data to a file in the temporary directory."""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w') as data_file:
+            data_file.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_single_file(self):
+        """Test types read from a single file."""
+        path = self._write_file('MERGED1996.csv', [
+            'UNITID,INSTNM,RATE,EMPTY,MIXED,A,ZIP',
+            '1,"College, The",0.5,NULL,text,NULL,12345',
+            '2,Other,1,PrivacySuppressed,2.5,NULL,54321'])
+        self.assertEqual(
+            [('UNITID', 'INTEGER', 0), ('INSTNM', 'TEXT', 1),
+             ('RATE', 'REAL', 2), ('MIXED', 'TEXT', 4), ('ZIP', 'TEXT', 6)],
+            decoder._get_data_types([path]))
+
+    def test_multiple_files(self):
+        """Test that types are taken from the first file with good data."""
+        first_path = self._write_file('MERGED1996.csv', [
+            'UNITID,RATE,COUNT',
+            '1,NULL,5'])
+        second_path = self._write_file('MERGED1997.csv', [
+            'UNITID,RATE,COUNT',
+            '1,0.5,text'])
+        self.assertEqual(
+            [('UNITID', 'INTEGER', 0), ('RATE', 'REAL', 1),
+             ('COUNT', 'INTEGER', 2)],
+            decoder._get_data_types([first_path, second_path]))
+
+    def test_parallel_files(self):
+        """Test that worker processes give the same types as one process."""
+        header = 'UNITID,RATE,COUNT'
+        paths = [
+            self._write_file('MERGED1996.csv', [header, '1,NULL,5']),
+            self._write_file('MERGED1997.csv', [header, '1,0.5,x']),
+            self._write_file('MERGED1998.csv', [header, '1,a,1'])]
+        self.assertEqual(
+            decoder._get_data_types(paths),
+            decoder._get_data_types(paths, workers=2))
+
+    def test_invalid_workers(self):
+        """Test invalid numbers of workers."""
+        self.assertRaises(
+            TypeError, lambda: decoder._validate_workers('2'))
+        self.assertRaises(
+            ValueError, lambda: decoder._validate_workers(0))
+
+
+class TestReadRows(unittest.TestCase):
+    """Contains tests for the decoder read_rows and split_line functions.
+
+    Methods:
+        test_quoted_commas(self): Test values containing quoted commas.
+        test_line_endings(self): Test removal of line endings.
+        test_quoted_line_breaks(self): Test values containing line breaks.
+    """
+
+    def test_quoted_commas(self):
+        """Test that quoted values keep their commas."""
+        self.assertEqual(
+            ['1', 'College, The', 'A, B, C', 'NULL'],
+            decoder.split_line('1,"College, The","A, B, C",NULL'))
+        self.assertEqual(
+            ['1', 'A "B" C', '2'], decoder.split_line('1,"A ""B"" C",2'))
+        self.assertEqual(['1', 'A, B'], decoder.split_line('1,"A, B"\n'))
+
+    def test_line_endings(self):
+        """Test removal of line endings."""
+        lines = ['UNITID,RATE\r\n', '1,0.5\n', '2,NULL']
+        self.assertEqual(
+            [['UNITID', 'RATE'], ['1', '0.5'], ['2', 'NULL']],
+            list(decoder.read_rows(lines)))
+
+    def test_quoted_line_breaks(self):
+        """Test values containing line breaks."""
+        lines = ['1,"Line 1\n', 'Line 2",0.5\n', '2,NULL\n']
+        self.assertEqual(
+            [['1', 'Line 1\nLine 2', '0.5'], ['2', 'NULL']],
+            list(decoder.read_rows(lines)))
+
 
 def main():
     """Launch the unittest main function."""
@@ -0,0 +1,98 @@
+"""Unit tests for the instrumentation module.
+
+Classes:
+    TestMetrics(unittest.TestCase): Test recording stage metrics.
+    TestTimedIterator(unittest.TestCase): Test timing an iterator.
+"""
+import contextlib
+import io
+import json
+import unittest
+from instrumentation import Metrics, TimedIterator
+
+
+class TestMetrics(unittest.TestCase):
+    """Contains tests for recording stage metrics.
+
+    Methods:
+        test_stage(self): Test a stage written to the sink.
+        test_totals(self): Test adding and merging stage totals.
+        test_disabled(self): Test that disabled metrics record nothing.
+        test_report(self): Test the printed and written summary.
+    """
+
+    def setUp(self):
+        self.sink = io.StringIO()
+        self.metrics = Metrics(sink=self.sink)
+
+    def _get_lines(self):
+        """Return the JSON lines written to the sink."""
+        return [json.loads(line) for line in self.sink.getvalue().splitlines()]
+
+    def test_stage(self):
+        """Test a stage with rows and inner stages written to the sink."""
+        with self.metrics.stage('file', year='1996') as record:
+            self.metrics.add('convert', 0.5, 10)
+            record['rows'] = 10
+        line, = self._get_lines()
+        self.assertEqual('stage', line['event'])
+        self.assertEqual('file', line['stage'])
+        self.assertEqual('1996', line['year'])
+        self.assertEqual(10, line['rows'])
+        self.assertGreater(line['rows_per_second'], 0)
+        self.assertEqual({'convert': 0.5}, line['stages'])
+        self.assertIn('peak_memory_kib', line)
+        self.assertEqual(10, self.metrics.totals['file'][1])
+
+    def test_totals(self):
+        """Test adding and merging stage totals."""
+        self.metrics.add('insert', 1.0, 5)
+        self.metrics.add('insert', 0.5, 5)
+        self.metrics.merge({'read': (2.0, 0), 'insert': (0.5, 10)})
+        self.assertEqual({'insert': [2.0, 20], 'read': [2.0, 0]},
+                         self.metrics.totals)
+        self.assertEqual([], self._get_lines())
+
+    def test_disabled(self):
+        """Test that disabled metrics record and write nothing."""
+        metrics = Metrics(False, self.sink)
+        with metrics.stage('file') as record:
+            record['rows'] = 1
+            metrics.add('read', 1.0)
+        metrics.report()
+        self.assertEqual({}, metrics.totals)
+        self.assertEqual('', self.sink.getvalue())
+
+    def test_report(self):
+        """Test the printed and written summary of the totals."""
+        self.metrics.add('convert', 2.0, 100)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.metrics.report()
+        self.assertIn('convert', output.getvalue())
+        self.assertIn('50', output.getvalue())
+        line, = self._get_lines()
+        self.assertEqual('summary', line['event'])
+        self.assertEqual({'convert': [2.0, 100]}, line['totals'])
+
+
+class TestTimedIterator(unittest.TestCase):
+    """Contains tests for timing an iterator.
+
+    Methods:
+        test_items(self): Test that the items are unchanged.
+    """
+
+    def test_items(self):
+        """Test that the items are unchanged and the time is added up."""
+        items = TimedIterator(['a\n', 'b\n'])
+        self.assertEqual(['a\n', 'b\n'], list(items))
+        self.assertGreater(items.seconds, 0)
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,18 @@
 Functions:
     main(): launch all unit tests.
 """
+from test.test_aggregate import *
+from test.test_batch import *
+from test.test_bench import *
+from test.test_collegesearch import *
+from test.test_columnar import *
 from test.test_dbbuilder import *
+from test.test_dbschema import *
 from test.test_decoder import *
+from test.test_instrumentation import *
+from test.test_plotdata import *
+from test.test_querycache import *
+from test.test_validator import *
 
 
 def main():
@@ -0,0 +1,298 @@
+"""Unit tests for the plotdata module.
+
+Classes:
+    TestPlotSettings(unittest.TestCase): Test retrieving plotted series.
+    TestSeriesPlot(unittest.TestCase): Test preparing series to be plotted.
+"""
+import math
+import os
+import tempfile
+import unittest
+import numpy as np
+import columnar
+from plotdata import PlotSettings, SeriesPlot
+from test.test_dbbuilder import build_test_database
+
+
+class TestPlotSettings(unittest.TestCase):
+    """Contains tests for retrieving the data of plotted series.
+
+    Methods:
+        test_query_db(self): Test series data aligned by year.
+        test_union_all(self): Test series retrieved with UNION ALL.
+        test_missing_rows(self): Test years without a college's row.
+        test_long_layout(self): Test series data of the long layout.
+        test_columnar_export(self): Test series sliced from an export.
+        test_progress(self): Test reporting and cancelling series.
+        test_create_series_plot(self): Test checking series settings.
+        test_metadata_sidecar(self): Test caching the database metadata.
+        test_search_data_types(self): Test searching the data types.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.plot_settings = None
+
+    def tearDown(self):
+        if self.plot_settings is not None:
+            self.plot_settings.cur.connection.close()
+            if self.plot_settings.columns is not None:
+                #Series slices must be released before the memory map.
+                self.plot_settings._clear_series_plots()
+                self.plot_settings.columns.close()
+        self.temp_dir.cleanup()
+
+    def _build(self, layout='wide', columns_dir=None):
+        """Build a database with 1996 and 1998 data and open it."""
+        rows = [('100', 'College', '0.5', '1000'),
+                ('200', 'Other College', 'NULL', '2000')]
+        self.db_path = build_test_database(
+            self.temp_dir.name, {'1996': rows, '1998': rows}, layout)
+        if columns_dir:
+            columnar.export_columns(self.db_path, columns_dir)
+        self.plot_settings = PlotSettings(self.db_path, columns_dir)
+
+    def _add_series(self):
+        """Add a year series and a college series to the plot settings."""
+        self.plot_settings._clear_series_plots()
+        self.plot_settings._add_series_plot(
+            SeriesPlot('College', 'ADM_RATE', '1996', '1999', False))
+        self.plot_settings._add_series_plot(
+            SeriesPlot('Other College', 'UNITID', '1996', '1998', True))
+
+    def _trace_selects(self):
+        """Return a list that collects the SELECT statements run."""
+        selects = []
+        self.plot_settings.cur.connection.set_trace_callback(
+            lambda statement: statement.startswith('SELECT') and
+            selects.append(statement))
+        return selects
+
+    def _get_data(self):
+        """Return the data of the series with None for NaN."""
+        return [[None if value is None or math.isnan(value) else value
+                 for value in series.data]
+                for series in self.plot_settings._get_series_plots()]
+
+    def test_query_db(self):
+        """Test series data aligned by year."""
+        self._build()
+        self.assertEqual(
+            ['UNITID', 'ADM_RATE', 'UGDS'], self.plot_settings.data_types)
+        self.assertEqual(0, self.plot_settings.max_college_data_index)
+        self._add_series()
+        self.assertTrue(self.plot_settings._query_db())
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+        #Repeated queries are answered by the query cache.
+        self._add_series()
+        self.plot_settings.cur.connection.set_trace_callback(self.fail)
+        self.plot_settings._query_db()
+        self.plot_settings.cur.connection.set_trace_callback(None)
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+    def test_union_all(self):
+        """Test every series retrieved with one UNION ALL statement."""
+        for layout in ('wide', 'long'):
+            self._build(layout)
+            self._add_series()
+            selects = self._trace_selects()
+            self.plot_settings._query_db()
+            self.assertEqual(1, len(selects))
+            self.assertEqual(
+                [[0.5, None, 0.5, None], [200]], self._get_data())
+            self.plot_settings.cur.connection.close()
+
+        #Statements are split at sqlite's limit of compound SELECTs: the
+        #four years of the first series take two statements of two.
+        self._build()
+        self.plot_settings.MAX_COMPOUND_SELECT = 2
+        self._add_series()
+        selects = self._trace_selects()
+        self.plot_settings._query_db()
+        self.assertEqual(3, len(selects))
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+    def test_missing_rows(self):
+        """Test None for the years a college has no row in."""
+        for layout in ('wide', 'long'):
+            self._build(layout)
+            build_test_database(
+                self.temp_dir.name,
+                {'1997': [('300', 'New College', '0.25', '10')]}, layout)
+            self.plot_settings.cur.connection.close()
+            self.plot_settings = PlotSettings(self.db_path)
+
+            self.plot_settings._add_series_plot(
+                SeriesPlot('New College', 'UGDS', '1996', '1998', False))
+            self.plot_settings._query_db()
+            self.assertEqual([[None, 10, None]], self._get_data())
+            x_data, y_data = self.plot_settings._get_series_plots()[
+                0]._get_xy_data()
+            self.assertEqual([1996, 1997, 1998], x_data.tolist())
+            self.assertEqual(
+                [True, False, True], np.isnan(y_data).tolist())
+            self.plot_settings.cur.connection.close()
+
+    def test_long_layout(self):
+        """Test series data of the long layout."""
+        self._build('long')
+        self._add_series()
+        self.plot_settings._query_db()
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+    def test_columnar_export(self):
+        """Test series sliced from a columnar export."""
+        self._build(columns_dir=os.path.join(self.temp_dir.name, 'columns'))
+        self._add_series()
+        self.plot_settings._query_db()
+        self.assertIsInstance(
+            self.plot_settings._get_series_plots()[0].data, memoryview)
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+        #An export that is out of date is closed and no longer used.
+        columns = self.plot_settings.columns
+        stat = os.stat(self.db_path)
+        os.utime(self.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self._add_series()
+        self.plot_settings._query_db()
+        self.assertIsNone(self.plot_settings.columns)
+        self.assertTrue(columns._file.closed)
+        self.assertTrue(columns._map.closed)
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [200]], self._get_data())
+
+    def test_progress(self):
+        """Test reporting each series and cancelling between statements."""
+        self._build()
+        self.plot_settings.SERIES_PER_STATEMENT = 1
+        events = []
+        self.plot_settings.cur.connection.set_trace_callback(
+            lambda statement: statement.startswith('SELECT') and
+            events.append('select'))
+        self._add_series()
+        self.plot_settings._add_series_plot(
+            SeriesPlot('College', 'UGDS', '1996', '1996', False))
+        self.assertTrue(self.plot_settings._query_db(
+            series_done=events.append, is_cancelled=lambda: False))
+        self.assertEqual(
+            ['select', 0, 'select', 1, 'select', 2], events)
+
+        #The default groups every series of a small plot in one statement.
+        self.plot_settings.query_cache.clear()
+        del self.plot_settings.SERIES_PER_STATEMENT
+        self._add_series()
+        events[:] = []
+        self.plot_settings._query_db(series_done=events.append)
+        self.assertEqual(['select', 0, 1], events)
+
+        #Cancelling after the first series leaves the others unqueried.
+        self.plot_settings.query_cache.clear()
+        self.plot_settings.SERIES_PER_STATEMENT = 1
+        self._add_series()
+        self.plot_settings._add_series_plot(
+            SeriesPlot('College', 'UGDS', '1996', '1996', False))
+        events[:] = []
+        self.assertFalse(self.plot_settings._query_db(
+            series_done=events.append, is_cancelled=lambda: 0 in events))
+        self.assertEqual(['select', 0], events)
+        self.assertEqual(
+            [[0.5, None, 0.5, None], [], []], self._get_data())
+
+    def test_create_series_plot(self):
+        """Test checking the settings of a series."""
+        self._build()
+        series = self.plot_settings._create_series_plot(
+            'College', 'UNITID', 1996, 1998)
+        self.assertTrue(series.is_college)
+        self.assertEqual('1996', series.start_year)
+        series = self.plot_settings._create_series_plot(
+            'College', 'UGDS', '1996', '1998')
+        self.assertFalse(series.is_college)
+        for settings in (('Unknown', 'UGDS', '1996', '1998'),
+                         ('College', 'INSTNM', '1996', '1998'),
+                         ('College', 'UGDS', '1990', '1998'),
+                         ('College', 'UGDS', '1998', '1996')):
+            self.assertRaises(
+                ValueError,
+                lambda: self.plot_settings._create_series_plot(*settings))
+
+    def test_metadata_sidecar(self):
+        """Test caching the database metadata in a sidecar file."""
+        self._build('long')
+        self.assertTrue(os.path.isfile(self.plot_settings.metadata_path))
+        expected = dict(
+            (attribute, getattr(self.plot_settings, attribute))
+            for attribute in PlotSettings.METADATA_ATTRIBUTES)
+        self.assertEqual('long', expected['layout'])
+        self.plot_settings.cur.connection.close()
+
+        #The metadata of an unchanged database is read from the sidecar.
+        self.plot_settings = PlotSettings(self.db_path)
+        self.assertTrue(self.plot_settings._load_metadata())
+        for attribute, value in expected.items():
+            self.assertEqual(value, getattr(self.plot_settings, attribute))
+
+        #The sidecar of a changed database is not used.
+        with open(self.db_path, 'ab') as db_file:
+            db_file.write(b'\0')
+        self.assertFalse(self.plot_settings._load_metadata())
+
+    def test_search_data_types(self):
+        """Test searching the data types by name."""
+        self._build()
+        self.assertEqual(
+            [('ADM_RATE', '')], self.plot_settings._search_data_types('adm'))
+        self.assertEqual(
+            [('ADM_RATE', '')],
+            self.plot_settings._search_data_types('ADM_RATE'))
+        self.assertEqual([], self.plot_settings._search_data_types('ate'))
+        self.assertEqual([], self.plot_settings._search_data_types('_ "'))
+        self.assertEqual('fts5', self.plot_settings.data_type_search)
+
+        #Without FTS5 the words may occur anywhere in the name.
+        self.plot_settings.data_type_search = 'like'
+        self.assertEqual(
+            [('ADM_RATE', '')], self.plot_settings._search_data_types('ate'))
+        self.assertEqual(
+            [('UGDS', ''), ('UNITID', '')],
+            self.plot_settings._search_data_types('u'))
+
+
+class TestSeriesPlot(unittest.TestCase):
+    """Contains tests for preparing series to be plotted.
+
+    Methods:
+        test_year_data(self): Test arrays of year data.
+        test_college_data(self): Test arrays of college data.
+    """
+
+    def test_year_data(self):
+        """Test arrays of year data with NaN for missing values."""
+        series = SeriesPlot('College', 'UGDS', '2000', '2002', False)
+        series.data = [1, None, 3]
+        x_data, y_data = series._get_xy_data()
+        self.assertEqual([2000, 2001, 2002], x_data.tolist())
+        self.assertEqual(len(x_data), len(y_data))
+        self.assertEqual([True, False, True], (~np.isnan(y_data)).tolist())
+
+    def test_college_data(self):
+        """Test arrays of college data repeated for every year."""
+        series = SeriesPlot('College', 'UNITID', '2000', '2001', True)
+        series.data = [100]
+        self.assertEqual([100, 100], series._get_xy_data()[1].tolist())
+        series.data = []
+        self.assertTrue(np.isnan(series._get_xy_data()[1]).all())
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Unit tests for the querycache module.
+
+Classes:
+    TestQueryCache(unittest.TestCase): Test storing and evicting results.
+"""
+import unittest
+from querycache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    """Contains tests for the QueryCache class.
+
+    Methods:
+        test_get_put(self): Test storing and retrieving results.
+        test_eviction(self): Test least recently used results are evicted.
+        test_oversized_values(self): Test values larger than the cache.
+        test_validate(self): Test clearing results on a new signature.
+        test_invalid_size(self): Test invalid cache sizes.
+    """
+
+    def test_get_put(self):
+        """Test storing and retrieving results."""
+        cache = QueryCache()
+        key = ('College', 'ADM_RATE', 1996)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [0.5])
+        self.assertEqual((0.5,), cache.get(key))
+        cache.put(key, [])
+        self.assertEqual((), cache.get(key))
+        self.assertEqual(1, len(cache))
+
+    def test_eviction(self):
+        """Test least recently used results are evicted."""
+        keys = [('College', 'ADM_RATE', year) for year in range(3)]
+        entry_size = QueryCache._get_size(keys[0], (0.5,))
+        cache = QueryCache(entry_size * 2)
+        cache.put(keys[0], [0.5])
+        cache.put(keys[1], [0.5])
+        cache.get(keys[0])
+        cache.put(keys[2], [0.5])
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+        self.assertIn(keys[2], cache)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_oversized_values(self):
+        """Test values larger than the cache are not stored."""
+        cache = QueryCache(10)
+        cache.put(('College', 'ADM_RATE', 1996), [0.5])
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
+
+    def test_validate(self):
+        """Test clearing results on a new signature."""
+        cache = QueryCache()
+        cache.validate((1, 100))
+        cache.put(('College', 'ADM_RATE', 1996), [0.5])
+        cache.validate((1, 100))
+        self.assertEqual(1, len(cache))
+        cache.validate((2, 100))
+        self.assertEqual(0, len(cache))
+
+    def test_invalid_size(self):
+        """Test invalid cache sizes."""
+        self.assertRaises(TypeError, lambda: QueryCache('100'))
+        self.assertRaises(ValueError, lambda: QueryCache(-1))
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Unit tests for the validator module.
+
+Classes:
+    TestCheckRawData(unittest.TestCase): Test checking raw data rows.
+"""
+import io
+import unittest
+from validator import Validator
+
+
+class TestCheckRawData(unittest.TestCase):
+    """Contains tests for checking raw data rows.
+
+    Methods:
+        test_valid_data(self): Test rows with as many values as the header.
+        test_invalid_row(self): Test a row with a missing value.
+    """
+
+    def test_valid_data(self):
+        """Test rows with quoted commas and as many values as the header."""
+        raw_data_file = io.StringIO(
+            'UNITID,INSTNM,UGDS\n100,"College, The",NULL\n200,College,5\n')
+        Validator.check_raw_data(raw_data_file)
+        self.assertEqual(0, raw_data_file.tell())
+        rows = [['UNITID', 'INSTNM'], ['100', 'College']]
+        self.assertEqual(rows, list(Validator.check_raw_rows(iter(rows))))
+        self.assertEqual([], list(Validator.check_raw_rows([])))
+
+    def test_invalid_row(self):
+        """Test that a row with a missing value is rejected when read."""
+        rows = Validator.check_raw_rows(
+            [['UNITID', 'INSTNM'], ['100', 'College'], ['200']])
+        self.assertEqual(['UNITID', 'INSTNM'], next(rows))
+        self.assertEqual(['100', 'College'], next(rows))
+        self.assertRaises(ValueError, lambda: next(rows))
+        self.assertRaises(
+            ValueError, lambda: Validator.check_raw_data(
+                io.StringIO('UNITID,INSTNM\n100\n')))
+
+
+def main():
+    """Launch unittest main method."""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
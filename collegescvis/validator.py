@@ -16,6 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import json
+import decoder
 
 
 class Validator(object):
@@ -60,17 +61,43 @@ class Validator(object):
     def check_raw_data(raw_data_file):
         """Check for correct formatting in the specified raw data file.
 
+        The file is read one row at a time (see check_raw_rows), so memory
+        use does not depend on the file size.
+
         Args:
             raw_data_file: File object of College Scorecard raw data.
 
         Raises:
             ValueError: If the data is incorrectly formatted.
         """
-        raw_data_lines = raw_data_file.readlines()
-        entries = len(raw_data_lines[0].split(','))
-        for line in raw_data_lines:
-            length = len(line.split(','))
-            if length != entries:
-                raise ValueError(
-                    'Incorrect number of entries in raw data line.')
+        for _ in Validator.check_raw_rows(decoder.read_rows(raw_data_file)):
+            pass
         raw_data_file.seek(0)
+
+    @staticmethod
+    def check_raw_rows(rows):
+        """Check the number of values of each row while the rows are read.
+
+        Args:
+            rows: Iterable of lists of string values, such as returned by
+                decoder.read_rows. The first row is the header.
+
+        Yields:
+            row: Each row, including the header, once it has been checked.
+
+        Raises:
+            ValueError: If a row has a different number of values than the
+                header.
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield header
+        entries = len(header)
+        for number, row in enumerate(rows, 1):
+            if len(row) != entries:
+                raise ValueError(
+                    'Incorrect number of entries in raw data row %d: %d '
+                    'instead of %d.' % (number, len(row), entries))
+            yield row